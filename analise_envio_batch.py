@@ -0,0 +1,254 @@
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from analise_envio_core import (
+    EXTENSOES_FORMATO, TAMANHO_BLOCO_LEITURA, ArquivoInvalidoError, AnalyticsEngine, DataProcessor, MonitorDesempenho,
+    analisar_janela, definir_janela_padrao, executar_pipeline, executar_pipeline_streaming, exportar_relatorio_excel,
+    recortar_janela
+)
+
+logger = logging.getLogger(__name__)
+
+# Constantes
+FORMATOS_SAIDA = ['excel', 'json', 'parquet']
+EXTENSOES_ENTRADA = tuple(EXTENSOES_FORMATO)
+ARQUIVO_RESUMO = 'resumo_execucao.json'
+
+def interpretar_mes(valor: str) -> Tuple[int, int]:
+    """Converte 'AAAA-MM' em (ano, mês)"""
+    try:
+        ano, mes = valor.split('-')
+        ano, mes = int(ano), int(mes)
+        if not 1 <= mes <= 12:
+            raise ValueError
+        return ano, mes
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Mês inválido '{valor}', use o formato AAAA-MM")
+
+def listar_planilhas(diretorio: Path, recursivo: bool = False) -> List[Path]:
+    """Lista as planilhas (Excel, CSV, Parquet, Arrow) do diretório, ignorando arquivos temporários do Office"""
+    padrao = '**/*' if recursivo else '*'
+    return sorted(
+        caminho for caminho in diretorio.glob(padrao)
+        if caminho.is_file()
+        and caminho.suffix.lower() in EXTENSOES_ENTRADA
+        and not caminho.name.startswith('~$')
+    )
+
+def _converter_json(valor):
+    """Converte tipos numpy para tipos nativos na serialização JSON"""
+    if isinstance(valor, np.generic):
+        return valor.item()
+    if isinstance(valor, np.ndarray):
+        return valor.tolist()
+    raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
+
+def serializar_datas_envio(responsaveis_unicos: List[str], datas_envio: Dict) -> Dict:
+    """Primeiro e último envio de cada responsável, como datas ISO"""
+    primeiros = datas_envio['primeiro_envio'].astype('datetime64[s]').astype(str)
+    ultimos = datas_envio['ultimo_envio'].astype('datetime64[s]').astype(str)
+    return {
+        nome: {'primeiro_envio': primeiro, 'ultimo_envio': ultimo}
+        for nome, primeiro, ultimo in zip(responsaveis_unicos, primeiros.tolist(), ultimos.tolist())
+    }
+
+def serializar_analise(analise_janela: Dict) -> Dict:
+    """Monta a versão JSON da análise de uma janela"""
+    meses = {}
+    for (ano, mes), dados in analise_janela['analise_mensal'].items():
+        meses[f"{ano}-{mes:02d}"] = {
+            'rotulo': dados['rotulo'],
+            'taxa_envio': dados['taxa_envio'],
+            'qtd_enviaram': dados['qtd_enviaram'],
+            'qtd_nao_enviaram': dados['qtd_nao_enviaram'],
+            'total_registros': dados['total_registros'],
+            'media_envios_por_responsavel': dados['media_envios_por_responsavel'],
+            'total_responsaveis': dados['total_responsaveis'],
+            'responsaveis_enviaram': AnalyticsEngine.listar_responsaveis(dados, enviaram=True),
+            'responsaveis_nao_enviaram': AnalyticsEngine.listar_responsaveis(dados, enviaram=False)
+        }
+    
+    return {
+        'janela': list(meses.keys()),
+        'analise_mensal': meses,
+        'tendencias': analise_janela['tendencias'],
+        'categorias': AnalyticsEngine.contar_categorias(analise_janela['status_individual'])
+    }
+
+def prefixo_saida(caminho: Path, diretorio_entrada: Path, diretorio_saida: Path) -> Path:
+    """Prefixo das saídas de uma planilha: repete os subdiretórios da entrada e inclui a extensão no nome"""
+    relativo = caminho.relative_to(diretorio_entrada)
+    return diretorio_saida / relativo.parent / f"{caminho.stem}_{caminho.suffix.lstrip('.').lower()}"
+
+def processar_arquivo(caminho: str, diretorio_saida: str, formatos: List[str],
+                      inicio: Optional[Tuple[int, int]] = None, fim: Optional[Tuple[int, int]] = None,
+                      streaming: bool = False, tamanho_bloco: int = TAMANHO_BLOCO_LEITURA,
+                      diretorio_entrada: Optional[str] = None) -> Dict:
+    """Processa uma planilha e grava as saídas pedidas, retornando o resumo da execução"""
+    inicio_execucao = time.perf_counter()
+    caminho = Path(caminho)
+    resumo = {'arquivo': str(caminho), 'status': 'ok', 'mensagem': '', 'saidas': []}
+    
+    try:
+        monitor = MonitorDesempenho()
+        # Parquet e Arrow são lidos direto do disco (mapeados em memória); os demais, a partir dos bytes.
+        # Em streaming, o CSV também é lido do disco, bloco a bloco, sem carregar o arquivo inteiro
+        formato = DataProcessor.detectar_formato(caminho.name, str(caminho))
+        do_disco = ('parquet', 'arrow', 'csv') if streaming else ('parquet', 'arrow')
+        fonte = str(caminho) if formato in do_disco else caminho.read_bytes()
+        if streaming:
+            resultado = executar_pipeline_streaming([(caminho.name, fonte)], tamanho_bloco, monitor=monitor)
+        else:
+            resultado = executar_pipeline([(caminho.name, fonte)], paralelo=False, monitor=monitor)
+        
+        # Janela de análise: a informada ou a padrão do painel
+        meses_disponiveis = resultado['meses_disponiveis']
+        inicio_padrao, fim_padrao = definir_janela_padrao(meses_disponiveis)
+        meses = recortar_janela(meses_disponiveis, inicio or inicio_padrao, fim or fim_padrao)
+        if not meses:
+            raise ArquivoInvalidoError("Nenhum mês com dados na janela informada")
+        analise = analisar_janela(resultado, meses, monitor=monitor)
+        
+        # rep.xlsx e rep.csv (ou sub/rep.xlsx) não podem gravar nos mesmos arquivos
+        saida = prefixo_saida(caminho, Path(diretorio_entrada) if diretorio_entrada else caminho.parent,
+                              Path(diretorio_saida))
+        saida.parent.mkdir(parents=True, exist_ok=True)
+        if 'excel' in formatos:
+            destino = saida.with_name(f"{saida.name}_relatorio.xlsx")
+            with monitor.estagio('exportacao_excel', len(resultado['responsaveis_unicos'])):
+                destino.write_bytes(exportar_relatorio_excel(
+                    analise['analise_mensal'], analise['status_individual'], resultado['responsaveis_unicos']
+                ).getvalue())
+            resumo['saidas'].append(str(destino))
+        
+        if 'json' in formatos:
+            destino = saida.with_name(f"{saida.name}_analise.json")
+            analise_json = serializar_analise(analise)
+            if resultado['datas_envio'] is not None:
+                analise_json['datas_envio'] = serializar_datas_envio(
+                    resultado['responsaveis_unicos'], resultado['datas_envio']
+                )
+            with open(destino, 'w', encoding='utf-8') as arquivo_json:
+                json.dump(analise_json, arquivo_json, ensure_ascii=False, indent=2, default=_converter_json)
+            resumo['saidas'].append(str(destino))
+        
+        if 'parquet' in formatos:
+            destino = saida.with_name(f"{saida.name}_status.parquet")
+            rotulos_meses = [analise['analise_mensal'][mes]['rotulo'] for mes in meses]
+            try:
+                AnalyticsEngine.status_como_dataframe(
+                    analise['status_individual'], rotulos_meses
+                ).to_parquet(destino, index=False)
+                resumo['saidas'].append(str(destino))
+            except ImportError as e:
+                logger.warning(f"Parquet indisponível ({str(e)}), saída ignorada para {caminho.name}")
+        
+        resumo.update({
+            'linhas_lidas': resultado['estatisticas_leitura']['linhas_lidas'],
+            'registros_validos': resultado['registros_validos'],
+            'conversao_datas': resultado['conversao_datas'],
+            'responsaveis': len(resultado['responsaveis_unicos']),
+            'janela': [f"{ano}-{mes:02d}" for ano, mes in meses],
+            'desempenho': monitor.registros
+        })
+        
+    except ArquivoInvalidoError as e:
+        resumo.update({'status': 'invalido', 'mensagem': str(e)})
+    except Exception as e:
+        logger.error(f"Erro ao processar {caminho.name}: {str(e)}")
+        resumo.update({'status': 'erro', 'mensagem': str(e)})
+    
+    resumo['tempo_s'] = round(time.perf_counter() - inicio_execucao, 3)
+    return resumo
+
+def executar_lote(diretorio: Path, diretorio_saida: Path, formatos: List[str], processos: Optional[int] = None,
+                  inicio: Optional[Tuple[int, int]] = None, fim: Optional[Tuple[int, int]] = None,
+                  recursivo: bool = False, streaming: bool = False,
+                  tamanho_bloco: int = TAMANHO_BLOCO_LEITURA) -> Dict:
+    """Processa todas as planilhas do diretório em paralelo e grava o resumo da execução"""
+    inicio_lote = time.perf_counter()
+    data_inicio = datetime.now().isoformat(timespec='seconds')
+    planilhas = listar_planilhas(diretorio, recursivo)
+    diretorio_saida.mkdir(parents=True, exist_ok=True)
+    logger.info(f"Lote: {len(planilhas)} planilhas encontradas em {diretorio}")
+    
+    arquivos = []
+    if planilhas:
+        processos = processos or min(len(planilhas), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            futuros = [
+                executor.submit(processar_arquivo, str(caminho), str(diretorio_saida), formatos, inicio, fim,
+                                streaming, tamanho_bloco, str(diretorio))
+                for caminho in planilhas
+            ]
+            for futuro in as_completed(futuros):
+                resumo_arquivo = futuro.result()
+                logger.info(f"{resumo_arquivo['arquivo']}: {resumo_arquivo['status']} "
+                            f"({resumo_arquivo['tempo_s']:.2f}s)")
+                arquivos.append(resumo_arquivo)
+    
+    arquivos.sort(key=lambda resumo_arquivo: resumo_arquivo['arquivo'])
+    resumo = {
+        'inicio': data_inicio,
+        'diretorio': str(diretorio),
+        'formatos': formatos,
+        'processos': processos,
+        'streaming': streaming,
+        'total_arquivos': len(arquivos),
+        'sucesso': sum(1 for resumo_arquivo in arquivos if resumo_arquivo['status'] == 'ok'),
+        'falhas': sum(1 for resumo_arquivo in arquivos if resumo_arquivo['status'] != 'ok'),
+        'tempo_total_s': round(time.perf_counter() - inicio_lote, 3),
+        'arquivos': arquivos
+    }
+    
+    with open(diretorio_saida / ARQUIVO_RESUMO, 'w', encoding='utf-8') as arquivo_resumo:
+        json.dump(resumo, arquivo_resumo, ensure_ascii=False, indent=2)
+    return resumo
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Processa em lote as planilhas de reports, sem abrir o painel Streamlit"
+    )
+    parser.add_argument('diretorio', type=Path, help="Diretório com as planilhas (.xlsx, .xls, .csv, .parquet, .arrow, .feather)")
+    parser.add_argument('-o', '--saida', type=Path, default=Path('saida_relatorios'),
+                        help="Diretório de saída (padrão: saida_relatorios)")
+    parser.add_argument('-f', '--formatos', nargs='+', choices=FORMATOS_SAIDA, default=FORMATOS_SAIDA,
+                        help="Formatos de saída (padrão: todos)")
+    parser.add_argument('-p', '--processos', type=int, default=None,
+                        help="Quantidade de processos (padrão: número de CPUs)")
+    parser.add_argument('--inicio', type=interpretar_mes, help="Primeiro mês da janela (AAAA-MM)")
+    parser.add_argument('--fim', type=interpretar_mes, help="Último mês da janela (AAAA-MM)")
+    parser.add_argument('-r', '--recursivo', action='store_true', help="Procurar planilhas em subdiretórios")
+    parser.add_argument('--streaming', action='store_true',
+                        help="Agregar bloco a bloco, sem carregar as linhas em memória (exportações muito grandes)")
+    parser.add_argument('--tamanho-bloco', type=int, default=TAMANHO_BLOCO_LEITURA,
+                        help=f"Linhas por bloco no modo streaming (padrão: {TAMANHO_BLOCO_LEITURA})")
+    args = parser.parse_args(argv)
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    
+    if not args.diretorio.is_dir():
+        parser.error(f"Diretório não encontrado: {args.diretorio}")
+    if args.tamanho_bloco < 1:
+        parser.error("--tamanho-bloco deve ser positivo")
+    
+    resumo = executar_lote(
+        args.diretorio, args.saida, args.formatos, args.processos, args.inicio, args.fim, args.recursivo,
+        args.streaming, args.tamanho_bloco
+    )
+    logger.info(f"Lote concluído: {resumo['sucesso']} ok, {resumo['falhas']} com falha, "
+                f"{resumo['tempo_total_s']:.2f}s")
+    return 0 if resumo['falhas'] == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
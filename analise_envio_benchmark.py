@@ -0,0 +1,304 @@
+import argparse
+import io
+import json
+import logging
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from analise_envio_core import (
+    AnalyticsEngine, DataProcessor, exportar_relatorio_excel, ler_fontes, rotulo_mes
+)
+
+logger = logging.getLogger(__name__)
+
+# Constantes
+TAMANHOS_PADRAO = [1_000, 10_000, 100_000, 1_000_000, 5_000_000]
+ESTAGIOS = [
+    'leitura', 'processar_dados', 'calcular_matriz_atividade', 'calcular_analise_mensal',
+    'calcular_status_individual', 'calcular_tendencias', 'grafico_evolucao', 'grafico_pizza',
+    'grafico_heatmap', 'exportar_relatorio_excel'
+]
+MAX_LINHAS_ABA = 1_048_575  # Limite do Excel, descontando o cabeçalho
+LIMIAR_REGRESSAO = 1.2
+FORMATOS_DATA_BAGUNCADOS = ['%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y %H:%M', '%m/%d/%Y']
+
+def gerar_dados_sinteticos(linhas: int, responsaveis: int, meses: int = 3, proporcao_duplicados: float = 0.05,
+                           proporcao_datas_baguncadas: float = 0.0, fim: Tuple[int, int] = (2025, 9),
+                           semente: int = 0) -> pd.DataFrame:
+    """Gera registros de envio com nomes, datas sujas e duplicatas controlados pelos parâmetros"""
+    rng = np.random.default_rng(semente)
+
+    # Período: `meses` meses terminando em `fim`
+    ano_fim, mes_fim = fim
+    codigo_inicio = ano_fim * 12 + mes_fim - 1 - (meses - 1)
+    inicio = pd.Timestamp(year=codigo_inicio // 12, month=codigo_inicio % 12 + 1, day=1)
+    dias = (pd.Timestamp(year=ano_fim, month=mes_fim, day=1) + pd.offsets.MonthEnd(0) - inicio).days + 1
+
+    linhas_unicas = max(1, int(round(linhas * (1 - proporcao_duplicados))))
+    nomes = np.array([f"Responsável {i:05d}" for i in range(responsaveis)], dtype=object)
+
+    # Nomes com espaços sobrando e alguns vazios, como nas planilhas reais
+    nomes_sorteados = nomes[rng.integers(0, responsaveis, linhas_unicas)]
+    com_espaco = rng.random(linhas_unicas) < 0.02
+    nomes_sorteados[com_espaco] = np.char.add(nomes_sorteados[com_espaco].astype(str), '  ')
+    nomes_sorteados[rng.random(linhas_unicas) < 0.01] = None
+
+    datas = inicio + pd.to_timedelta(rng.integers(0, dias * 24 * 60, linhas_unicas), unit='min')
+    df = pd.DataFrame({'RESPONSÁVEL': nomes_sorteados, 'DATA': datas})
+
+    # Duplicatas exatas de linhas já sorteadas
+    if linhas > linhas_unicas:
+        df = pd.concat([df, df.iloc[rng.integers(0, linhas_unicas, linhas - linhas_unicas)]], ignore_index=True)
+        df = df.iloc[rng.permutation(len(df))].reset_index(drop=True)
+
+    # Datas em formatos variados (texto, serial do Excel e valores inválidos)
+    if proporcao_datas_baguncadas > 0:
+        sujas = np.flatnonzero(rng.random(len(df)) < proporcao_datas_baguncadas)
+        coluna_data = df['DATA'].astype(object)
+        tipos = rng.integers(0, len(FORMATOS_DATA_BAGUNCADOS) + 2, len(sujas))
+        for tipo in range(len(FORMATOS_DATA_BAGUNCADOS)):
+            posicoes = sujas[tipos == tipo]
+            coluna_data.iloc[posicoes] = df['DATA'].iloc[posicoes].dt.strftime(FORMATOS_DATA_BAGUNCADOS[tipo]).values
+        posicoes = sujas[tipos == len(FORMATOS_DATA_BAGUNCADOS)]
+        coluna_data.iloc[posicoes] = (
+            (df['DATA'].iloc[posicoes] - pd.Timestamp('1899-12-30')) / pd.Timedelta(days=1)
+        ).round(4).values
+        coluna_data.iloc[sujas[tipos == len(FORMATOS_DATA_BAGUNCADOS) + 1]] = 'sem data'
+        df['DATA'] = coluna_data
+
+    return df
+
+def gerar_planilha_sintetica(df: pd.DataFrame) -> bytes:
+    """Grava os registros em .xlsx, dividindo em abas quando passar do limite de linhas do Excel"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    colunas = list(df.columns)
+    for numero_aba, inicio in enumerate(range(0, max(len(df), 1), MAX_LINHAS_ABA), start=1):
+        planilha = workbook.create_sheet(f"Reports {numero_aba}")
+        planilha.append(colunas)
+        bloco = df.iloc[inicio:inicio + MAX_LINHAS_ABA].astype(object)
+        for linha in bloco.where(bloco.notna(), None).itertuples(index=False, name=None):
+            planilha.append(linha)
+
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+def medir_estagio(funcao: Callable, repeticoes: int = 3, medir_memoria: bool = True) -> Tuple[object, Dict]:
+    """Mede o melhor tempo entre as repetições e, numa execução separada, o pico de memória alocada"""
+    tempos = []
+    resultado = None
+    for _ in range(max(1, repeticoes)):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+
+    pico_memoria_mb = None
+    if medir_memoria:
+        tracemalloc.start()
+        try:
+            funcao()
+            pico_memoria_mb = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+        finally:
+            tracemalloc.stop()
+
+    return resultado, {'tempo_s': min(tempos), 'tempos_s': tempos, 'pico_memoria_mb': pico_memoria_mb}
+
+def executar_tamanho(linhas: int, responsaveis: int, meses: int, proporcao_duplicados: float,
+                     proporcao_datas_baguncadas: float, estagios: List[str], repeticoes: int,
+                     medir_memoria: bool, semente: int = 0) -> List[Dict]:
+    """Executa todos os estágios pedidos para um tamanho de entrada"""
+    resultados = []
+
+    def registrar(estagio: str, funcao: Callable, linhas_entrada: int, contar_saida: Callable) -> object:
+        resultado, medicao = medir_estagio(funcao, repeticoes, medir_memoria)
+        medicao.update({
+            'estagio': estagio,
+            'linhas': linhas,
+            'responsaveis': responsaveis,
+            'meses': meses,
+            'linhas_entrada': linhas_entrada,
+            'linhas_saida': contar_saida(resultado),
+            'linhas_por_s': linhas_entrada / medicao['tempo_s'] if medicao['tempo_s'] > 0 else None,
+            'ok': resultado is not None
+        })
+        logger.info(f"{estagio} ({linhas:,} linhas): {medicao['tempo_s']:.4f}s")
+        resultados.append(medicao)
+        return resultado
+
+    df = gerar_dados_sinteticos(linhas, responsaveis, meses, proporcao_duplicados, proporcao_datas_baguncadas,
+                                semente=semente)
+
+    if 'leitura' in estagios:
+        conteudo = gerar_planilha_sintetica(df)
+        registrar('leitura', lambda: ler_fontes([('benchmark.xlsx', conteudo)], paralelo=False)[0],
+                  len(df), len)
+
+    df_processado = registrar('processar_dados', lambda: DataProcessor.processar_dados(df), len(df), len)
+    responsaveis_unicos = sorted(df_processado['RESPONSÁVEL'].dropna().unique())
+
+    # Estágios seguintes dependem dos anteriores: são sempre calculados, mas só medidos quando pedidos
+    def executar(estagio: str, funcao: Callable, linhas_entrada: int, contar_saida: Callable) -> object:
+        if estagio in estagios:
+            return registrar(estagio, funcao, linhas_entrada, contar_saida)
+        return funcao()
+
+    matriz = executar('calcular_matriz_atividade',
+                      lambda: AnalyticsEngine.calcular_matriz_atividade(df_processado, responsaveis_unicos),
+                      len(df_processado), lambda m: int(m['contagens'].size))
+    meses_janela = AnalyticsEngine.listar_meses_disponiveis(matriz)
+    rotulos_meses = [rotulo_mes(mes) for mes in meses_janela]
+
+    analise_mensal = executar('calcular_analise_mensal',
+                              lambda: AnalyticsEngine.calcular_analise_mensal(matriz, meses_janela),
+                              len(responsaveis_unicos), len)
+    status_individual = executar('calcular_status_individual',
+                                 lambda: AnalyticsEngine.calcular_status_individual(matriz, meses_janela),
+                                 len(responsaveis_unicos), lambda s: len(s['nomes']))
+    tendencias = executar('calcular_tendencias', lambda: AnalyticsEngine.calcular_tendencias(analise_mensal),
+                          len(analise_mensal), len)
+
+    if any(estagio.startswith('grafico_') for estagio in estagios):
+        from analise_envio_reports import ChartGenerator
+
+        executar('grafico_evolucao', lambda: ChartGenerator.criar_grafico_evolucao(analise_mensal, tendencias),
+                 len(analise_mensal), lambda fig: len(fig.data) if fig is not None else 0)
+        executar('grafico_pizza', lambda: ChartGenerator.criar_grafico_pizza_situacao(status_individual),
+                 len(responsaveis_unicos), lambda fig: len(fig.data) if fig is not None else 0)
+        linhas_pagina = AnalyticsEngine.ordenar_por_consistencia(status_individual)[:20]
+        executar('grafico_heatmap',
+                 lambda: ChartGenerator.criar_grafico_heatmap_consistencia(
+                     status_individual, rotulos_meses, linhas_pagina
+                 ),
+                 len(responsaveis_unicos), lambda fig: len(fig.data) if fig is not None else 0)
+
+    if 'exportar_relatorio_excel' in estagios:
+        registrar('exportar_relatorio_excel',
+                  lambda: exportar_relatorio_excel(analise_mensal, status_individual, responsaveis_unicos),
+                  len(responsaveis_unicos), lambda buffer: buffer.getbuffer().nbytes)
+
+    return resultados
+
+def obter_metadados(args: argparse.Namespace) -> Dict:
+    """Ambiente e parâmetros da execução, para comparar resultados entre máquinas e versões"""
+    import openpyxl
+
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+            cwd=Path(__file__).resolve().parent, timeout=10
+        ).stdout.strip() or None
+    except Exception:
+        commit = None
+
+    return {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'openpyxl': openpyxl.__version__,
+        'parametros': {
+            'tamanhos': args.tamanhos,
+            'responsaveis': args.responsaveis,
+            'meses': args.meses,
+            'proporcao_duplicados': args.duplicados,
+            'proporcao_datas_baguncadas': args.datas_baguncadas,
+            'estagios': args.estagios,
+            'repeticoes': args.repeticoes,
+            'medir_memoria': not args.sem_memoria,
+            'semente': args.semente
+        }
+    }
+
+def comparar_resultados(anteriores: List[Dict], atuais: List[Dict]) -> List[Dict]:
+    """Compara os tempos por estágio e tamanho com uma execução anterior"""
+    indice = {(r['estagio'], r['linhas']): r for r in anteriores}
+    comparacao = []
+    for atual in atuais:
+        anterior = indice.get((atual['estagio'], atual['linhas']))
+        if anterior is None or not anterior['tempo_s']:
+            continue
+        razao = atual['tempo_s'] / anterior['tempo_s']
+        comparacao.append({
+            'estagio': atual['estagio'],
+            'linhas': atual['linhas'],
+            'tempo_anterior_s': anterior['tempo_s'],
+            'tempo_atual_s': atual['tempo_s'],
+            'razao': razao,
+            'regressao': razao > LIMIAR_REGRESSAO
+        })
+    return comparacao
+
+def imprimir_resultados(resultados: List[Dict]) -> None:
+    """Tabela resumida dos resultados no terminal"""
+    print(f"{'Estágio':<28} {'Linhas':>10} {'Tempo (s)':>10} {'Linhas/s':>14} {'Pico (MB)':>10}")
+    for r in resultados:
+        vazao = f"{r['linhas_por_s']:,.0f}" if r['linhas_por_s'] else '-'
+        pico = f"{r['pico_memoria_mb']:.1f}" if r['pico_memoria_mb'] is not None else '-'
+        print(f"{r['estagio']:<28} {r['linhas']:>10,} {r['tempo_s']:>10.4f} {vazao:>14} {pico:>10}")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark dos estágios do painel com planilhas sintéticas")
+    parser.add_argument('-t', '--tamanhos', type=int, nargs='+', default=TAMANHOS_PADRAO,
+                        help="Quantidades de linhas a medir (padrão: 1k a 5M)")
+    parser.add_argument('-n', '--responsaveis', type=int, default=None,
+                        help="Quantidade de responsáveis (padrão: 1 para cada 100 linhas, mínimo 10)")
+    parser.add_argument('-m', '--meses', type=int, default=3, help="Meses cobertos pelos dados (padrão: 3)")
+    parser.add_argument('--duplicados', type=float, default=0.05, help="Proporção de linhas duplicadas")
+    parser.add_argument('--datas-baguncadas', type=float, default=0.0,
+                        help="Proporção de datas em texto, serial do Excel ou inválidas")
+    parser.add_argument('-e', '--estagios', nargs='+', choices=ESTAGIOS, default=ESTAGIOS,
+                        help="Estágios a medir (padrão: todos)")
+    parser.add_argument('-r', '--repeticoes', type=int, default=3, help="Repetições por estágio (vale o melhor tempo)")
+    parser.add_argument('--sem-memoria', action='store_true', help="Não medir o pico de memória (mais rápido)")
+    parser.add_argument('--semente', type=int, default=0, help="Semente dos dados sintéticos")
+    parser.add_argument('-o', '--saida', type=Path, default=None,
+                        help="Arquivo JSON de resultados (padrão: benchmark_<data>.json)")
+    parser.add_argument('-c', '--comparar', type=Path, default=None,
+                        help="Resultados de uma execução anterior para comparação")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    resultados = []
+    for linhas in args.tamanhos:
+        responsaveis = args.responsaveis or max(10, linhas // 100)
+        resultados.extend(executar_tamanho(
+            linhas, responsaveis, args.meses, args.duplicados, args.datas_baguncadas,
+            args.estagios, args.repeticoes, not args.sem_memoria, args.semente
+        ))
+
+    execucao = {'metadados': obter_metadados(args), 'resultados': resultados}
+
+    regressoes = []
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as arquivo_anterior:
+            execucao['comparacao'] = comparar_resultados(json.load(arquivo_anterior)['resultados'], resultados)
+        regressoes = [c for c in execucao['comparacao'] if c['regressao']]
+        for c in execucao['comparacao']:
+            marcador = ' ⚠️' if c['regressao'] else ''
+            print(f"{c['estagio']:<28} {c['linhas']:>10,} {c['tempo_anterior_s']:.4f}s → "
+                  f"{c['tempo_atual_s']:.4f}s ({c['razao']:.2f}x){marcador}")
+
+    saida = args.saida or Path(f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(saida, 'w', encoding='utf-8') as arquivo_saida:
+        json.dump(execucao, arquivo_saida, ensure_ascii=False, indent=2)
+
+    imprimir_resultados(resultados)
+    logger.info(f"Resultados gravados em {saida}")
+    return 1 if regressoes else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1903 @@
+import pandas as pd
+import numpy as np
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from contextlib import contextmanager
+import csv
+from datetime import date
+import hashlib
+import io
+import logging
+import os
+import pickle
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import unicodedata
+import warnings
+import zipfile
+from typing import Callable, Dict, Iterator, List, Tuple, Optional
+
+try:
+    import fcntl
+    import resource
+except ImportError:  # Windows
+    fcntl = None
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Constantes
+MESES_ANALISE = {7: 'Julho', 8: 'Agosto', 9: 'Setembro'}  # Janela padrão de análise
+ANO_ANALISE = 2025
+CATEGORIAS = ['ativo', 'parcial', 'pouco', 'inativo']  # Ordem dos códigos de categoria
+SITUACOES = {
+    'ativo': 'TOTALMENTE ATIVO',
+    'parcial': 'PARCIALMENTE ATIVO',
+    'pouco': 'POUCO ATIVO',
+    'inativo': 'INATIVO'
+}
+NOMES_MESES = {
+    1: 'Janeiro', 2: 'Fevereiro', 3: 'Março', 4: 'Abril', 5: 'Maio', 6: 'Junho',
+    7: 'Julho', 8: 'Agosto', 9: 'Setembro', 10: 'Outubro', 11: 'Novembro', 12: 'Dezembro'
+}
+COLUNAS_OBRIGATORIAS = ['RESPONSÁVEL', 'DATA']
+COLUNAS_EXTRAS: List[str] = []  # Colunas adicionais a preservar na leitura
+TAMANHO_BLOCO_LEITURA = 50_000
+LINHAS_BUSCA_CABECALHO = 10  # Linhas inspecionadas em cada aba para achar o cabeçalho
+EXTENSOES_FORMATO = {
+    '.xlsx': 'excel', '.xlsm': 'excel', '.xls': 'excel', '.csv': 'csv',
+    '.parquet': 'parquet', '.pq': 'parquet', '.arrow': 'arrow', '.feather': 'arrow', '.ipc': 'arrow'
+}
+CODIFICACOES_CSV = ['utf-8-sig', 'cp1252', 'latin-1']  # Tentadas em ordem; latin-1 aceita qualquer byte
+TAMANHO_AMOSTRA_CSV = 256 * 1024  # Bytes lidos para achar codificação, separador e cabeçalho
+COLUNA_ORIGEM = 'ORIGEM'  # Arquivo e aba de onde veio cada registro
+MAX_ENTRADAS_CACHE = 8
+MEMORIA_MAXIMA_CACHE_MB = float(os.environ.get('PAINEL_MEMORIA_CACHE_MB', 1024))  # Total, dividido entre os caches do painel
+REMOVER_ACENTOS_NOMES = True  # "João" e "Joao" contam como o mesmo responsável
+ALIASES_RESPONSAVEIS: Dict[str, str] = {}  # Grafia alternativa → nome oficial do responsável
+NOMES_INVALIDOS = {'', 'nan', 'none', 'null'}
+# Imagens dos gráficos nos relatórios PDF/PNG
+LARGURA_IMAGEM_RELATORIO = 1100
+ALTURA_IMAGEM_RELATORIO = 650
+ESCALA_IMAGEM_RELATORIO = 2
+# Formatos de data em texto, tentados em ordem sobre os valores ainda não reconhecidos
+FORMATOS_DATA = [
+    '%d/%m/%Y', '%d/%m/%Y %H:%M', '%d/%m/%Y %H:%M:%S', '%Y-%m-%d', '%Y-%m-%d %H:%M:%S',
+    '%d-%m-%Y', '%d-%m-%Y %H:%M', '%d.%m.%Y', '%m/%d/%Y'
+]
+ORIGEM_SERIAL_EXCEL = pd.Timestamp('1899-12-30')
+# 01/01/1900 até o último dia inteiro representável em datetime64[ns] (10/04/2262); seriais maiores são inválidos
+LIMITES_SERIAL_EXCEL = (1, (pd.Timestamp.max.date() - ORIGEM_SERIAL_EXCEL.date()).days - 1)
+MEDIR_MEMORIA = os.environ.get('PAINEL_MEDIR_MEMORIA') == '1'  # tracemalloc deixa a leitura ~6x mais lenta
+ARQUIVO_HISTORICO = os.environ.get('PAINEL_HISTORICO', 'historico_reports.sqlite')  # Base local de envios acumulados
+DIRETORIO_SNAPSHOT = os.environ.get('PAINEL_SNAPSHOT', 'snapshot_reports')  # Última análise salva em disco
+VERSAO_SNAPSHOT = 3  # Incrementar quando a estrutura dos resultados mudar
+
+def rotulo_mes(mes: Tuple[int, int]) -> str:
+    """Formata um par (ano, mês) como 'Julho 2025'"""
+    ano, mes_num = mes
+    return f"{NOMES_MESES[mes_num]} {ano}"
+
+def descrever_janela(meses: List[Tuple[int, int]]) -> str:
+    """Descreve a janela de análise, ex.: 'Julho 2025 a Setembro 2025'"""
+    if len(meses) == 1:
+        return rotulo_mes(meses[0])
+    return f"{rotulo_mes(meses[0])} a {rotulo_mes(meses[-1])}"
+
+class DataProcessor:
+    """Classe para processamento e validação de dados"""
+    
+    @staticmethod
+    def pre_validar_arquivo(conteudo, linhas_amostra: int = 0,
+                            formato: str = 'excel') -> Tuple[bool, str, List[Dict]]:
+        """Valida apenas o cabeçalho de cada aba, localizando as abas e linhas com as colunas obrigatórias"""
+        try:
+            # CSV e formatos colunares têm uma única "aba"; a localização leva o que a leitura precisa
+            extras_localizacao = {}
+            if formato == 'csv':
+                codificacao, separador, linhas = DataProcessor.amostrar_csv(
+                    conteudo, LINHAS_BUSCA_CABECALHO + linhas_amostra
+                )
+                abas = {None: linhas}
+                extras_localizacao = {'formato': formato, 'separador': separador, 'codificacao': codificacao}
+            elif formato in ('parquet', 'arrow'):
+                abas = {None: [tuple(DataProcessor.abrir_colunar(conteudo, formato)[1])]}
+                extras_localizacao = {'formato': formato}
+            elif conteudo.startswith(b'PK'):
+                from openpyxl import load_workbook
+                
+                workbook = load_workbook(io.BytesIO(conteudo), read_only=True, data_only=True)
+                try:
+                    abas = {
+                        planilha.title: list(planilha.iter_rows(
+                            max_row=LINHAS_BUSCA_CABECALHO + linhas_amostra, values_only=True
+                        ))
+                        for planilha in workbook.worksheets
+                    }
+                finally:
+                    workbook.close()
+            else:
+                abas = {
+                    nome: list(df.itertuples(index=False, name=None))
+                    for nome, df in pd.read_excel(
+                        io.BytesIO(conteudo), sheet_name=None, header=None,
+                        nrows=LINHAS_BUSCA_CABECALHO + linhas_amostra
+                    ).items()
+                }
+            
+            melhor_faltantes = list(COLUNAS_OBRIGATORIAS)
+            localizacoes = []
+            for nome_aba, linhas in abas.items():
+                for indice, linha in enumerate(linhas[:LINHAS_BUSCA_CABECALHO]):
+                    cabecalho = [str(valor).strip() if valor is not None else '' for valor in linha]
+                    faltantes = [col for col in COLUNAS_OBRIGATORIAS if col not in cabecalho]
+                    if len(faltantes) < len(melhor_faltantes):
+                        melhor_faltantes = faltantes
+                    if faltantes:
+                        continue
+                    
+                    # Conferir uma pequena amostra de linhas abaixo do cabeçalho
+                    if linhas_amostra:
+                        posicao = cabecalho.index('RESPONSÁVEL')
+                        amostra = linhas[indice + 1:indice + 1 + linhas_amostra]
+                        if amostra and all(
+                            posicao >= len(valores) or valores[posicao] is None
+                            or str(valores[posicao]).strip() in ('', 'nan')
+                            for valores in amostra
+                        ):
+                            continue
+                    
+                    localizacoes.append({'aba': nome_aba, 'linha_cabecalho': indice, **extras_localizacao})
+                    break
+            
+            if not localizacoes:
+                return False, f"Colunas obrigatórias não encontradas: {', '.join(melhor_faltantes)}", []
+            
+            if formato != 'excel':
+                linha = localizacoes[0]['linha_cabecalho'] + 1
+                return True, f"Cabeçalho encontrado ({formato}, linha {linha})", localizacoes
+            descricao = ', '.join(f"'{loc['aba']}' (linha {loc['linha_cabecalho'] + 1})" for loc in localizacoes)
+            return True, f"Cabeçalho encontrado nas abas: {descricao}", localizacoes
+            
+        except Exception as e:
+            logger.error(f"Erro na pré-validação: {str(e)}")
+            return False, f"Erro na pré-validação: {str(e)}", []
+    
+    @staticmethod
+    def ler_planilha(conteudo: bytes, colunas_extras: Optional[List[str]] = None,
+                     tamanho_bloco: int = TAMANHO_BLOCO_LEITURA, aba: Optional[str] = None,
+                     linha_cabecalho: int = 0) -> Tuple[pd.DataFrame, Dict]:
+        """Lê apenas as colunas necessárias de uma aba, em blocos e em modo somente leitura"""
+        colunas_desejadas = DataProcessor.colunas_leitura(colunas_extras)
+        
+        # Arquivos .xls (formato binário antigo) não são suportados pelo openpyxl
+        if not conteudo.startswith(b'PK'):
+            df = pd.read_excel(
+                io.BytesIO(conteudo),
+                sheet_name=aba if aba is not None else 0,
+                header=linha_cabecalho,
+                usecols=lambda col: str(col).strip() in colunas_desejadas
+            )
+            return DataProcessor._finalizar_leitura(df, 'xls')
+        
+        estatisticas = {'linhas_lidas': 0, 'linhas_ignoradas': 0}
+        blocos = list(DataProcessor.iterar_planilha(
+            conteudo, colunas_desejadas, tamanho_bloco, aba, linha_cabecalho, estatisticas
+        ))
+        df = pd.concat(blocos, ignore_index=True).infer_objects().fillna(np.nan)
+        logger.info(f"Leitura: {estatisticas['linhas_lidas']} linhas lidas, "
+                    f"{estatisticas['linhas_ignoradas']} ignoradas, colunas: {', '.join(df.columns)}")
+        return df, estatisticas
+    
+    @staticmethod
+    def iterar_planilha(conteudo: bytes, colunas_desejadas: List[str], tamanho_bloco: int = TAMANHO_BLOCO_LEITURA,
+                        aba: Optional[str] = None, linha_cabecalho: int = 0,
+                        estatisticas: Optional[Dict] = None) -> Iterator[pd.DataFrame]:
+        """Percorre uma aba .xlsx em modo somente leitura, entregando blocos com as colunas desejadas"""
+        from openpyxl import load_workbook
+        
+        estatisticas = estatisticas if estatisticas is not None else {'linhas_lidas': 0, 'linhas_ignoradas': 0}
+        workbook = load_workbook(io.BytesIO(conteudo), read_only=True, data_only=True)
+        try:
+            planilha = workbook[aba] if aba is not None else workbook.worksheets[0]
+            linhas = planilha.iter_rows(min_row=linha_cabecalho + 1, values_only=True)
+            cabecalho = next(linhas, ())
+            
+            # Posição de cada coluna desejada no cabeçalho (primeira ocorrência)
+            posicoes = {}
+            for posicao, valor in enumerate(cabecalho):
+                nome = str(valor).strip() if valor is not None else None
+                if nome in colunas_desejadas and nome not in posicoes:
+                    posicoes[nome] = posicao
+            nomes = list(posicoes.keys())
+            indices = list(posicoes.values())
+            
+            bloco = []
+            entregues = 0
+            for linha in linhas:
+                estatisticas['linhas_lidas'] += 1
+                valores = tuple(linha[i] if i < len(linha) else None for i in indices)
+                if all(valor is None for valor in valores):
+                    estatisticas['linhas_ignoradas'] += 1
+                    continue
+                bloco.append(valores)
+                if len(bloco) >= tamanho_bloco:
+                    yield pd.DataFrame.from_records(bloco, columns=nomes)
+                    entregues += 1
+                    bloco = []
+            
+            # Sempre ao menos um bloco (mesmo vazio), para que as colunas sejam conhecidas
+            if bloco or not entregues:
+                yield pd.DataFrame.from_records(bloco, columns=nomes)
+        finally:
+            workbook.close()
+    
+    @staticmethod
+    def detectar_formato(nome_arquivo: str, fonte) -> str:
+        """Identifica o formato pela extensão do arquivo ou, sem extensão conhecida, pelos primeiros bytes"""
+        extensao = os.path.splitext(nome_arquivo)[1].lower()
+        if extensao in EXTENSOES_FORMATO:
+            return EXTENSOES_FORMATO[extensao]
+        
+        if isinstance(fonte, (bytes, bytearray, memoryview)):
+            inicio = bytes(fonte[:8])
+        else:
+            with open(fonte, 'rb') as arquivo:
+                inicio = arquivo.read(8)
+        if inicio.startswith(b'PAR1'):
+            return 'parquet'
+        if inicio.startswith(b'ARROW1'):
+            return 'arrow'
+        return 'excel'
+    
+    @staticmethod
+    def amostrar_csv(fonte, max_linhas: int) -> Tuple[str, str, List[List[str]]]:
+        """Lê o início de um CSV, identificando a codificação e o separador; retorna também as primeiras linhas"""
+        if isinstance(fonte, (bytes, bytearray, memoryview)):
+            inicio = bytes(fonte[:TAMANHO_AMOSTRA_CSV])
+        else:
+            with open(fonte, 'rb') as arquivo:
+                inicio = arquivo.read(TAMANHO_AMOSTRA_CSV)
+        if len(inicio) == TAMANHO_AMOSTRA_CSV and b'\n' in inicio:
+            inicio = inicio[:inicio.rindex(b'\n')]  # Sem a última linha, que pode estar cortada
+        
+        for codificacao in CODIFICACOES_CSV:
+            try:
+                texto = inicio.decode(codificacao)
+                break
+            except UnicodeDecodeError:
+                continue
+        
+        linhas_texto = texto.splitlines()[:max_linhas]
+        try:
+            separador = csv.Sniffer().sniff('\n'.join(linhas_texto), delimiters=';,\t|').delimiter
+        except csv.Error:
+            separador = max(';,\t|', key=lambda candidato: linhas_texto[0].count(candidato) if linhas_texto else 0)
+        
+        linhas = [[valor if valor != '' else None for valor in linha]
+                  for linha in csv.reader(linhas_texto, delimiter=separador)]
+        return codificacao, separador, linhas
+    
+    @staticmethod
+    def ler_csv(fonte, linha_cabecalho: int = 0, separador: str = ',', codificacao: str = 'utf-8-sig',
+                colunas_extras: Optional[List[str]] = None) -> Tuple[pd.DataFrame, Dict]:
+        """Lê apenas as colunas necessárias de um CSV (tudo como texto, como na planilha)"""
+        colunas_desejadas = DataProcessor.colunas_leitura(colunas_extras)
+        df = pd.read_csv(
+            io.BytesIO(fonte) if isinstance(fonte, (bytes, bytearray)) else fonte,
+            sep=separador,
+            encoding=codificacao,
+            skiprows=linha_cabecalho,
+            usecols=lambda col: str(col).strip() in colunas_desejadas,
+            dtype=str,
+            skipinitialspace=True
+        )
+        return DataProcessor._finalizar_leitura(df, 'csv')
+    
+    @staticmethod
+    def ler_colunar(fonte, formato: str, colunas_extras: Optional[List[str]] = None) -> Tuple[pd.DataFrame, Dict]:
+        """Lê só as colunas necessárias de um Parquet ou Arrow IPC (arquivos locais são mapeados em memória)"""
+        colunas_desejadas = DataProcessor.colunas_leitura(colunas_extras)
+        leitor, nomes = DataProcessor.abrir_colunar(fonte, formato)
+        posicoes = DataProcessor.posicoes_colunas(nomes, colunas_desejadas)
+        
+        if formato == 'parquet':
+            tabela = leitor.read(columns=[nomes[posicao] for posicao in posicoes.values()])
+        else:
+            # Com o arquivo mapeado, read_all não copia dados; só as colunas escolhidas vão para o pandas
+            tabela = leitor.read_all().select(list(posicoes.values()))
+        return DataProcessor._finalizar_leitura(DataProcessor.tabela_arrow_para_pandas(tabela, posicoes), formato)
+    
+    @staticmethod
+    def posicoes_colunas(nomes: List[str], colunas_desejadas: List[str]) -> Dict[str, int]:
+        """Posição da primeira coluna de cada nome desejado, comparando sem espaços nas pontas"""
+        posicoes = {}
+        for posicao, nome in enumerate(nomes):
+            if nome.strip() in colunas_desejadas and nome.strip() not in posicoes:
+                posicoes[nome.strip()] = posicao
+        return posicoes
+    
+    @staticmethod
+    def tabela_arrow_para_pandas(tabela, posicoes: Dict[str, int]) -> pd.DataFrame:
+        """Converte as colunas lidas (na ordem de posicoes) para pandas, com os nomes padronizados"""
+        df = tabela.to_pandas()
+        df.columns = list(posicoes.keys())
+        
+        # Colunas dicionário viram category no pandas; o processamento espera os valores
+        for coluna in df.columns:
+            if isinstance(df[coluna].dtype, pd.CategoricalDtype):
+                df[coluna] = df[coluna].astype(object)
+        return df
+    
+    @staticmethod
+    def abrir_colunar(fonte, formato: str) -> Tuple[object, List[str]]:
+        """Abre um Parquet ou Arrow IPC sem ler os dados, retornando o leitor e os nomes das colunas"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        local = not isinstance(fonte, (bytes, bytearray, memoryview))
+        if formato == 'parquet':
+            leitor = pq.ParquetFile(fonte, memory_map=True) if local else pq.ParquetFile(pa.BufferReader(fonte))
+            return leitor, leitor.schema_arrow.names
+        leitor = pa.ipc.open_file(pa.memory_map(str(fonte), 'r') if local else pa.BufferReader(fonte))
+        return leitor, leitor.schema.names
+    
+    @staticmethod
+    def colunas_leitura(colunas_extras: Optional[List[str]] = None) -> List[str]:
+        """Colunas obrigatórias seguidas das colunas extras a preservar"""
+        return list(COLUNAS_OBRIGATORIAS) + [
+            col for col in (colunas_extras if colunas_extras is not None else COLUNAS_EXTRAS)
+            if col not in COLUNAS_OBRIGATORIAS
+        ]
+    
+    @staticmethod
+    def padronizar_bloco(df: pd.DataFrame, estatisticas: Dict) -> pd.DataFrame:
+        """Padroniza os nomes das colunas e descarta linhas vazias, somando as linhas lidas e ignoradas"""
+        df.columns = [str(col).strip() for col in df.columns]
+        linhas_lidas = len(df)
+        df = df.dropna(how='all')
+        estatisticas['linhas_lidas'] += linhas_lidas
+        estatisticas['linhas_ignoradas'] += linhas_lidas - len(df)
+        return df
+    
+    @staticmethod
+    def _finalizar_leitura(df: pd.DataFrame, formato: str) -> Tuple[pd.DataFrame, Dict]:
+        """Padroniza os nomes das colunas e descarta linhas vazias, como na leitura das planilhas"""
+        estatisticas = {'linhas_lidas': 0, 'linhas_ignoradas': 0}
+        df = DataProcessor.padronizar_bloco(df, estatisticas)
+        logger.info(f"Leitura ({formato}): {estatisticas['linhas_lidas']} linhas lidas, "
+                    f"{estatisticas['linhas_ignoradas']} ignoradas")
+        return df.reset_index(drop=True), estatisticas
+    
+    @staticmethod
+    def validar_arquivo(df: pd.DataFrame) -> Tuple[bool, str]:
+        """Valida se o arquivo possui as colunas necessárias"""
+        try:
+            colunas_faltantes = [col for col in COLUNAS_OBRIGATORIAS if col not in df.columns]
+            
+            if colunas_faltantes:
+                return False, f"Colunas obrigatórias não encontradas: {', '.join(colunas_faltantes)}"
+            
+            if df.empty:
+                return False, "O arquivo está vazio"
+            
+            if df['RESPONSÁVEL'].isna().all():
+                return False, "Coluna RESPONSÁVEL não possui dados válidos"
+            
+            return True, "Arquivo válido"
+            
+        except Exception as e:
+            logger.error(f"Erro na validação: {str(e)}")
+            return False, f"Erro na validação: {str(e)}"
+    
+    @staticmethod
+    def chave_nome(nome: str, remover_acentos: bool = REMOVER_ACENTOS_NOMES) -> str:
+        """Chave de comparação de um nome: espaços colapsados, sem diferença de maiúsculas e, opcionalmente, de acentos"""
+        chave = ' '.join(nome.split()).casefold()
+        if remover_acentos:
+            chave = ''.join(c for c in unicodedata.normalize('NFKD', chave) if not unicodedata.combining(c))
+        return chave
+    
+    @staticmethod
+    def normalizar_responsaveis(serie: pd.Series, remover_acentos: bool = REMOVER_ACENTOS_NOMES,
+                                aliases: Optional[Dict[str, str]] = None) -> pd.Series:
+        """Unifica as grafias de cada responsável, normalizando cada nome distinto uma única vez"""
+        aliases = ALIASES_RESPONSAVEIS if aliases is None else aliases
+        codigos, unicos = pd.factorize(serie)
+        frequencias = np.bincount(codigos[codigos >= 0], minlength=len(unicos))
+        
+        # Alias → chave do nome oficial (o nome oficial também é a grafia exibida)
+        chaves_aliases = {
+            DataProcessor.chave_nome(alias, remover_acentos): DataProcessor.chave_nome(oficial, remover_acentos)
+            for alias, oficial in aliases.items()
+        }
+        nomes_oficiais = {DataProcessor.chave_nome(oficial, remover_acentos): ' '.join(oficial.split())
+                          for oficial in aliases.values()}
+        
+        # Chave de cada valor distinto e frequência de cada grafia dentro da chave
+        chaves = []
+        grafias_por_chave: Dict[str, Dict[str, int]] = {}
+        for valor, frequencia in zip(unicos, frequencias):
+            grafia = ' '.join(str(valor).split())
+            chave = DataProcessor.chave_nome(grafia, remover_acentos)
+            if chave in NOMES_INVALIDOS:
+                chaves.append(None)
+                continue
+            chave = chaves_aliases.get(chave, chave)
+            chaves.append(chave)
+            grafias = grafias_por_chave.setdefault(chave, {})
+            grafias[grafia] = grafias.get(grafia, 0) + int(frequencia)
+        
+        # Exibe o nome oficial (alias) ou a grafia mais frequente
+        nome_exibido = {
+            chave: nomes_oficiais.get(chave) or max(grafias, key=grafias.get)
+            for chave, grafias in grafias_por_chave.items()
+        }
+        nomes = np.array([nome_exibido.get(chave) for chave in chaves] + [None], dtype=object)
+        logger.info(f"Responsáveis: {len(unicos)} grafias distintas unificadas em {len(nome_exibido)} nomes")
+        return pd.Series(nomes[codigos], index=serie.index, name=serie.name)
+    
+    @staticmethod
+    def converter_datas(serie: pd.Series) -> Tuple[pd.Series, Dict[str, int]]:
+        """Converte datas em formatos mistos analisando cada valor distinto uma única vez"""
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            if getattr(serie.dt, 'tz', None) is not None:
+                serie = serie.dt.tz_localize(None)  # Mantém o horário local, como nos demais caminhos
+            return serie, {'datas nativas': int(serie.notna().sum()), 'vazias': int(serie.isna().sum())}
+        
+        # Valores distintos (-1 nos códigos = vazio)
+        codigos, unicos = pd.factorize(serie)
+        unicos = np.asarray(unicos, dtype=object)
+        datas = np.full(len(unicos) + 1, np.datetime64('NaT'), dtype='datetime64[ns]')
+        origens = ['datas nativas', 'serial do Excel'] + FORMATOS_DATA + ['outros formatos']
+        origem = np.full(len(unicos) + 1, -1, dtype=np.int16)
+        
+        def resolver(posicoes: np.ndarray, convertidas, indice_origem: int) -> None:
+            convertidas = np.asarray(convertidas, dtype='datetime64[ns]')
+            validas = ~np.isnat(convertidas)
+            datas[posicoes[validas]] = convertidas[validas]
+            origem[posicoes[validas]] = indice_origem
+        
+        def converter_serial(valores: np.ndarray) -> np.ndarray:
+            valores = np.where(
+                (valores >= LIMITES_SERIAL_EXCEL[0]) & (valores <= LIMITES_SERIAL_EXCEL[1]), valores, np.nan
+            )
+            return pd.to_datetime(valores, unit='D', origin=ORIGEM_SERIAL_EXCEL).values
+        
+        # Separar por tipo: datas, números (serial do Excel) e textos
+        e_data = np.fromiter((isinstance(v, (date, np.datetime64)) for v in unicos), bool, len(unicos))
+        e_numero = np.fromiter(
+            (isinstance(v, (int, float, np.number)) and not isinstance(v, bool) for v in unicos), bool, len(unicos)
+        )
+        e_texto = np.fromiter((isinstance(v, str) for v in unicos), bool, len(unicos))
+        
+        posicoes = np.flatnonzero(e_data)
+        if len(posicoes):
+            valores = unicos[posicoes]
+            if any(getattr(valor, 'tzinfo', None) is not None for valor in valores):
+                # Datas com fuso horário: mantém o horário local de cada valor
+                valores = [pd.Timestamp(valor).tz_localize(None) for valor in valores]
+            resolver(posicoes, pd.to_datetime(valores, errors='coerce'), 0)
+        
+        posicoes = np.flatnonzero(e_numero)
+        if len(posicoes):
+            resolver(posicoes, converter_serial(unicos[posicoes].astype(float)), 1)
+        
+        posicoes = np.flatnonzero(e_texto)
+        if len(posicoes):
+            textos = pd.Series(unicos[posicoes]).str.strip()
+            
+            # Seriais gravados como texto
+            numeros = pd.to_numeric(textos, errors='coerce').to_numpy(dtype=float)
+            resolver(posicoes, converter_serial(numeros), 1)
+            
+            # Cada formato só é tentado nos textos que ainda não foram reconhecidos
+            for indice_formato, formato in enumerate(FORMATOS_DATA, start=2):
+                pendentes = np.flatnonzero(origem[posicoes] < 0)
+                if not len(pendentes):
+                    break
+                resolver(posicoes[pendentes],
+                         pd.to_datetime(textos.iloc[pendentes], format=formato, errors='coerce'), indice_formato)
+            
+            pendentes = np.flatnonzero(origem[posicoes] < 0)
+            if len(pendentes):
+                with warnings.catch_warnings():
+                    warnings.simplefilter('ignore')
+                    convertidas = pd.to_datetime(
+                        textos.iloc[pendentes], format='mixed', dayfirst=True, errors='coerce'
+                    )
+                # Textos com fuso horário: remove o fuso de cada valor, mantendo o horário local
+                if isinstance(convertidas.dtype, pd.DatetimeTZDtype):
+                    convertidas = convertidas.dt.tz_localize(None)
+                elif convertidas.dtype == object:
+                    convertidas = pd.to_datetime([
+                        pd.Timestamp(valor).tz_localize(None) if getattr(valor, 'tzinfo', None) is not None else valor
+                        for valor in convertidas
+                    ])
+                resolver(posicoes[pendentes], convertidas, len(origens) - 1)
+        
+        # Contagem por linha: quantos valores cada origem resolveu
+        contagens = np.bincount(origem[codigos] + 1, minlength=len(origens) + 1)
+        conversao = {rotulo: int(qtd) for rotulo, qtd in zip(origens, contagens[1:]) if qtd}
+        vazias = int((codigos < 0).sum())
+        conversao['inválidas'] = int(contagens[0]) - vazias
+        conversao['vazias'] = vazias
+        
+        return pd.Series(datas[codigos], index=serie.index, name=serie.name), conversao
+    
+    @staticmethod
+    def processar_dados(df: pd.DataFrame) -> pd.DataFrame:
+        """Processa os dados da planilha com tratamento de erros robusto"""
+        try:
+            # Criar cópia para não modificar o original
+            df_processado = df.copy()
+            
+            # Normalizar nomes dos responsáveis (espaços, maiúsculas, acentos e aliases)
+            df_processado['RESPONSÁVEL'] = DataProcessor.normalizar_responsaveis(df_processado['RESPONSÁVEL'])
+            
+            # Remover linhas com responsáveis vazios ou inválidos
+            df_processado = df_processado[df_processado['RESPONSÁVEL'].notna()]
+            
+            # Converter coluna de data (datas, seriais do Excel e textos em formatos variados)
+            df_processado['DATA'], conversao_datas = DataProcessor.converter_datas(df_processado['DATA'])
+            logger.info("Datas: " + ", ".join(f"{origem}: {qtd}" for origem, qtd in conversao_datas.items()))
+            
+            # Remover linhas com datas inválidas
+            df_processado = df_processado[df_processado['DATA'].notna()]
+            
+            # Adicionar colunas derivadas
+            df_processado['ANO'] = df_processado['DATA'].dt.year
+            df_processado['MES'] = df_processado['DATA'].dt.month
+            df_processado['MES_NOME'] = df_processado['DATA'].dt.strftime('%B')
+            df_processado['DIA_SEMANA'] = df_processado['DATA'].dt.day_name()
+            
+            # Remover duplicatas
+            df_processado = df_processado.drop_duplicates(subset=['RESPONSÁVEL', 'DATA'])
+            
+            df_processado.attrs['conversao_datas'] = conversao_datas
+            logger.info(f"Dados processados: {len(df_processado)} registros válidos")
+            return df_processado
+            
+        except Exception as e:
+            logger.error(f"Erro no processamento: {str(e)}")
+            raise Exception(f"Erro ao processar dados: {str(e)}")
+
+class AnalyticsEngine:
+    """Classe para cálculos e análises"""
+    
+    @staticmethod
+    def calcular_matriz_atividade(df: pd.DataFrame, responsaveis_unicos: List[str]) -> Dict:
+        """Monta a matriz responsável × mês com a quantidade de envios em todos os meses dos dados"""
+        try:
+            # Mês codificado como inteiro contínuo: ano * 12 + (mês - 1)
+            codigos_periodo = (df['ANO'].to_numpy(dtype=np.int64) * 12 + df['MES'].to_numpy(dtype=np.int64) - 1)
+            periodos, codigos_coluna = np.unique(codigos_periodo, return_inverse=True)
+            
+            # Códigos inteiros de responsável, contados numa única passada
+            codigos_resp = pd.Index(responsaveis_unicos).get_indexer(df['RESPONSÁVEL'])
+            validos = codigos_resp >= 0
+            
+            contagens = np.bincount(
+                codigos_resp[validos] * len(periodos) + codigos_coluna[validos],
+                minlength=len(responsaveis_unicos) * len(periodos)
+            ).reshape(len(responsaveis_unicos), len(periodos))
+            
+            return {
+                'nomes': np.asarray(responsaveis_unicos, dtype=object),
+                'periodos': periodos,
+                'contagens': contagens
+            }
+            
+        except Exception as e:
+            logger.error(f"Erro na matriz de atividade: {str(e)}")
+            raise Exception(f"Erro ao calcular matriz de atividade: {str(e)}")
+    
+    @staticmethod
+    def calcular_datas_envio(df: pd.DataFrame, responsaveis_unicos: List[str]) -> Dict:
+        """Primeiro e último envio de cada responsável, alinhados com responsaveis_unicos"""
+        try:
+            extremos = df.groupby('RESPONSÁVEL')['DATA'].agg(['min', 'max']).reindex(responsaveis_unicos)
+            return {
+                'primeiro_envio': extremos['min'].to_numpy(dtype='datetime64[ns]'),
+                'ultimo_envio': extremos['max'].to_numpy(dtype='datetime64[ns]')
+            }
+            
+        except Exception as e:
+            logger.error(f"Erro nas datas de envio: {str(e)}")
+            raise Exception(f"Erro ao calcular datas de envio: {str(e)}")
+    
+    @staticmethod
+    def listar_meses_disponiveis(matriz: Dict) -> List[Tuple[int, int]]:
+        """Lista, em sequência contínua, os meses entre o primeiro e o último envio"""
+        if len(matriz['periodos']) == 0:
+            return []
+        inicio, fim = int(matriz['periodos'][0]), int(matriz['periodos'][-1])
+        return [(codigo // 12, codigo % 12 + 1) for codigo in range(inicio, fim + 1)]
+    
+    @staticmethod
+    def fatiar_matriz(matriz: Dict, meses: List[Tuple[int, int]]) -> np.ndarray:
+        """Seleciona as colunas dos meses da janela (meses sem envios viram colunas zeradas)"""
+        codigos = np.array([ano * 12 + mes - 1 for ano, mes in meses], dtype=np.int64)
+        posicoes = pd.Index(matriz['periodos']).get_indexer(codigos)
+        
+        fatia = np.zeros((len(matriz['nomes']), len(meses)), dtype=matriz['contagens'].dtype)
+        presentes = posicoes >= 0
+        fatia[:, presentes] = matriz['contagens'][:, posicoes[presentes]]
+        return fatia
+    
+    @staticmethod
+    def calcular_analise_mensal(matriz: Dict, meses: List[Tuple[int, int]]) -> Dict:
+        """Calcula análise por mês com métricas adicionais"""
+        try:
+            contagens = AnalyticsEngine.fatiar_matriz(matriz, meses)
+            nomes = matriz['nomes']
+            total_responsaveis = len(nomes)
+            
+            analise = {}
+            
+            for indice, (ano, mes_num) in enumerate(meses):
+                # Um vetor booleano por mês, alinhado com responsaveis_unicos
+                mascara_enviaram = contagens[:, indice] > 0
+                qtd_enviaram = int(mascara_enviaram.sum())
+                qtd_nao_enviaram = total_responsaveis - qtd_enviaram
+                
+                # Calcular métricas adicionais
+                total_envios = int(contagens[:, indice].sum())
+                media_envios_por_responsavel = total_envios / qtd_enviaram if qtd_enviaram else 0
+                
+                analise[(ano, mes_num)] = {
+                    'mes_nome': NOMES_MESES[mes_num],
+                    'rotulo': rotulo_mes((ano, mes_num)),
+                    'total_registros': total_envios,
+                    'nomes_responsaveis': nomes,
+                    'mascara_enviaram': mascara_enviaram,
+                    # Posições (em ordem alfabética) de quem enviou e de quem não enviou, para as listas paginadas
+                    'indices_enviaram': np.flatnonzero(mascara_enviaram).astype(np.uint32),
+                    'indices_nao_enviaram': np.flatnonzero(~mascara_enviaram).astype(np.uint32),
+                    'qtd_enviaram': qtd_enviaram,
+                    'qtd_nao_enviaram': qtd_nao_enviaram,
+                    'taxa_envio': (qtd_enviaram / total_responsaveis) * 100,
+                    'media_envios_por_responsavel': media_envios_por_responsavel,
+                    'total_responsaveis': total_responsaveis
+                }
+            
+            return analise
+            
+        except Exception as e:
+            logger.error(f"Erro na análise mensal: {str(e)}")
+            raise Exception(f"Erro ao calcular análise mensal: {str(e)}")
+    
+    @staticmethod
+    def listar_responsaveis(dados_mes: Dict, enviaram: bool = True) -> List[str]:
+        """Gera sob demanda a lista ordenada de quem enviou (ou não) no mês"""
+        indices = dados_mes['indices_enviaram'] if enviaram else dados_mes['indices_nao_enviaram']
+        return dados_mes['nomes_responsaveis'][indices].tolist()
+    
+    @staticmethod
+    def filtrar_por_nome(indices: np.ndarray, chaves_busca: np.ndarray, termo: str) -> np.ndarray:
+        """Mantém os índices cujo nome contém o termo (sem diferença de maiúsculas, espaços e acentos)"""
+        chave_termo = DataProcessor.chave_nome(termo)
+        if not chave_termo:
+            return indices
+        encontrados = np.fromiter((chave_termo in chave for chave in chaves_busca[indices]), bool, len(indices))
+        return indices[encontrados]
+    
+    @staticmethod
+    def classificar_situacao(meses_ativos: int, total_meses: int) -> Tuple[str, str]:
+        """Retorna situação e categoria conforme a fração de meses com envio"""
+        if total_meses and meses_ativos == total_meses:
+            return 'TOTALMENTE ATIVO', 'ativo'
+        elif meses_ativos and meses_ativos * 2 >= total_meses:
+            return 'PARCIALMENTE ATIVO', 'parcial'
+        elif meses_ativos:
+            return 'POUCO ATIVO', 'pouco'
+        return 'INATIVO', 'inativo'
+    
+    @staticmethod
+    def calcular_status_individual(matriz: Dict, meses: List[Tuple[int, int]]) -> Dict:
+        """Calcula status individual em formato colunar (um array por campo, alinhado com os nomes)"""
+        try:
+            contagens = AnalyticsEngine.fatiar_matriz(matriz, meses)
+            enviou = contagens > 0
+            meses_ativos = enviou.sum(axis=1).astype(np.uint16)
+            
+            # Código de categoria indexado pela quantidade de meses ativos
+            tabela_categorias = np.array([
+                CATEGORIAS.index(AnalyticsEngine.classificar_situacao(n, len(meses))[1])
+                for n in range(len(meses) + 1)
+            ], dtype=np.int8)
+            
+            return {
+                'meses': list(meses),
+                'nomes': matriz['nomes'],
+                'mascara_meses': np.packbits(enviou, axis=1),  # Bit j = enviou no j-ésimo mês
+                'meses_ativos': meses_ativos,
+                'total_envios': contagens.sum(axis=1),
+                'codigos_categoria': tabela_categorias[meses_ativos]
+            }
+            
+        except Exception as e:
+            logger.error(f"Erro no status individual: {str(e)}")
+            raise Exception(f"Erro ao calcular status individual: {str(e)}")
+    
+    @staticmethod
+    def expandir_meses(status: Dict, linhas: Optional[np.ndarray] = None) -> np.ndarray:
+        """Converte a máscara de bits em matriz booleana responsável × mês (opcionalmente só das linhas pedidas)"""
+        mascara = status['mascara_meses'] if linhas is None else status['mascara_meses'][linhas]
+        return np.unpackbits(mascara, axis=1, count=len(status['meses'])).astype(bool)
+    
+    @staticmethod
+    def ordenar_por_consistencia(status: Dict) -> np.ndarray:
+        """Índices dos responsáveis do mais ao menos consistente (meses ativos, depois total de envios)"""
+        return np.lexsort((-status['total_envios'].astype(np.int64), -status['meses_ativos'].astype(np.int32)))
+    
+    @staticmethod
+    def calcular_consistencia(status: Dict) -> np.ndarray:
+        """Percentual de meses da janela com envio, por responsável"""
+        return (status['meses_ativos'] / max(len(status['meses']), 1)) * 100
+    
+    @staticmethod
+    def listar_situacoes(status: Dict) -> np.ndarray:
+        """Descrição da situação de cada responsável, a partir do código de categoria"""
+        return np.array([SITUACOES[cat] for cat in CATEGORIAS])[status['codigos_categoria']]
+    
+    @staticmethod
+    def status_como_dataframe(status: Dict, rotulos_meses: List[str]) -> pd.DataFrame:
+        """Monta a tabela de status individual com os valores brutos (sem formatação)"""
+        meses_enviou = AnalyticsEngine.expandir_meses(status)
+        df_status = pd.DataFrame({'Responsável': status['nomes']})
+        for indice, rotulo in enumerate(rotulos_meses):
+            df_status[rotulo] = meses_enviou[:, indice]
+        df_status['Meses Ativos'] = status['meses_ativos']
+        df_status['Total de Envios'] = status['total_envios']
+        df_status['Consistência (%)'] = AnalyticsEngine.calcular_consistencia(status)
+        df_status['Situação'] = AnalyticsEngine.listar_situacoes(status)
+        df_status['Categoria'] = pd.Categorical.from_codes(status['codigos_categoria'], categories=CATEGORIAS)
+        return df_status
+    
+    @staticmethod
+    def contar_categorias(status: Dict) -> Dict[str, int]:
+        """Conta responsáveis por categoria (apenas categorias presentes)"""
+        contagens = np.bincount(status['codigos_categoria'], minlength=len(CATEGORIAS))
+        return {cat: int(qtd) for cat, qtd in zip(CATEGORIAS, contagens) if qtd}
+    
+    @staticmethod
+    def calcular_tendencias(analise_mensal: Dict) -> Dict:
+        """Calcula tendências e previsões"""
+        try:
+            meses = sorted(analise_mensal.keys())
+            taxas = [analise_mensal[mes]['taxa_envio'] for mes in meses]
+            
+            # Próximo mês após o fim da janela
+            ano_fim, mes_fim = meses[-1]
+            proximo_mes = (ano_fim + mes_fim // 12, mes_fim % 12 + 1)
+            
+            if len(taxas) >= 2:
+                # Calcular tendência linear simples
+                x = np.arange(1, len(taxas) + 1)  # Meses
+                y = np.array(taxas)
+                
+                # Regressão linear simples
+                coef = np.polyfit(x, y, 1)
+                tendencia_mensal = coef[0]  # Coeficiente angular
+                
+                # Previsão para próximo mês
+                previsao_proximo_mes = coef[0] * (len(taxas) + 1) + coef[1]
+            else:
+                tendencia_mensal = 0
+                previsao_proximo_mes = taxas[0]
+            previsao_proximo_mes = max(0, min(100, previsao_proximo_mes))  # Limitar entre 0 e 100
+            
+            # Classificar tendência
+            if tendencia_mensal > 2:
+                classificacao_tendencia = "Crescimento Forte"
+                emoji_tendencia = "📈"
+            elif tendencia_mensal > 0:
+                classificacao_tendencia = "Crescimento Leve"
+                emoji_tendencia = "📊"
+            elif tendencia_mensal > -2:
+                classificacao_tendencia = "Estável"
+                emoji_tendencia = "➡️"
+            elif tendencia_mensal > -5:
+                classificacao_tendencia = "Queda Leve"
+                emoji_tendencia = "📉"
+            else:
+                classificacao_tendencia = "Queda Forte"
+                emoji_tendencia = "⚠️"
+            
+            return {
+                'tendencia_mensal': tendencia_mensal,
+                'previsao_proximo_mes': previsao_proximo_mes,
+                'proximo_mes_nome': NOMES_MESES[proximo_mes[1]],
+                'classificacao': classificacao_tendencia,
+                'emoji': emoji_tendencia,
+                'taxas_historicas': taxas
+            }
+            
+        except Exception as e:
+            logger.error(f"Erro no cálculo de tendências: {str(e)}")
+            return {
+                'tendencia_mensal': 0,
+                'previsao_proximo_mes': 0,
+                'proximo_mes_nome': 'Próximo mês',
+                'classificacao': "Erro no cálculo",
+                'emoji': "❓",
+                'taxas_historicas': []
+            }
+
+def exportar_relatorio_excel(analise_mensal: Dict, status_individual: Dict, responsaveis_unicos: List[str]) -> io.BytesIO:
+    """Exporta relatório completo para Excel (escrita em streaming, memória constante por linha)"""
+    try:
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font
+        
+        output = io.BytesIO()
+        workbook = Workbook(write_only=True)
+        
+        def criar_aba(nome: str, colunas: List[str]):
+            aba = workbook.create_sheet(nome)
+            cabecalho = []
+            for coluna in colunas:
+                celula = WriteOnlyCell(aba, value=coluna)
+                celula.font = Font(bold=True)
+                cabecalho.append(celula)
+            aba.append(cabecalho)
+            return aba
+        
+        # Aba 1: Resumo Geral
+        aba_resumo = criar_aba('Resumo Geral', [
+            'Mês', 'Taxa de Envio (%)', 'Responsáveis que Enviaram', 'Responsáveis que NÃO Enviaram',
+            'Total de Registros', 'Média Envios/Responsável'
+        ])
+        for mes, dados in analise_mensal.items():
+            aba_resumo.append([
+                dados['rotulo'],
+                round(dados['taxa_envio'], 2),
+                dados['qtd_enviaram'],
+                dados['qtd_nao_enviaram'],
+                dados['total_registros'],
+                round(dados['media_envios_por_responsavel'], 2)
+            ])
+        
+        # Aba 2: Status Individual (escrita em blocos, sem montar DataFrame)
+        rotulos_meses = [analise_mensal[mes]['rotulo'] for mes in sorted(analise_mensal.keys())]
+        aba_status = criar_aba('Status Individual', [
+            'Responsável', *rotulos_meses, 'Meses Ativos', 'Total de Envios', 'Consistência (%)', 'Situação'
+        ])
+        consistencia = AnalyticsEngine.calcular_consistencia(status_individual).round(2)
+        situacoes = AnalyticsEngine.listar_situacoes(status_individual)
+        
+        for inicio in range(0, len(status_individual['nomes']), TAMANHO_BLOCO_LEITURA):
+            fatia = slice(inicio, inicio + TAMANHO_BLOCO_LEITURA)
+            meses_enviou = np.unpackbits(
+                status_individual['mascara_meses'][fatia], axis=1, count=len(rotulos_meses)
+            )
+            marcadores = np.where(meses_enviou, 'Sim', 'Não').tolist()
+            for nome, meses, ativos, total, consist, situacao in zip(
+                status_individual['nomes'][fatia].tolist(),
+                marcadores,
+                status_individual['meses_ativos'][fatia].tolist(),
+                status_individual['total_envios'][fatia].tolist(),
+                consistencia[fatia].tolist(),
+                situacoes[fatia].tolist()
+            ):
+                aba_status.append([nome, *meses, ativos, total, consist, situacao])
+        
+        # Aba 3: Análise por Categoria
+        categorias_count = AnalyticsEngine.contar_categorias(status_individual)
+        
+        labels_map = {
+            'ativo': 'Totalmente Ativos',
+            'parcial': 'Parcialmente Ativos',
+            'pouco': 'Pouco Ativos',
+            'inativo': 'Inativos'
+        }
+        
+        aba_categorias = criar_aba('Análise por Categoria', ['Categoria', 'Quantidade', 'Percentual (%)'])
+        for cat, count in categorias_count.items():
+            aba_categorias.append([
+                labels_map[cat],
+                count,
+                round((count / len(responsaveis_unicos)) * 100, 2)
+            ])
+        
+        workbook.save(output)
+        output.seek(0)
+        return output
+        
+    except Exception as e:
+        logger.error(f"Erro ao exportar Excel: {str(e)}")
+        raise Exception(f"Erro ao exportar relatório: {str(e)}")
+
+def renderizar_figura_png(especificacao: str, largura: int = LARGURA_IMAGEM_RELATORIO,
+                          altura: int = ALTURA_IMAGEM_RELATORIO, escala: float = ESCALA_IMAGEM_RELATORIO) -> bytes:
+    """Renderiza a especificação JSON de uma figura Plotly em PNG com fundo branco (requer kaleido)"""
+    import plotly.io as pio
+    
+    figura = pio.from_json(especificacao, skip_invalid=True)
+    figura.update_layout(paper_bgcolor='white', plot_bgcolor='white')
+    return pio.to_image(figura, format='png', width=largura, height=altura, scale=escala, engine='kaleido')
+
+def montar_relatorio_pdf(imagens: List[bytes]) -> bytes:
+    """Monta um PDF com uma página por imagem PNG"""
+    from PIL import Image
+    
+    paginas = []
+    for imagem in imagens:
+        pagina = Image.open(io.BytesIO(imagem))
+        if pagina.mode in ('RGBA', 'LA', 'P'):
+            pagina = pagina.convert('RGBA')
+            fundo = Image.new('RGB', pagina.size, 'white')
+            fundo.paste(pagina, mask=pagina.getchannel('A'))
+            pagina = fundo
+        paginas.append(pagina.convert('RGB'))
+    
+    buffer = io.BytesIO()
+    paginas[0].save(buffer, format='PDF', save_all=True, append_images=paginas[1:],
+                    resolution=72 * ESCALA_IMAGEM_RELATORIO)
+    return buffer.getvalue()
+
+def compactar_imagens(imagens: Dict[str, bytes]) -> bytes:
+    """Agrupa as imagens PNG em um arquivo ZIP"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as arquivo_zip:
+        for nome, imagem in imagens.items():
+            arquivo_zip.writestr(f"{nome}.png", imagem)
+    return buffer.getvalue()
+
+class ArquivoInvalidoError(Exception):
+    """Erro levantado quando o arquivo enviado não passa na validação"""
+
+def estimar_tamanho(valor, vistos: Optional[set] = None) -> int:
+    """Estimativa, em bytes, da memória ocupada por um resultado (objetos compartilhados contam uma vez)"""
+    vistos = set() if vistos is None else vistos
+    if id(valor) in vistos:
+        return 0
+    vistos.add(id(valor))
+    
+    if isinstance(valor, np.memmap):
+        return 0  # Mapeado do snapshot em disco: as páginas ficam no cache do sistema, não no processo
+    if isinstance(valor, np.ndarray):
+        tamanho = valor.nbytes
+        if valor.dtype == object:
+            tamanho += sum(sys.getsizeof(item) for item in valor.flat)
+        return tamanho
+    if isinstance(valor, pd.DataFrame):
+        # Inclui os textos das colunas object/string (nomes repetidos entram mais de uma vez: estimativa conservadora)
+        return int(valor.memory_usage(index=True, deep=True).sum())
+    if isinstance(valor, (bytes, bytearray)):
+        return len(valor)
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(
+            estimar_tamanho(chave, vistos) + estimar_tamanho(item, vistos) for chave, item in valor.items()
+        )
+    if isinstance(valor, (list, tuple, set)):
+        return sys.getsizeof(valor) + sum(estimar_tamanho(item, vistos) for item in valor)
+    return sys.getsizeof(valor)
+
+class CacheResultados:
+    """Cache LRU de resultados imutáveis, compartilhado entre threads, limitado por entradas e por memória"""
+    
+    def __init__(self, max_entradas: int = MAX_ENTRADAS_CACHE, max_memoria_mb: float = MEMORIA_MAXIMA_CACHE_MB):
+        self.max_entradas = max_entradas
+        self.max_memoria = max_memoria_mb * 1024 ** 2
+        self.memoria_usada = 0
+        self._entradas: OrderedDict = OrderedDict()  # chave → (valor, tamanho estimado)
+        self._em_andamento: Dict[str, Future] = {}
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.esperas = 0
+    
+    def obter(self, chave: str):
+        """Retorna o valor em cache (ou None) e o marca como recém-usado"""
+        with self._trava:
+            if chave not in self._entradas:
+                self.falhas += 1
+                return None
+            self._entradas.move_to_end(chave)
+            self.acertos += 1
+            return self._entradas[chave][0]
+    
+    def armazenar(self, chave: str, valor) -> None:
+        """Armazena um valor, descartando os menos usados se o limite de entradas ou de memória for excedido"""
+        tamanho = estimar_tamanho(valor)
+        if tamanho > self.max_memoria:
+            logger.warning(f"Cache: entrada {chave[:12]} ({tamanho / 1024 ** 2:.0f} MB) maior que o limite de memória")
+            return
+        
+        with self._trava:
+            if chave in self._entradas:
+                self.memoria_usada -= self._entradas.pop(chave)[1]
+            self._entradas[chave] = (valor, tamanho)
+            self.memoria_usada += tamanho
+            while len(self._entradas) > self.max_entradas or self.memoria_usada > self.max_memoria:
+                chave_antiga, (_, tamanho_antigo) = self._entradas.popitem(last=False)
+                self.memoria_usada -= tamanho_antigo
+                logger.info(f"Cache: entrada {chave_antiga[:12]} descartada")
+    
+    def obter_ou_calcular(self, chave: str, calcular: Callable[[], object]):
+        """Retorna o valor em cache ou o calcula; chamadas simultâneas com a mesma chave esperam um único cálculo"""
+        with self._trava:
+            if chave in self._entradas:
+                self._entradas.move_to_end(chave)
+                self.acertos += 1
+                return self._entradas[chave][0]
+            
+            futuro = self._em_andamento.get(chave)
+            calculando = futuro is None
+            if calculando:
+                futuro = self._em_andamento[chave] = Future()
+                self.falhas += 1
+            else:
+                self.esperas += 1
+        
+        if not calculando:
+            logger.info(f"Cache: aguardando cálculo em andamento de {chave[:12]}")
+            try:
+                return futuro.result()
+            except CancelledError:
+                # Cálculo interrompido (ex.: rerun da sessão que calculava): quem esperava assume
+                return self.obter_ou_calcular(chave, calcular)
+        
+        try:
+            valor = calcular()
+            if valor is not None:
+                self.armazenar(chave, valor)
+        except BaseException as e:
+            # Erros chegam a quem está esperando; nada é guardado e a próxima chamada tenta de novo
+            with self._trava:
+                del self._em_andamento[chave]
+            if isinstance(e, Exception):
+                futuro.set_exception(e)
+            else:
+                futuro.cancel()
+            raise
+        
+        with self._trava:
+            del self._em_andamento[chave]
+        futuro.set_result(valor)
+        return valor
+    
+    def remover(self, chave: str) -> None:
+        """Remove uma entrada do cache, se existir"""
+        with self._trava:
+            entrada = self._entradas.pop(chave, None)
+            if entrada is not None:
+                self.memoria_usada -= entrada[1]
+    
+    def limpar(self) -> None:
+        """Remove todas as entradas do cache"""
+        with self._trava:
+            self._entradas.clear()
+            self.memoria_usada = 0
+    
+    def __contains__(self, chave: str) -> bool:
+        return chave in self._entradas
+    
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+def obter_rss_maximo_mb() -> Optional[float]:
+    """Pico de memória residente do processo até agora (None onde não há o módulo resource)"""
+    if resource is None:
+        return None
+    rss_maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss vem em KB no Linux e em bytes no macOS
+    return rss_maximo / 1024 ** 2 if sys.platform == 'darwin' else rss_maximo / 1024
+
+class MonitorDesempenho:
+    """Registra tempo, linhas e memória de cada estágio do processamento"""
+    
+    def __init__(self):
+        self.registros: List[Dict] = []
+        if MEDIR_MEMORIA and not tracemalloc.is_tracing():
+            tracemalloc.start()
+    
+    @contextmanager
+    def estagio(self, nome: str, linhas_entrada: Optional[int] = None) -> Iterator[Dict]:
+        """Mede o bloco; quem chama pode preencher medicao['linhas_saida']"""
+        medicao = {'estagio': nome, 'linhas_entrada': linhas_entrada, 'linhas_saida': None, 'erro': None}
+        rastreando = tracemalloc.is_tracing()
+        if rastreando:
+            tracemalloc.reset_peak()
+        rss_inicial = obter_rss_maximo_mb()
+        inicio = time.perf_counter()
+        try:
+            yield medicao
+        except BaseException as e:
+            medicao['erro'] = str(e) or type(e).__name__
+            raise
+        finally:
+            medicao['tempo_s'] = time.perf_counter() - inicio
+            medicao['pico_memoria_mb'] = tracemalloc.get_traced_memory()[1] / 1024 ** 2 if rastreando else None
+            # O RSS máximo só cresce ao longo do processo: a diferença é quanto este estágio elevou o pico
+            medicao['aumento_rss_mb'] = obter_rss_maximo_mb() - rss_inicial if rss_inicial is not None else None
+            self.registros.append(medicao)
+            logger.info(
+                f"Desempenho: {nome} em {medicao['tempo_s']:.3f}s "
+                f"(linhas: {medicao['linhas_entrada']} → {medicao['linhas_saida']})",
+                extra={'desempenho': medicao}
+            )
+
+class HistoricoEnvios:
+    """Base SQLite local que acumula os envios de uploads sucessivos, sem duplicar registros"""
+    
+    ESQUEMA = """
+        CREATE TABLE IF NOT EXISTS responsaveis (
+            id INTEGER PRIMARY KEY, chave TEXT NOT NULL UNIQUE, nome TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS envios (
+            responsavel INTEGER NOT NULL, data INTEGER NOT NULL, periodo INTEGER NOT NULL,
+            PRIMARY KEY (responsavel, data)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS contagens_mensais (
+            responsavel INTEGER NOT NULL, periodo INTEGER NOT NULL, envios INTEGER NOT NULL,
+            PRIMARY KEY (responsavel, periodo)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS metadados (nome TEXT PRIMARY KEY, valor INTEGER NOT NULL);
+        INSERT OR IGNORE INTO metadados VALUES ('versao', 0);
+    """
+    
+    def __init__(self, caminho: str = ARQUIVO_HISTORICO):
+        self.caminho = caminho
+        with self._conectar() as conexao:
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.executescript(self.ESQUEMA)
+    
+    @contextmanager
+    def _conectar(self) -> Iterator[sqlite3.Connection]:
+        # Uma conexão por operação: a base pode ser usada por várias sessões (threads) ao mesmo tempo
+        conexao = sqlite3.connect(self.caminho, timeout=30)
+        conexao.execute("PRAGMA synchronous=NORMAL")
+        conexao.execute("PRAGMA temp_store=MEMORY")
+        try:
+            with conexao:
+                yield conexao
+        finally:
+            conexao.close()
+    
+    def versao(self) -> int:
+        """Número de incorporações que trouxeram registros novos (muda sempre que o conteúdo muda)"""
+        with self._conectar() as conexao:
+            return conexao.execute("SELECT valor FROM metadados WHERE nome = 'versao'").fetchone()[0]
+    
+    def incorporar(self, df: pd.DataFrame) -> Dict:
+        """Acrescenta os registros processados que ainda não estão na base e atualiza só os meses afetados"""
+        try:
+            # Chave de cada nome distinto calculada uma única vez; a base identifica o responsável pela chave
+            codigos, nomes_unicos = pd.factorize(df['RESPONSÁVEL'])
+            chaves_unicas = [DataProcessor.chave_nome(nome) for nome in nomes_unicos]
+            
+            with self._conectar() as conexao:
+                conexao.executemany(
+                    "INSERT OR IGNORE INTO responsaveis (chave, nome) VALUES (?, ?)",
+                    zip(chaves_unicas, nomes_unicos.tolist())
+                )
+                ids_por_chave = dict(conexao.execute("SELECT chave, id FROM responsaveis"))
+                ids = np.array([ids_por_chave[chave] for chave in chaves_unicas], dtype=np.int64)[codigos]
+                
+                registros = pd.DataFrame({
+                    'responsavel': ids,
+                    'data': df['DATA'].to_numpy(dtype='datetime64[ns]').view(np.int64),
+                    'periodo': df['ANO'].to_numpy(dtype=np.int64) * 12 + df['MES'].to_numpy(dtype=np.int64) - 1
+                }).drop_duplicates(['responsavel', 'data']).sort_values(['responsavel', 'data'])
+                
+                conexao.execute("CREATE TEMP TABLE recebidos (responsavel INTEGER, data INTEGER, periodo INTEGER)")
+                conexao.executemany("INSERT INTO recebidos VALUES (?, ?, ?)", zip(
+                    registros['responsavel'].tolist(), registros['data'].tolist(), registros['periodo'].tolist()
+                ))
+                
+                # Só os pares (responsável, data) ausentes da base entram; a contagem mensal é somada a partir deles
+                conexao.execute("""
+                    CREATE TEMP TABLE novos AS
+                    SELECT r.responsavel, r.data, r.periodo FROM recebidos r
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM envios e WHERE e.responsavel = r.responsavel AND e.data = r.data
+                    )
+                """)
+                conexao.execute("INSERT INTO envios SELECT responsavel, data, periodo FROM novos")
+                conexao.execute("""
+                    INSERT INTO contagens_mensais
+                    SELECT responsavel, periodo, COUNT(*) FROM novos WHERE true GROUP BY responsavel, periodo
+                    ON CONFLICT (responsavel, periodo) DO UPDATE SET envios = envios + excluded.envios
+                """)
+                novos = conexao.execute("SELECT COUNT(*) FROM novos").fetchone()[0]
+                periodos = [linha[0] for linha in conexao.execute("SELECT DISTINCT periodo FROM novos ORDER BY periodo")]
+                if novos:
+                    conexao.execute("UPDATE metadados SET valor = valor + 1 WHERE nome = 'versao'")
+                conexao.execute("DROP TABLE recebidos")
+                conexao.execute("DROP TABLE novos")
+            
+            logger.info(f"Histórico: {novos} registros novos, {len(registros) - novos} já existentes")
+            return {
+                'registros_recebidos': len(registros),
+                'registros_novos': novos,
+                'registros_duplicados': len(registros) - novos,
+                'meses_afetados': [(codigo // 12, codigo % 12 + 1) for codigo in periodos]
+            }
+            
+        except Exception as e:
+            logger.error(f"Erro ao incorporar no histórico: {str(e)}")
+            raise Exception(f"Erro ao incorporar registros no histórico: {str(e)}")
+    
+    def carregar_matriz(self) -> Dict:
+        """Monta a matriz responsável × mês a partir das contagens mensais acumuladas"""
+        try:
+            with self._conectar() as conexao:
+                contagens = pd.read_sql_query(
+                    "SELECT r.nome, c.periodo, c.envios FROM contagens_mensais c "
+                    "JOIN responsaveis r ON r.id = c.responsavel",
+                    conexao
+                )
+            
+            nomes, codigos_resp = np.unique(contagens['nome'].to_numpy(dtype=object), return_inverse=True)
+            periodos, codigos_coluna = np.unique(contagens['periodo'].to_numpy(dtype=np.int64), return_inverse=True)
+            matriz = np.zeros((len(nomes), len(periodos)), dtype=np.int64)
+            np.add.at(matriz, (codigos_resp, codigos_coluna), contagens['envios'].to_numpy(dtype=np.int64))
+            
+            return {'nomes': nomes.astype(object), 'periodos': periodos, 'contagens': matriz}
+            
+        except Exception as e:
+            logger.error(f"Erro ao ler o histórico: {str(e)}")
+            raise Exception(f"Erro ao carregar matriz do histórico: {str(e)}")
+    
+    def resumo(self) -> Dict:
+        """Totais da base: registros, responsáveis e meses armazenados"""
+        with self._conectar() as conexao:
+            registros, = conexao.execute("SELECT COUNT(*) FROM envios").fetchone()
+            responsaveis, meses = conexao.execute(
+                "SELECT COUNT(DISTINCT responsavel), COUNT(DISTINCT periodo) FROM contagens_mensais"
+            ).fetchone()
+        return {'registros': registros, 'responsaveis': responsaveis, 'meses': meses, 'versao': self.versao()}
+
+class AgregadorEnvios:
+    """Agrega os registros bloco a bloco em contadores por (responsável, mês), sem guardar as linhas"""
+    
+    FATOR_CHAVE = 1 << 20  # Chave = id do responsável * FATOR_CHAVE + período (ano * 12 + mês - 1)
+    
+    def __init__(self, remover_acentos: bool = REMOVER_ACENTOS_NOMES, aliases: Optional[Dict[str, str]] = None):
+        aliases = ALIASES_RESPONSAVEIS if aliases is None else aliases
+        self.remover_acentos = remover_acentos
+        self.chaves_aliases = {
+            DataProcessor.chave_nome(alias, remover_acentos): DataProcessor.chave_nome(oficial, remover_acentos)
+            for alias, oficial in aliases.items()
+        }
+        self.nomes_oficiais = {DataProcessor.chave_nome(oficial, remover_acentos): ' '.join(oficial.split())
+                               for oficial in aliases.values()}
+        
+        # Identificação dos responsáveis: grafia → id (-1 = nome inválido) e frequência das grafias de cada id
+        self.ids_grafias: Dict[str, int] = {}
+        self.ids_chaves: Dict[str, int] = {}
+        self.grafias: List[Dict[str, int]] = []
+        
+        # Chaves vistas (ordenadas). Envios sem horário ficam como bits de dia do mês, o que elimina duplicatas
+        # entre blocos; envios com horário vão para uma base SQLite temporária em disco, onde a chave primária
+        # (chave, data) elimina as duplicatas de todos os blocos
+        self.chaves = np.empty(0, dtype=np.int64)
+        self.dias_com_envio = np.empty(0, dtype=np.uint32)
+        self.conexao_horarios: Optional[sqlite3.Connection] = None
+        
+        # Primeiro e último envio por id, em nanossegundos
+        self.primeiro_envio = np.empty(0, dtype=np.int64)
+        self.ultimo_envio = np.empty(0, dtype=np.int64)
+        
+        self.conversao_datas: Dict[str, int] = {}
+        self.linhas_recebidas = 0
+    
+    def _identificar(self, serie: pd.Series) -> np.ndarray:
+        """Id do responsável de cada linha, normalizando só as grafias ainda não vistas (como normalizar_responsaveis)"""
+        codigos, unicos = pd.factorize(serie)
+        frequencias = np.bincount(codigos[codigos >= 0], minlength=len(unicos))
+        ids_unicos = np.full(len(unicos) + 1, -1, dtype=np.int64)
+        
+        for posicao, (valor, frequencia) in enumerate(zip(unicos, frequencias)):
+            grafia = ' '.join(str(valor).split())
+            id_responsavel = self.ids_grafias.get(grafia)
+            if id_responsavel is None:
+                chave = DataProcessor.chave_nome(grafia, self.remover_acentos)
+                if chave in NOMES_INVALIDOS:
+                    id_responsavel = -1
+                else:
+                    chave = self.chaves_aliases.get(chave, chave)
+                    id_responsavel = self.ids_chaves.setdefault(chave, len(self.ids_chaves))
+                    if id_responsavel == len(self.grafias):
+                        self.grafias.append({})
+                self.ids_grafias[grafia] = id_responsavel
+            if id_responsavel >= 0:
+                grafias = self.grafias[id_responsavel]
+                grafias[grafia] = grafias.get(grafia, 0) + int(frequencia)
+            ids_unicos[posicao] = id_responsavel
+        
+        return ids_unicos[codigos]
+    
+    def adicionar(self, df: pd.DataFrame) -> int:
+        """Incorpora um bloco de linhas lidas, retornando quantos registros válidos ele trouxe"""
+        try:
+            self.linhas_recebidas += len(df)
+            ids = self._identificar(df['RESPONSÁVEL'])
+            validos = ids >= 0
+            
+            datas, conversao = DataProcessor.converter_datas(df['DATA'][validos])
+            for origem, quantidade in conversao.items():
+                self.conversao_datas[origem] = self.conversao_datas.get(origem, 0) + quantidade
+            datas = datas.to_numpy(dtype='datetime64[ns]')
+            com_data = ~np.isnat(datas)
+            ids, datas = ids[validos][com_data], datas[com_data]
+            
+            # Duplicatas (responsável, data) dentro do bloco
+            repetidos = pd.DataFrame({'id': ids, 'data': datas.view(np.int64)}).duplicated().to_numpy()
+            ids, datas = ids[~repetidos], datas[~repetidos]
+            if not len(ids):
+                return 0
+            
+            inicio_mes = datas.astype('datetime64[M]')
+            dias = datas.astype('datetime64[D]')
+            sem_horario = datas == dias
+            dia_do_mes = (dias - inicio_mes.astype('datetime64[D]')).astype(np.uint32)
+            chaves = ids * self.FATOR_CHAVE + inicio_mes.astype(np.int64) + 1970 * 12
+            
+            # Junta as chaves do bloco às já conhecidas (que são únicas e ordenadas)
+            todas, inversa = np.unique(np.concatenate([self.chaves, chaves]), return_inverse=True)
+            anteriores, novas = inversa[:len(self.chaves)], inversa[len(self.chaves):]
+            dias_com_envio = np.zeros(len(todas), dtype=np.uint32)
+            dias_com_envio[anteriores] = self.dias_com_envio
+            np.bitwise_or.at(dias_com_envio, novas[sem_horario], np.left_shift(np.uint32(1), dia_do_mes[sem_horario]))
+            self.chaves, self.dias_com_envio = todas, dias_com_envio
+            if not sem_horario.all():
+                self._guardar_horarios(chaves[~sem_horario], datas[~sem_horario].view(np.int64))
+            
+            if len(self.primeiro_envio) < len(self.grafias):
+                faltantes = len(self.grafias) - len(self.primeiro_envio)
+                info = np.iinfo(np.int64)
+                self.primeiro_envio = np.concatenate([self.primeiro_envio, np.full(faltantes, info.max)])
+                self.ultimo_envio = np.concatenate([self.ultimo_envio, np.full(faltantes, info.min)])
+            np.minimum.at(self.primeiro_envio, ids, datas.view(np.int64))
+            np.maximum.at(self.ultimo_envio, ids, datas.view(np.int64))
+            return len(ids)
+            
+        except Exception as e:
+            logger.error(f"Erro na agregação: {str(e)}")
+            raise Exception(f"Erro ao agregar bloco de registros: {str(e)}")
+    
+    def _guardar_horarios(self, chaves: np.ndarray, datas: np.ndarray) -> None:
+        """Grava os pares (chave, data) com horário na base temporária, ignorando os já gravados"""
+        if self.conexao_horarios is None:
+            # Nome vazio: base temporária em disco, apagada ao fechar; só o cache de páginas fica em memória
+            self.conexao_horarios = sqlite3.connect('')
+            self.conexao_horarios.execute("PRAGMA journal_mode=OFF")
+            self.conexao_horarios.execute("PRAGMA synchronous=OFF")
+            self.conexao_horarios.execute(
+                "CREATE TABLE horarios (chave INTEGER, data INTEGER, PRIMARY KEY (chave, data)) WITHOUT ROWID"
+            )
+        ordem = np.lexsort((datas, chaves))  # Inserção ordenada pela chave primária
+        with self.conexao_horarios:
+            self.conexao_horarios.executemany(
+                "INSERT OR IGNORE INTO horarios VALUES (?, ?)", zip(chaves[ordem].tolist(), datas[ordem].tolist())
+            )
+    
+    def fechar(self) -> None:
+        """Fecha (e apaga) a base temporária dos envios com horário"""
+        if self.conexao_horarios is not None:
+            self.conexao_horarios.close()
+            self.conexao_horarios = None
+    
+    def resultado(self) -> Dict:
+        """Matriz responsável × mês, responsáveis, datas de envio e conversão de datas do que foi agregado"""
+        ids, periodos = np.divmod(self.chaves, self.FATOR_CHAVE)
+        dias = np.unpackbits(self.dias_com_envio.view(np.uint8).reshape(-1, 4), axis=1).sum(axis=1)
+        envios = dias.astype(np.int64)
+        if self.conexao_horarios is not None:
+            # Contagem distinta final dos envios com horário de cada chave
+            contagens_horario = np.array(
+                self.conexao_horarios.execute("SELECT chave, COUNT(*) FROM horarios GROUP BY chave").fetchall(),
+                dtype=np.int64
+            ).reshape(-1, 2)
+            envios[np.searchsorted(self.chaves, contagens_horario[:, 0])] += contagens_horario[:, 1]
+        
+        # Exibe o nome oficial (alias) ou a grafia mais frequente; as linhas seguem a ordem alfabética
+        chaves_por_id = list(self.ids_chaves)
+        ids_presentes = np.unique(ids)
+        nomes = np.array([
+            self.nomes_oficiais.get(chaves_por_id[id_responsavel])
+            or max(self.grafias[id_responsavel], key=self.grafias[id_responsavel].get)
+            for id_responsavel in ids_presentes
+        ], dtype=object)
+        ordem = np.argsort(nomes, kind='stable')
+        linha_por_id = np.full(len(self.grafias), -1, dtype=np.int64)
+        linha_por_id[ids_presentes[ordem]] = np.arange(len(ordem))
+        
+        periodos_unicos, colunas = np.unique(periodos, return_inverse=True)
+        contagens = np.zeros((len(ordem), len(periodos_unicos)), dtype=np.int64)
+        contagens[linha_por_id[ids], colunas] = envios
+        
+        # Mesma ordem de rótulos da conversão feita de uma só vez
+        ordem_conversao = (['datas nativas', 'serial do Excel'] + FORMATOS_DATA
+                           + ['outros formatos', 'inválidas', 'vazias'])
+        conversao = {origem: self.conversao_datas[origem]
+                     for origem in ordem_conversao if origem in self.conversao_datas}
+        
+        nomes = nomes[ordem]
+        logger.info(f"Agregação: {self.linhas_recebidas} linhas, {int(envios.sum())} registros válidos, "
+                    f"{len(self.ids_grafias)} grafias unificadas em {len(self.grafias)} nomes")
+        return {
+            'responsaveis_unicos': list(nomes),
+            'matriz': {'nomes': nomes, 'periodos': periodos_unicos, 'contagens': contagens},
+            'datas_envio': {
+                'primeiro_envio': self.primeiro_envio[ids_presentes[ordem]].view('datetime64[ns]'),
+                'ultimo_envio': self.ultimo_envio[ids_presentes[ordem]].view('datetime64[ns]')
+            },
+            'registros_validos': int(envios.sum()),
+            'conversao_datas': conversao
+        }
+
+def obter_config_analise() -> Dict:
+    """Retorna a configuração que influencia o processamento dos arquivos"""
+    return {
+        'colunas': tuple(COLUNAS_OBRIGATORIAS),
+        'colunas_extras': tuple(COLUNAS_EXTRAS),
+        'remover_acentos_nomes': REMOVER_ACENTOS_NOMES,
+        'aliases_responsaveis': tuple(sorted(ALIASES_RESPONSAVEIS.items()))
+    }
+
+def gerar_chave_cache(arquivos: List[Tuple[str, bytes]], config: Dict) -> str:
+    """Gera a chave do cache a partir do hash dos arquivos e da configuração"""
+    hasher = hashlib.sha256()
+    for nome, conteudo in arquivos:
+        hasher.update(nome.encode('utf-8'))
+        hasher.update(hashlib.sha256(conteudo).digest())
+    hasher.update(repr(sorted(config.items())).encode('utf-8'))
+    return hasher.hexdigest()
+
+def ler_fonte(nome_arquivo: str, conteudo, localizacao: Dict) -> Tuple[pd.DataFrame, Dict]:
+    """Lê uma aba de um arquivo, marcando a origem dos registros e o tempo de leitura"""
+    inicio = time.perf_counter()
+    formato = localizacao.get('formato', 'excel')
+    if formato == 'csv':
+        df, estatisticas = DataProcessor.ler_csv(
+            conteudo, localizacao['linha_cabecalho'], localizacao['separador'], localizacao['codificacao']
+        )
+    elif formato in ('parquet', 'arrow'):
+        df, estatisticas = DataProcessor.ler_colunar(conteudo, formato)
+    else:
+        df, estatisticas = DataProcessor.ler_planilha(
+            conteudo, aba=localizacao['aba'], linha_cabecalho=localizacao['linha_cabecalho']
+        )
+    
+    origem = nome_arquivo if localizacao['aba'] is None else f"{nome_arquivo} [{localizacao['aba']}]"
+    df[COLUNA_ORIGEM] = origem
+    estatisticas.update({'origem': origem, 'tempo_s': time.perf_counter() - inicio})
+    return df, estatisticas
+
+def localizar_fontes(arquivos: List[Tuple[str, bytes]], monitor: MonitorDesempenho) -> List[Tuple[str, bytes, Dict]]:
+    """Pré-valida cada arquivo pelo cabeçalho, antes da leitura completa, listando as abas a ler"""
+    tarefas = []
+    with monitor.estagio('pre_validacao', len(arquivos)) as medicao:
+        for nome_arquivo, conteudo in arquivos:
+            formato = DataProcessor.detectar_formato(nome_arquivo, conteudo)
+            valido, mensagem, localizacoes = DataProcessor.pre_validar_arquivo(conteudo, formato=formato)
+            if not valido:
+                raise ArquivoInvalidoError(f"{nome_arquivo}: {mensagem}")
+            logger.info(f"{nome_arquivo}: {mensagem}")
+            tarefas.extend((nome_arquivo, conteudo, localizacao) for localizacao in localizacoes)
+        medicao['linhas_saida'] = len(tarefas)
+    return tarefas
+
+def iterar_blocos_fonte(conteudo, localizacao: Dict, estatisticas: Dict,
+                        tamanho_bloco: int = TAMANHO_BLOCO_LEITURA,
+                        colunas_extras: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """Lê uma aba/arquivo em blocos de linhas, com as mesmas colunas e limpeza da leitura completa"""
+    colunas_desejadas = DataProcessor.colunas_leitura(colunas_extras)
+    formato = localizacao.get('formato', 'excel')
+    
+    if formato == 'csv':
+        with pd.read_csv(
+            io.BytesIO(conteudo) if isinstance(conteudo, (bytes, bytearray)) else conteudo,
+            sep=localizacao['separador'],
+            encoding=localizacao['codificacao'],
+            skiprows=localizacao['linha_cabecalho'],
+            usecols=lambda col: str(col).strip() in colunas_desejadas,
+            dtype=str,
+            skipinitialspace=True,
+            chunksize=tamanho_bloco
+        ) as leitor:
+            for bloco in leitor:
+                yield DataProcessor.padronizar_bloco(bloco, estatisticas)
+    
+    elif formato in ('parquet', 'arrow'):
+        leitor, nomes = DataProcessor.abrir_colunar(conteudo, formato)
+        posicoes = DataProcessor.posicoes_colunas(nomes, colunas_desejadas)
+        if formato == 'parquet':
+            lotes = leitor.iter_batches(batch_size=tamanho_bloco, columns=[nomes[i] for i in posicoes.values()])
+        else:
+            lotes = (leitor.get_batch(indice).select(list(posicoes.values()))
+                     for indice in range(leitor.num_record_batches))
+        for lote in lotes:
+            # Lotes do Arrow IPC têm o tamanho com que foram gravados: fatiados (sem cópia) no tamanho do bloco
+            for inicio in range(0, lote.num_rows, tamanho_bloco):
+                yield DataProcessor.padronizar_bloco(
+                    DataProcessor.tabela_arrow_para_pandas(lote.slice(inicio, tamanho_bloco), posicoes), estatisticas
+                )
+    
+    elif conteudo.startswith(b'PK'):
+        for bloco in DataProcessor.iterar_planilha(conteudo, colunas_desejadas, tamanho_bloco,
+                                                   localizacao['aba'], localizacao['linha_cabecalho'], estatisticas):
+            yield bloco.infer_objects().fillna(np.nan)
+    
+    else:
+        # .xls: o xlrd sempre carrega a aba inteira
+        df, estatisticas_xls = DataProcessor.ler_planilha(
+            conteudo, colunas_extras, aba=localizacao['aba'], linha_cabecalho=localizacao['linha_cabecalho']
+        )
+        for chave in ('linhas_lidas', 'linhas_ignoradas'):
+            estatisticas[chave] += estatisticas_xls[chave]
+        yield df
+
+def ler_fontes(arquivos: List[Tuple[str, bytes]], paralelo: bool = True,
+               monitor: Optional[MonitorDesempenho] = None) -> Tuple[pd.DataFrame, Dict]:
+    """Pré-valida e lê todos os arquivos e abas, em paralelo quando houver mais de uma fonte"""
+    monitor = monitor or MonitorDesempenho()
+    inicio = time.perf_counter()
+    tarefas = localizar_fontes(arquivos, monitor)
+    
+    with monitor.estagio('leitura', len(tarefas)) as medicao:
+        resultados = None
+        if paralelo and len(tarefas) > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=min(len(tarefas), os.cpu_count() or 1)) as executor:
+                    resultados = list(executor.map(ler_fonte, *zip(*tarefas)))
+            except Exception as e:
+                logger.warning(f"Leitura paralela indisponível, lendo sequencialmente: {str(e)}")
+        
+        if resultados is None:
+            resultados = [ler_fonte(*tarefa) for tarefa in tarefas]
+        
+        fontes = [estatisticas for _, estatisticas in resultados]
+        df = pd.concat([df_fonte for df_fonte, _ in resultados], ignore_index=True)
+        medicao['linhas_saida'] = len(df)
+    
+    estatisticas_leitura = {
+        'linhas_lidas': sum(fonte['linhas_lidas'] for fonte in fontes),
+        'linhas_ignoradas': sum(fonte['linhas_ignoradas'] for fonte in fontes),
+        'fontes': fontes,
+        'tempo_total_s': time.perf_counter() - inicio
+    }
+    logger.info(f"Leitura de {len(fontes)} fontes concluída em {estatisticas_leitura['tempo_total_s']:.2f}s")
+    return df, estatisticas_leitura
+
+def executar_pipeline(arquivos: List[Tuple[str, bytes]], paralelo: bool = True,
+                      monitor: Optional[MonitorDesempenho] = None,
+                      historico: Optional[HistoricoEnvios] = None) -> Dict:
+    """Executa leitura, validação, processamento e análises dos arquivos enviados (acumulando no histórico, se houver)"""
+    monitor = monitor or MonitorDesempenho()
+    df, estatisticas_leitura = ler_fontes(arquivos, paralelo=paralelo, monitor=monitor)
+    
+    # Validar arquivo
+    with monitor.estagio('validacao', len(df)) as medicao:
+        valido, mensagem = DataProcessor.validar_arquivo(df)
+        if not valido:
+            raise ArquivoInvalidoError(mensagem)
+        medicao['linhas_saida'] = len(df)
+    
+    # Processar dados
+    with monitor.estagio('processamento', len(df)) as medicao:
+        df_processado = DataProcessor.processar_dados(df)
+        medicao['linhas_saida'] = len(df_processado)
+    if df_processado.empty:
+        raise ArquivoInvalidoError("Nenhum registro com responsável e data válidos")
+    
+    incorporacao = None
+    datas_envio = None
+    if historico is not None:
+        # Só os pares (responsável, data) ainda ausentes entram; a matriz vem das contagens mensais da base
+        with monitor.estagio('incorporacao_historico', len(df_processado)) as medicao:
+            incorporacao = historico.incorporar(df_processado)
+            medicao['linhas_saida'] = incorporacao['registros_novos']
+        with monitor.estagio('matriz_atividade') as medicao:
+            matriz = historico.carregar_matriz()
+            medicao['linhas_saida'] = len(matriz['nomes'])
+        responsaveis_unicos = list(matriz['nomes'])
+    else:
+        # Obter responsáveis únicos
+        responsaveis_unicos = sorted(df_processado['RESPONSÁVEL'].dropna().unique())
+        
+        # Matriz responsável × mês com todos os meses presentes nos dados
+        with monitor.estagio('matriz_atividade', len(df_processado)) as medicao:
+            matriz = AnalyticsEngine.calcular_matriz_atividade(df_processado, responsaveis_unicos)
+            datas_envio = AnalyticsEngine.calcular_datas_envio(df_processado, responsaveis_unicos)
+            medicao['linhas_saida'] = len(responsaveis_unicos)
+    
+    return {
+        'df_processado': df_processado,
+        'responsaveis_unicos': responsaveis_unicos,
+        'matriz': matriz,
+        'meses_disponiveis': AnalyticsEngine.listar_meses_disponiveis(matriz),
+        'chaves_busca': np.array([DataProcessor.chave_nome(nome) for nome in responsaveis_unicos], dtype=object),
+        'estatisticas_leitura': estatisticas_leitura,
+        'conversao_datas': df_processado.attrs.get('conversao_datas', {}),
+        'registros_validos': len(df_processado),
+        'datas_envio': datas_envio,
+        'incorporacao': incorporacao,
+        'desempenho': monitor.registros
+    }
+
+def executar_pipeline_streaming(arquivos: List[Tuple[str, bytes]], tamanho_bloco: int = TAMANHO_BLOCO_LEITURA,
+                                monitor: Optional[MonitorDesempenho] = None) -> Dict:
+    """Lê e agrega os arquivos bloco a bloco, com memória limitada pelas chaves (responsável, mês) e não pelas linhas"""
+    monitor = monitor or MonitorDesempenho()
+    inicio = time.perf_counter()
+    tarefas = localizar_fontes(arquivos, monitor)
+    agregador = AgregadorEnvios()
+    
+    fontes = []
+    try:
+        with monitor.estagio('leitura_agregacao', len(tarefas)) as medicao:
+            for nome_arquivo, conteudo, localizacao in tarefas:
+                inicio_fonte = time.perf_counter()
+                origem = nome_arquivo if localizacao['aba'] is None else f"{nome_arquivo} [{localizacao['aba']}]"
+                estatisticas = {'linhas_lidas': 0, 'linhas_ignoradas': 0}
+                for bloco in iterar_blocos_fonte(conteudo, localizacao, estatisticas, tamanho_bloco,
+                                                 colunas_extras=[]):
+                    agregador.adicionar(bloco)
+                estatisticas.update({'origem': origem, 'tempo_s': time.perf_counter() - inicio_fonte})
+                fontes.append(estatisticas)
+            
+            agregado = agregador.resultado()
+            medicao['linhas_saida'] = agregado['registros_validos']
+    finally:
+        agregador.fechar()
+    if not agregado['registros_validos']:
+        raise ArquivoInvalidoError("Nenhum registro com responsável e data válidos")
+    
+    estatisticas_leitura = {
+        'linhas_lidas': sum(fonte['linhas_lidas'] for fonte in fontes),
+        'linhas_ignoradas': sum(fonte['linhas_ignoradas'] for fonte in fontes),
+        'fontes': fontes,
+        'tempo_total_s': time.perf_counter() - inicio
+    }
+    responsaveis_unicos = agregado['responsaveis_unicos']
+    matriz = agregado['matriz']
+    
+    return {
+        'df_processado': None,
+        'responsaveis_unicos': responsaveis_unicos,
+        'matriz': matriz,
+        'meses_disponiveis': AnalyticsEngine.listar_meses_disponiveis(matriz),
+        'chaves_busca': np.array([DataProcessor.chave_nome(nome) for nome in responsaveis_unicos], dtype=object),
+        'estatisticas_leitura': estatisticas_leitura,
+        'conversao_datas': agregado['conversao_datas'],
+        'registros_validos': agregado['registros_validos'],
+        'datas_envio': agregado['datas_envio'],
+        'incorporacao': None,
+        'desempenho': monitor.registros
+    }
+
+def analisar_janela(resultado: Dict, meses: List[Tuple[int, int]],
+                    monitor: Optional[MonitorDesempenho] = None) -> Dict:
+    """Calcula as análises de uma janela de meses a partir da matriz pré-calculada"""
+    monitor = monitor or MonitorDesempenho()
+    total_responsaveis = len(resultado['matriz']['nomes'])
+    
+    with monitor.estagio('analise_mensal', total_responsaveis) as medicao:
+        analise_mensal = AnalyticsEngine.calcular_analise_mensal(resultado['matriz'], meses)
+        medicao['linhas_saida'] = len(analise_mensal)
+    with monitor.estagio('status_individual', total_responsaveis) as medicao:
+        status_individual = AnalyticsEngine.calcular_status_individual(resultado['matriz'], meses)
+        ordem_consistencia = AnalyticsEngine.ordenar_por_consistencia(status_individual)
+        medicao['linhas_saida'] = len(status_individual['nomes'])
+    with monitor.estagio('tendencias', len(analise_mensal)) as medicao:
+        tendencias = AnalyticsEngine.calcular_tendencias(analise_mensal)
+        medicao['linhas_saida'] = len(tendencias['taxas_historicas'])
+    
+    return {
+        'meses': meses,
+        'analise_mensal': analise_mensal,
+        'status_individual': status_individual,
+        'ordem_consistencia': ordem_consistencia,
+        'tendencias': tendencias,
+        'desempenho': monitor.registros
+    }
+
+def recortar_janela(meses_disponiveis: List[Tuple[int, int]], inicio: Tuple[int, int],
+                    fim: Tuple[int, int]) -> List[Tuple[int, int]]:
+    """Retorna os meses disponíveis entre inicio e fim (inclusive)"""
+    return [mes for mes in meses_disponiveis if inicio <= mes <= fim]
+
+def definir_janela_padrao(meses_disponiveis: List[Tuple[int, int]]) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    """Usa MESES_ANALISE/ANO_ANALISE quando presentes nos dados, senão os últimos três meses"""
+    padrao = [(ANO_ANALISE, mes) for mes in sorted(MESES_ANALISE.keys())]
+    if padrao[0] in meses_disponiveis and padrao[-1] in meses_disponiveis:
+        return padrao[0], padrao[-1]
+    return meses_disponiveis[max(0, len(meses_disponiveis) - 3)], meses_disponiveis[-1]
+
+class _ArrayEmDisco:
+    """Marca, na estrutura salva do snapshot, o lugar de um array gravado em arquivo .npy próprio"""
+    
+    def __init__(self, arquivo: str, texto: bool):
+        self.arquivo = arquivo
+        self.texto = texto  # Arrays de nomes viram texto de largura fixa para poderem ser mapeados
+
+def _separar_arrays(valor, arrays: Dict[int, Tuple[_ArrayEmDisco, np.ndarray, np.ndarray]]):
+    """Troca os arrays da estrutura por referências, gravando cada array (mesmo repetido) uma única vez"""
+    if isinstance(valor, np.ndarray) and valor.ndim > 0:
+        if id(valor) not in arrays:
+            # O original fica guardado junto para que o id não seja reaproveitado por outro array
+            texto = valor.dtype == object
+            referencia = _ArrayEmDisco(f"a{len(arrays)}.npy", texto)
+            arrays[id(valor)] = (referencia, valor.astype(str) if texto else valor, valor)
+        return arrays[id(valor)][0]
+    if isinstance(valor, dict):
+        return {chave: _separar_arrays(item, arrays) for chave, item in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return type(valor)(_separar_arrays(item, arrays) for item in valor)
+    return valor
+
+def _restaurar_arrays(valor, diretorio: str, carregados: Dict[str, np.ndarray]):
+    """Recoloca na estrutura os arrays do snapshot, mapeados em memória (nomes voltam a ser object)"""
+    if isinstance(valor, _ArrayEmDisco):
+        if valor.arquivo not in carregados:
+            array = np.load(os.path.join(diretorio, valor.arquivo), mmap_mode='r')
+            carregados[valor.arquivo] = array.astype(object) if valor.texto else array
+        return carregados[valor.arquivo]
+    if isinstance(valor, dict):
+        return {chave: _restaurar_arrays(item, diretorio, carregados) for chave, item in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return type(valor)(_restaurar_arrays(item, diretorio, carregados) for item in valor)
+    return valor
+
+def _separar_tabela(df: pd.DataFrame, arrays: Dict) -> Dict:
+    """Descreve o DataFrame como arrays por coluna; colunas de texto são gravadas como códigos + categorias"""
+    colunas = []
+    for coluna in df.columns:
+        serie = df[coluna]
+        if serie.dtype == object:
+            codigos, categorias = pd.factorize(serie)
+            colunas.append((coluna, 'categoria', _separar_arrays(codigos.astype(np.int32), arrays),
+                            _separar_arrays(np.asarray(categorias, dtype=object), arrays)))
+        else:
+            colunas.append((coluna, 'valores', _separar_arrays(serie.to_numpy(), arrays), None))
+    indice = None if isinstance(df.index, pd.RangeIndex) else _separar_arrays(df.index.to_numpy(), arrays)
+    return {'colunas': colunas, 'indice': indice, 'attrs': dict(df.attrs)}
+
+def _restaurar_tabela(estrutura: Dict) -> pd.DataFrame:
+    """Remonta o DataFrame do snapshot; colunas de texto voltam como category sobre os códigos mapeados"""
+    dados = {}
+    for coluna, tipo, valores, categorias in estrutura['colunas']:
+        dados[coluna] = (pd.Categorical.from_codes(valores, categories=categorias, validate=False)
+                         if tipo == 'categoria' else valores)
+    df = pd.DataFrame(dados, index=estrutura['indice'], copy=False)
+    df.attrs.update(estrutura['attrs'])
+    return df
+
+_TRAVA_SNAPSHOT = threading.Lock()
+
+@contextmanager
+def _travar_publicacao(diretorio: str) -> Iterator[None]:
+    """Serializa a publicação de versões do snapshot entre sessões (threads) e, via arquivo de trava, entre processos"""
+    with _TRAVA_SNAPSHOT, open(os.path.join(diretorio, '.trava'), 'a') as arquivo:
+        if fcntl is not None:
+            fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX)  # Liberada ao fechar o arquivo
+        yield
+
+def _hash_config() -> str:
+    """Hash da configuração de processamento e do formato do snapshot"""
+    return hashlib.sha256(repr((VERSAO_SNAPSHOT, sorted(obter_config_analise().items()))).encode('utf-8')).hexdigest()
+
+def salvar_snapshot(resultado: Dict, analise_janela: Dict, diretorio: str = DIRETORIO_SNAPSHOT,
+                    versao_historico: Optional[int] = None) -> str:
+    """Grava o resultado e a análise da janela como uma nova versão do snapshot e a torna a atual"""
+    temporario = None
+    try:
+        versao = f"{time.strftime('%Y%m%d%H%M%S')}-{resultado['chave'][:12]}"
+        destino = os.path.join(diretorio, versao)
+        os.makedirs(diretorio, exist_ok=True)
+        
+        # Os arquivos são gravados num diretório temporário, que só recebe o nome da versão quando está completo
+        temporario = tempfile.mkdtemp(prefix=f".{versao}.", dir=diretorio)
+        
+        arrays: Dict[int, Tuple[_ArrayEmDisco, np.ndarray, np.ndarray]] = {}
+        estrutura = {
+            'formato': VERSAO_SNAPSHOT,
+            'config': _hash_config(),
+            'criado_em': time.time(),
+            'historico_ativo': versao_historico is not None,  # Modo da análise: com ou sem histórico acumulado
+            'versao_historico': versao_historico,
+            'df_processado': (None if resultado['df_processado'] is None
+                              else _separar_tabela(resultado['df_processado'], arrays)),
+            'resultado': _separar_arrays({k: v for k, v in resultado.items() if k != 'df_processado'}, arrays),
+            'analise_janela': _separar_arrays(analise_janela, arrays)
+        }
+        for referencia, array, _ in arrays.values():
+            np.save(os.path.join(temporario, referencia.arquivo), np.ascontiguousarray(array), allow_pickle=False)
+        with open(os.path.join(temporario, 'estrutura.pkl'), 'wb') as arquivo:
+            pickle.dump(estrutura, arquivo, protocol=pickle.HIGHEST_PROTOCOL)
+        
+        with _travar_publicacao(diretorio):
+            if os.path.isdir(destino):
+                shutil.rmtree(temporario, ignore_errors=True)  # Mesmo conteúdo, já gravado por outra sessão
+            else:
+                os.replace(temporario, destino)
+            
+            # Só avança o ponteiro: uma versão mais nova publicada por outra sessão continua sendo a atual.
+            # A troca é atômica: quem está lendo continua com a versão anterior completa
+            atual = versao_snapshot_atual(diretorio)
+            if atual is None or atual <= versao or not os.path.isdir(os.path.join(diretorio, atual)):
+                ponteiro = os.path.join(diretorio, f"ATUAL.{os.getpid()}.tmp")
+                with open(ponteiro, 'w', encoding='utf-8') as arquivo:
+                    arquivo.write(versao)
+                os.replace(ponteiro, os.path.join(diretorio, 'ATUAL'))
+                atual = versao
+            
+            # Remove apenas versões completas mais antigas que a atual (diretórios temporários começam com '.')
+            for antiga in os.listdir(diretorio):
+                caminho = os.path.join(diretorio, antiga)
+                if not antiga.startswith('.') and antiga < atual and os.path.isdir(caminho):
+                    shutil.rmtree(caminho, ignore_errors=True)
+        
+        logger.info(f"Snapshot: versão {versao} salva com {len(arrays)} arrays (atual: {atual})")
+        return versao
+        
+    except Exception as e:
+        if temporario is not None:
+            shutil.rmtree(temporario, ignore_errors=True)
+        logger.error(f"Erro ao salvar snapshot: {str(e)}")
+        raise Exception(f"Erro ao salvar snapshot: {str(e)}")
+
+def versao_snapshot_atual(diretorio: str = DIRETORIO_SNAPSHOT) -> Optional[str]:
+    """Versão apontada como atual (None se ainda não houver snapshot)"""
+    try:
+        with open(os.path.join(diretorio, 'ATUAL'), encoding='utf-8') as arquivo:
+            return arquivo.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def carregar_snapshot(diretorio: str = DIRETORIO_SNAPSHOT,
+                      versao_historico: Optional[int] = None) -> Optional[Tuple[Dict, Dict]]:
+    """Carrega o snapshot atual com os arrays mapeados em memória (None se ausente ou desatualizado)"""
+    versao = versao_snapshot_atual(diretorio)
+    if versao is None:
+        return None
+    origem = os.path.join(diretorio, versao)
+    
+    try:
+        with open(os.path.join(origem, 'estrutura.pkl'), 'rb') as arquivo:
+            estrutura = pickle.load(arquivo)
+    except Exception as e:
+        logger.warning(f"Snapshot: versão {versao} ilegível ({str(e)})")
+        return None
+    
+    # Formato ou configuração diferentes, outro modo do histórico ou histórico alterado invalidam a versão salva
+    if estrutura.get('formato') != VERSAO_SNAPSHOT or estrutura.get('config') != _hash_config():
+        logger.info(f"Snapshot: versão {versao} descartada (formato ou configuração diferentes)")
+        return None
+    if estrutura.get('historico_ativo') != (versao_historico is not None):
+        logger.info(f"Snapshot: versão {versao} descartada (salva com o histórico "
+                    f"{'ativado' if estrutura.get('historico_ativo') else 'desativado'})")
+        return None
+    if estrutura['versao_historico'] != versao_historico:
+        logger.info(f"Snapshot: versão {versao} descartada (histórico alterado)")
+        return None
+    
+    try:
+        carregados: Dict[str, np.ndarray] = {}
+        resultado = _restaurar_arrays(estrutura['resultado'], origem, carregados)
+        if estrutura['df_processado'] is not None:
+            resultado['df_processado'] = _restaurar_tabela(
+                _restaurar_arrays(estrutura['df_processado'], origem, carregados)
+            )
+        else:
+            resultado['df_processado'] = None
+        resultado['snapshot'] = {'versao': versao, 'criado_em': estrutura['criado_em']}
+        analise_janela = _restaurar_arrays(estrutura['analise_janela'], origem, carregados)
+    except Exception as e:
+        logger.warning(f"Snapshot: versão {versao} incompleta ({str(e)})")
+        return None
+    
+    logger.info(f"Snapshot: versão {versao} carregada")
+    return resultado, analise_janela
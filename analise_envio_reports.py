@@ -1,650 +1,102 @@
+from __future__ import annotations
+
+import time
+_INICIO_IMPORTACAO = time.perf_counter()
+
 import streamlit as st
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-import io
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+import html
 import logging
-from typing import Dict, List, Tuple, Optional
+import os
+import re
+from typing import Callable, Dict, List, Tuple, Optional, TYPE_CHECKING
 import warnings
 
-# Configurar logging
-logging.basicConfig(level=logging.INFO)
+from analise_envio_core import (
+    CATEGORIAS, EXTENSOES_FORMATO, NOMES_MESES, rotulo_mes, descrever_janela, AnalyticsEngine,
+    exportar_relatorio_excel, ArquivoInvalidoError, CacheResultados, HistoricoEnvios, MonitorDesempenho, MEMORIA_MAXIMA_CACHE_MB,
+    obter_config_analise, gerar_chave_cache, executar_pipeline, analisar_janela, recortar_janela,
+    definir_janela_padrao, renderizar_figura_png, montar_relatorio_pdf, compactar_imagens,
+    salvar_snapshot, carregar_snapshot, versao_snapshot_atual
+)
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+# Tempo gasto nos imports do script (só é relevante na primeira execução do processo)
+TEMPO_IMPORTACAO = time.perf_counter() - _INICIO_IMPORTACAO
+
 logger = logging.getLogger(__name__)
 
-# Suprimir warnings desnecessários
-warnings.filterwarnings('ignore')
+TAMANHOS_PAGINA_HEATMAP = [20, 50, 100]
+TAMANHO_PAGINA_NOMES = 60
+MAX_FIGURAS_CACHE = 32
+# Parte de PAINEL_MEMORIA_CACHE_MB reservada a cada cache (a soma é o orçamento total do processo)
+FRACOES_MEMORIA_CACHE = {'resultados': 0.6, 'relatorios': 0.2, 'figuras': 0.2}
+MAX_PROCESSOS_RENDERIZACAO = 2
+TEMPO_MAXIMO_RENDERIZACAO_S = 120  # Prazo para todas as imagens de um relatório
+LINHAS_HEATMAP_RELATORIO = 50  # Responsáveis mais consistentes no heatmap do relatório PDF
 
-# Imports condicionais para plotly
-try:
-    import plotly.express as px
-    import plotly.graph_objects as go
-    from plotly.subplots import make_subplots
-    PLOTLY_AVAILABLE = True
-except ImportError:
-    PLOTLY_AVAILABLE = False
-    st.warning("⚠️ Plotly não está disponível. Alguns gráficos podem não funcionar.")
+# Folha de estilos do painel
+ARQUIVO_CSS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'estilos.css')
 
-# Configuração da página
-st.set_page_config(
-    page_title="Painel de Acompanhamento de Reports",
-    page_icon="📊",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+@st.cache_resource(show_spinner=False)
+def carregar_plotly():
+    """Importa o plotly na primeira vez que um gráfico é gerado (None se não estiver instalado)"""
+    try:
+        import plotly.graph_objects as go
+        return go
+    except ImportError:
+        logger.warning("Plotly não está disponível. Alguns gráficos podem não funcionar.")
+        return None
 
-# Constantes
-MESES_ANALISE = {7: 'Julho', 8: 'Agosto', 9: 'Setembro'}
-ANO_ANALISE = 2025
-COLUNAS_OBRIGATORIAS = ['RESPONSÁVEL', 'DATA']
+@st.cache_resource(show_spinner=False)
+def carregar_css() -> str:
+    """Lê e compacta a folha de estilos uma única vez por processo"""
+    with open(ARQUIVO_CSS, encoding='utf-8') as arquivo_css:
+        css = arquivo_css.read()
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.DOTALL)
+    css = re.sub(r'\s+', ' ', css).strip()
+    return f"<style>{css}</style>"
 
-# CSS customizado para estilização moderna
-st.markdown("""
-<style>
-    /* Importar fontes do Google */
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
-    
-    /* Reset e configurações globais */
-    .main .block-container {
-        padding-top: 2rem;
-        padding-bottom: 2rem;
-        max-width: 1200px;
-    }
-    
-    /* Fonte global */
-    html, body, [class*="css"] {
-        font-family: 'Inter', sans-serif;
-    }
-    
-    /* Header principal */
-    .main-header {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        padding: 3rem 2rem;
-        border-radius: 20px;
-        color: white;
-        text-align: center;
-        margin-bottom: 3rem;
-        box-shadow: 0 10px 30px rgba(102, 126, 234, 0.3);
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .main-header::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        right: 0;
-        bottom: 0;
-        background: url('data:image/svg+xml,<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100"><defs><pattern id="grain" width="100" height="100" patternUnits="userSpaceOnUse"><circle cx="50" cy="50" r="1" fill="white" opacity="0.1"/></pattern></defs><rect width="100" height="100" fill="url(%23grain)"/></svg>');
-        opacity: 0.1;
-    }
-    
-    .main-header h1 {
-        font-size: 2.5rem;
-        font-weight: 700;
-        margin-bottom: 0.5rem;
-        position: relative;
-        z-index: 1;
-    }
-    
-    .main-header p {
-        font-size: 1.2rem;
-        font-weight: 300;
-        opacity: 0.9;
-        position: relative;
-        z-index: 1;
-    }
-    
-    /* Cards de métricas */
-    .metric-card {
-        background: white;
-        padding: 2rem;
-        border-radius: 16px;
-        box-shadow: 0 8px 32px rgba(0, 0, 0, 0.08);
-        border: 1px solid rgba(255, 255, 255, 0.2);
-        margin-bottom: 1.5rem;
-        transition: all 0.3s ease;
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .metric-card:hover {
-        transform: translateY(-4px);
-        box-shadow: 0 12px 40px rgba(0, 0, 0, 0.12);
-    }
-    
-    .metric-card::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        width: 4px;
-        height: 100%;
-        background: linear-gradient(135deg, #667eea, #764ba2);
-    }
-    
-    /* Alertas críticos */
-    .alert-critical {
-        background: linear-gradient(135deg, #fff8e1 0%, #ffecb3 100%);
-        border: 2px solid #ffc107;
-        border-radius: 16px;
-        padding: 2rem;
-        margin: 2rem 0;
-        box-shadow: 0 8px 32px rgba(255, 193, 7, 0.2);
-        position: relative;
-    }
-    
-    .alert-success {
-        background: linear-gradient(135deg, #e8f5e8 0%, #c8e6c9 100%);
-        border: 2px solid #4caf50;
-        border-radius: 16px;
-        padding: 2rem;
-        margin: 2rem 0;
-        box-shadow: 0 8px 32px rgba(76, 175, 80, 0.2);
-        position: relative;
-    }
-    
-    .alert-critical::before {
-        content: '🚨';
-        position: absolute;
-        top: -10px;
-        left: 20px;
-        background: #ffc107;
-        padding: 8px 12px;
-        border-radius: 50%;
-        font-size: 1.2rem;
-    }
-    
-    .alert-success::before {
-        content: '✅';
-        position: absolute;
-        top: -10px;
-        left: 20px;
-        background: #4caf50;
-        padding: 8px 12px;
-        border-radius: 50%;
-        font-size: 1.2rem;
-    }
-    
-    .alert-critical h3, .alert-success h3 {
-        margin-bottom: 1.5rem;
-        font-weight: 600;
-        margin-top: 0.5rem;
-    }
-    
-    .alert-critical h3 {
-        color: #e65100;
-    }
-    
-    .alert-success h3 {
-        color: #2e7d32;
-    }
-    
-    .alert-critical ul, .alert-success ul {
-        margin: 1rem 0;
-        padding-left: 1.5rem;
-    }
-    
-    .alert-critical li {
-        margin-bottom: 0.5rem;
-        color: #bf360c;
-        font-weight: 500;
-    }
-    
-    .alert-success li {
-        margin-bottom: 0.5rem;
-        color: #2e7d32;
-        font-weight: 500;
-    }
-    
-    /* Status badges */
-    .status-enviou {
-        background: linear-gradient(135deg, #4caf50, #45a049);
-        color: white;
-        padding: 6px 12px;
-        border-radius: 20px;
-        font-size: 0.85rem;
-        font-weight: 600;
-        text-transform: uppercase;
-        letter-spacing: 0.5px;
-        box-shadow: 0 2px 8px rgba(76, 175, 80, 0.3);
-        margin: 2px;
-        display: inline-block;
-    }
-    
-    .status-nao-enviou {
-        background: linear-gradient(135deg, #f44336, #d32f2f);
-        color: white;
-        padding: 6px 12px;
-        border-radius: 20px;
-        font-size: 0.85rem;
-        font-weight: 600;
-        text-transform: uppercase;
-        letter-spacing: 0.5px;
-        box-shadow: 0 2px 8px rgba(244, 67, 54, 0.3);
-        margin: 2px;
-        display: inline-block;
-    }
-    
-    /* Categorias de responsáveis */
-    .category-ativo {
-        background: linear-gradient(135deg, #e8f5e8, #c8e6c9) !important;
-        border-left: 4px solid #4caf50 !important;
-    }
-    
-    .category-parcial {
-        background: linear-gradient(135deg, #fff8e1, #ffecb3) !important;
-        border-left: 4px solid #ff9800 !important;
-    }
-    
-    .category-pouco {
-        background: linear-gradient(135deg, #ffebee, #ffcdd2) !important;
-        border-left: 4px solid #f44336 !important;
-    }
-    
-    .category-inativo {
-        background: linear-gradient(135deg, #f5f5f5, #eeeeee) !important;
-        border-left: 4px solid #9e9e9e !important;
-    }
-    
-    /* Sidebar customizada */
-    .css-1d391kg {
-        background: linear-gradient(180deg, #f8f9fa 0%, #e9ecef 100%);
-    }
-    
-    /* Tabs customizadas */
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 8px;
-        background: rgba(255, 255, 255, 0.1);
-        border-radius: 12px;
-        padding: 4px;
-    }
-    
-    .stTabs [data-baseweb="tab"] {
-        background: transparent;
-        border-radius: 8px;
-        color: #666;
-        font-weight: 500;
-        transition: all 0.3s ease;
-    }
-    
-    .stTabs [aria-selected="true"] {
-        background: white !important;
-        color: #667eea !important;
-        box-shadow: 0 2px 8px rgba(0, 0, 0, 0.1);
-    }
-    
-    /* Métricas do Streamlit */
-    [data-testid="metric-container"] {
-        background: white;
-        border: 1px solid rgba(0, 0, 0, 0.05);
-        padding: 1.5rem;
-        border-radius: 12px;
-        box-shadow: 0 4px 16px rgba(0, 0, 0, 0.05);
-        transition: all 0.3s ease;
-    }
-    
-    [data-testid="metric-container"]:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 8px 24px rgba(0, 0, 0, 0.1);
-    }
-    
-    /* Tabelas */
-    .dataframe {
-        border-radius: 12px;
-        overflow: hidden;
-        box-shadow: 0 4px 16px rgba(0, 0, 0, 0.05);
-    }
-    
-    /* Upload de arquivo */
-    .uploadedFile {
-        border-radius: 12px;
-        border: 2px dashed #667eea;
-        background: rgba(102, 126, 234, 0.05);
-    }
-    
-    /* Botões */
-    .stButton > button {
-        background: linear-gradient(135deg, #667eea, #764ba2);
-        color: white;
-        border: none;
-        border-radius: 12px;
-        padding: 0.75rem 2rem;
-        font-weight: 600;
-        transition: all 0.3s ease;
-        box-shadow: 0 4px 16px rgba(102, 126, 234, 0.3);
-    }
-    
-    .stButton > button:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 8px 24px rgba(102, 126, 234, 0.4);
-    }
-    
-    /* Selectbox e multiselect */
-    .stSelectbox > div > div {
-        border-radius: 12px;
-        border: 2px solid rgba(102, 126, 234, 0.2);
-    }
-    
-    .stMultiSelect > div > div {
-        border-radius: 12px;
-        border: 2px solid rgba(102, 126, 234, 0.2);
-    }
-    
-    /* Rodapé */
-    .footer {
-        background: linear-gradient(135deg, #2c3e50, #34495e);
-        color: white;
-        padding: 2rem;
-        border-radius: 16px;
-        text-align: center;
-        margin-top: 3rem;
-        box-shadow: 0 -4px 16px rgba(0, 0, 0, 0.1);
-    }
-    
-    .footer p {
-        margin: 0.5rem 0;
-        opacity: 0.8;
-    }
-    
-    /* Animações */
-    @keyframes fadeInUp {
-        from {
-            opacity: 0;
-            transform: translateY(30px);
-        }
-        to {
-            opacity: 1;
-            transform: translateY(0);
-        }
-    }
-    
-    .fade-in-up {
-        animation: fadeInUp 0.6s ease-out;
-    }
-    
-    /* Responsividade */
-    @media (max-width: 768px) {
-        .main-header {
-            padding: 2rem 1rem;
-        }
-        
-        .main-header h1 {
-            font-size: 2rem;
-        }
-        
-        .metric-card {
-            padding: 1.5rem;
-        }
-        
-        .alert-critical, .alert-success {
-            padding: 1.5rem;
-        }
-    }
-    
-    /* Scrollbar customizada */
-    ::-webkit-scrollbar {
-        width: 8px;
-    }
-    
-    ::-webkit-scrollbar-track {
-        background: #f1f1f1;
-        border-radius: 4px;
-    }
-    
-    ::-webkit-scrollbar-thumb {
-        background: linear-gradient(135deg, #667eea, #764ba2);
-        border-radius: 4px;
-    }
-    
-    ::-webkit-scrollbar-thumb:hover {
-        background: linear-gradient(135deg, #5a6fd8, #6a4190);
-    }
-    
-    /* Loading spinner */
-    .loading-spinner {
-        border: 4px solid #f3f3f3;
-        border-top: 4px solid #667eea;
-        border-radius: 50%;
-        width: 40px;
-        height: 40px;
-        animation: spin 1s linear infinite;
-        margin: 20px auto;
-    }
-    
-    @keyframes spin {
-        0% { transform: rotate(0deg); }
-        100% { transform: rotate(360deg); }
-    }
-</style>
-""", unsafe_allow_html=True)
+@st.cache_resource(show_spinner=False)
+def obter_metricas_inicializacao() -> Dict:
+    """Métricas de inicialização do processo (preenchidas na primeira renderização)"""
+    return {}
 
-class DataProcessor:
-    """Classe para processamento e validação de dados"""
-    
-    @staticmethod
-    def validar_arquivo(df: pd.DataFrame) -> Tuple[bool, str]:
-        """Valida se o arquivo possui as colunas necessárias"""
-        try:
-            colunas_faltantes = [col for col in COLUNAS_OBRIGATORIAS if col not in df.columns]
-            
-            if colunas_faltantes:
-                return False, f"Colunas obrigatórias não encontradas: {', '.join(colunas_faltantes)}"
-            
-            if df.empty:
-                return False, "O arquivo está vazio"
-            
-            if df['RESPONSÁVEL'].isna().all():
-                return False, "Coluna RESPONSÁVEL não possui dados válidos"
-            
-            return True, "Arquivo válido"
-            
-        except Exception as e:
-            logger.error(f"Erro na validação: {str(e)}")
-            return False, f"Erro na validação: {str(e)}"
+def configurar_pagina() -> None:
+    """Configura logging, página e estilos (primeiro passo de cada execução do script)"""
+    logging.basicConfig(level=logging.INFO)
     
-    @staticmethod
-    def processar_dados(df: pd.DataFrame) -> pd.DataFrame:
-        """Processa os dados da planilha com tratamento de erros robusto"""
-        try:
-            # Criar cópia para não modificar o original
-            df_processado = df.copy()
-            
-            # Limpar nomes dos responsáveis
-            df_processado['RESPONSÁVEL'] = df_processado['RESPONSÁVEL'].astype(str).str.strip()
-            
-            # Remover linhas com responsáveis vazios ou inválidos
-            df_processado = df_processado[
-                (df_processado['RESPONSÁVEL'].notna()) & 
-                (df_processado['RESPONSÁVEL'] != '') &
-                (df_processado['RESPONSÁVEL'] != 'nan')
-            ]
-            
-            # Converter coluna de data com tratamento de erros
-            try:
-                df_processado['DATA'] = pd.to_datetime(df_processado['DATA'], errors='coerce')
-            except Exception as e:
-                logger.warning(f"Erro ao converter datas: {str(e)}")
-                # Tentar diferentes formatos
-                for formato in ['%d/%m/%Y', '%Y-%m-%d', '%m/%d/%Y']:
-                    try:
-                        df_processado['DATA'] = pd.to_datetime(df_processado['DATA'], format=formato, errors='coerce')
-                        break
-                    except:
-                        continue
-            
-            # Remover linhas com datas inválidas
-            df_processado = df_processado[df_processado['DATA'].notna()]
-            
-            # Adicionar colunas derivadas
-            df_processado['ANO'] = df_processado['DATA'].dt.year
-            df_processado['MES'] = df_processado['DATA'].dt.month
-            df_processado['MES_NOME'] = df_processado['DATA'].dt.strftime('%B')
-            df_processado['DIA_SEMANA'] = df_processado['DATA'].dt.day_name()
-            
-            # Remover duplicatas
-            df_processado = df_processado.drop_duplicates(subset=['RESPONSÁVEL', 'DATA'])
-            
-            logger.info(f"Dados processados: {len(df_processado)} registros válidos")
-            return df_processado
-            
-        except Exception as e:
-            logger.error(f"Erro no processamento: {str(e)}")
-            raise Exception(f"Erro ao processar dados: {str(e)}")
-
-class AnalyticsEngine:
-    """Classe para cálculos e análises"""
+    # Suprimir warnings desnecessários
+    warnings.filterwarnings('ignore')
     
-    @staticmethod
-    def calcular_analise_mensal(df: pd.DataFrame, responsaveis_unicos: List[str]) -> Dict:
-        """Calcula análise por mês com métricas adicionais"""
-        try:
-            # Filtrar dados do período de análise
-            dados_periodo = df[
-                (df['ANO'] == ANO_ANALISE) & 
-                (df['MES'].isin(MESES_ANALISE.keys()))
-            ]
-            
-            analise = {}
-            
-            for mes_num, mes_nome in MESES_ANALISE.items():
-                dados_mes = dados_periodo[dados_periodo['MES'] == mes_num]
-                responsaveis_ativos = dados_mes['RESPONSÁVEL'].unique().tolist()
-                responsaveis_inativos = [r for r in responsaveis_unicos if r not in responsaveis_ativos]
-                
-                # Calcular métricas adicionais
-                total_envios = len(dados_mes)
-                media_envios_por_responsavel = total_envios / len(responsaveis_ativos) if responsaveis_ativos else 0
-                
-                analise[mes_num] = {
-                    'mes_nome': mes_nome,
-                    'total_registros': total_envios,
-                    'responsaveis_enviaram': responsaveis_ativos,
-                    'responsaveis_nao_enviaram': responsaveis_inativos,
-                    'qtd_enviaram': len(responsaveis_ativos),
-                    'qtd_nao_enviaram': len(responsaveis_inativos),
-                    'taxa_envio': (len(responsaveis_ativos) / len(responsaveis_unicos)) * 100,
-                    'media_envios_por_responsavel': media_envios_por_responsavel,
-                    'total_responsaveis': len(responsaveis_unicos)
-                }
-            
-            return analise
-            
-        except Exception as e:
-            logger.error(f"Erro na análise mensal: {str(e)}")
-            raise Exception(f"Erro ao calcular análise mensal: {str(e)}")
+    # Configuração da página
+    st.set_page_config(
+        page_title="Painel de Acompanhamento de Reports",
+        page_icon="📊",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
     
-    @staticmethod
-    def calcular_status_individual(df: pd.DataFrame, responsaveis_unicos: List[str]) -> Dict:
-        """Calcula status individual com métricas detalhadas"""
-        try:
-            dados_periodo = df[
-                (df['ANO'] == ANO_ANALISE) & 
-                (df['MES'].isin(MESES_ANALISE.keys()))
-            ]
-            
-            status_completo = {}
-            
-            for resp in responsaveis_unicos:
-                dados_resp = dados_periodo[dados_periodo['RESPONSÁVEL'] == resp]
-                
-                # Verificar envios por mês
-                envios_por_mes = {}
-                total_envios = 0
-                
-                for mes_num in MESES_ANALISE.keys():
-                    envios_mes = len(dados_resp[dados_resp['MES'] == mes_num])
-                    envios_por_mes[mes_num] = envios_mes > 0
-                    total_envios += envios_mes
-                
-                meses_ativos = sum(envios_por_mes.values())
-                
-                # Determinar situação e categoria
-                if meses_ativos == 3:
-                    situacao = 'TOTALMENTE ATIVO'
-                    categoria = 'ativo'
-                elif meses_ativos == 2:
-                    situacao = 'PARCIALMENTE ATIVO'  
-                    categoria = 'parcial'
-                elif meses_ativos == 1:
-                    situacao = 'POUCO ATIVO'
-                    categoria = 'pouco'
-                else:
-                    situacao = 'INATIVO'
-                    categoria = 'inativo'
-                
-                # Calcular consistência (envios regulares)
-                consistencia = (meses_ativos / 3) * 100
-                
-                status_completo[resp] = {
-                    'julho': envios_por_mes.get(7, False),
-                    'agosto': envios_por_mes.get(8, False),
-                    'setembro': envios_por_mes.get(9, False),
-                    'meses_ativos': meses_ativos,
-                    'total_envios': total_envios,
-                    'situacao': situacao,
-                    'categoria': categoria,
-                    'consistencia': consistencia
-                }
-            
-            return status_completo
-            
-        except Exception as e:
-            logger.error(f"Erro no status individual: {str(e)}")
-            raise Exception(f"Erro ao calcular status individual: {str(e)}")
-    
-    @staticmethod
-    def calcular_tendencias(analise_mensal: Dict) -> Dict:
-        """Calcula tendências e previsões"""
-        try:
-            taxas = [analise_mensal[mes]['taxa_envio'] for mes in sorted(MESES_ANALISE.keys())]
-            
-            # Calcular tendência linear simples
-            x = np.array([1, 2, 3])  # Meses
-            y = np.array(taxas)
-            
-            # Regressão linear simples
-            coef = np.polyfit(x, y, 1)
-            tendencia_mensal = coef[0]  # Coeficiente angular
-            
-            # Previsão para próximo mês
-            previsao_proximo_mes = coef[0] * 4 + coef[1]
-            previsao_proximo_mes = max(0, min(100, previsao_proximo_mes))  # Limitar entre 0 e 100
-            
-            # Classificar tendência
-            if tendencia_mensal > 2:
-                classificacao_tendencia = "Crescimento Forte"
-                emoji_tendencia = "📈"
-            elif tendencia_mensal > 0:
-                classificacao_tendencia = "Crescimento Leve"
-                emoji_tendencia = "📊"
-            elif tendencia_mensal > -2:
-                classificacao_tendencia = "Estável"
-                emoji_tendencia = "➡️"
-            elif tendencia_mensal > -5:
-                classificacao_tendencia = "Queda Leve"
-                emoji_tendencia = "📉"
-            else:
-                classificacao_tendencia = "Queda Forte"
-                emoji_tendencia = "⚠️"
-            
-            return {
-                'tendencia_mensal': tendencia_mensal,
-                'previsao_proximo_mes': previsao_proximo_mes,
-                'classificacao': classificacao_tendencia,
-                'emoji': emoji_tendencia,
-                'taxas_historicas': taxas
-            }
-            
-        except Exception as e:
-            logger.error(f"Erro no cálculo de tendências: {str(e)}")
-            return {
-                'tendencia_mensal': 0,
-                'previsao_proximo_mes': 0,
-                'classificacao': "Erro no cálculo",
-                'emoji': "❓",
-                'taxas_historicas': []
-            }
+    # CSS customizado para estilização moderna
+    st.markdown(carregar_css(), unsafe_allow_html=True)
+
+def registrar_inicializacao(inicio_renderizacao: float) -> Dict:
+    """Registra, na primeira renderização do processo, o custo de importação e de renderização"""
+    metricas = obter_metricas_inicializacao()
+    if not metricas:
+        metricas.update({
+            'importacao_s': TEMPO_IMPORTACAO,
+            'primeira_renderizacao_s': time.perf_counter() - inicio_renderizacao
+        })
+        logger.info(f"Inicialização: importação {metricas['importacao_s']:.3f}s, "
+                    f"primeira renderização {metricas['primeira_renderizacao_s']:.3f}s")
+    return metricas
 
 class ChartGenerator:
     """Classe para geração de gráficos"""
@@ -652,15 +104,17 @@ class ChartGenerator:
     @staticmethod
     def criar_grafico_evolucao(analise: Dict, tendencias: Dict) -> Optional[go.Figure]:
         """Cria gráfico de evolução temporal com previsão"""
-        if not PLOTLY_AVAILABLE:
+        go = carregar_plotly()
+        if go is None:
             return None
         
         try:
-            meses = list(MESES_ANALISE.values())
-            taxas = [analise[mes]['taxa_envio'] for mes in sorted(MESES_ANALISE.keys())]
+            meses = [analise[mes]['rotulo'] for mes in sorted(analise.keys())]
+            taxas = [analise[mes]['taxa_envio'] for mes in sorted(analise.keys())]
+            rotulo_previsao = f"{tendencias['proximo_mes_nome']} (Prev.)"
             
             # Adicionar previsão
-            meses_com_previsao = meses + ['Outubro (Prev.)']
+            meses_com_previsao = meses + [rotulo_previsao]
             taxas_com_previsao = taxas + [tendencias['previsao_proximo_mes']]
             
             # Cores modernas
@@ -673,7 +127,7 @@ class ChartGenerator:
                 x=meses,
                 y=taxas,
                 marker=dict(
-                    color=cores_barras[:3],
+                    color=[cores_barras[i % 3] for i in range(len(taxas))],
                     line=dict(color='rgba(255,255,255,0.8)', width=2)
                 ),
                 text=[f'{taxa:.1f}%' for taxa in taxas],
@@ -685,17 +139,17 @@ class ChartGenerator:
             
             # Barra de previsão
             fig.add_trace(go.Bar(
-                x=['Outubro (Prev.)'],
+                x=[rotulo_previsao],
                 y=[tendencias['previsao_proximo_mes']],
                 marker=dict(
                     color='rgba(168, 230, 207, 0.7)',
-                    line=dict(color='#4caf50', width=2, dash='dash')
+                    line=dict(color='#4caf50', width=2)
                 ),
                 text=[f'{tendencias["previsao_proximo_mes"]:.1f}%'],
                 textposition='outside',
                 textfont=dict(size=14, color='#2c3e50', family='Inter'),
                 name='Previsão',
-                hovertemplate='<b>Previsão Outubro</b><br>Taxa: %{y:.1f}%<extra></extra>'
+                hovertemplate=f'<b>Previsão {tendencias["proximo_mes_nome"]}</b><br>Taxa: %{{y:.1f}}%<extra></extra>'
             ))
             
             # Linha de tendência
@@ -751,14 +205,12 @@ class ChartGenerator:
     @staticmethod
     def criar_grafico_pizza_situacao(status_individual: Dict) -> Optional[go.Figure]:
         """Cria gráfico de pizza com situação dos responsáveis"""
-        if not PLOTLY_AVAILABLE:
+        go = carregar_plotly()
+        if go is None:
             return None
         
         try:
-            categorias = {}
-            for status in status_individual.values():
-                cat = status['categoria']
-                categorias[cat] = categorias.get(cat, 0) + 1
+            categorias = AnalyticsEngine.contar_categorias(status_individual)
             
             labels = {
                 'ativo': '🟢 Totalmente Ativos',
@@ -821,47 +273,30 @@ class ChartGenerator:
             return None
     
     @staticmethod
-    def criar_grafico_heatmap_consistencia(status_individual: Dict) -> Optional[go.Figure]:
-        """Cria heatmap de consistência dos responsáveis"""
-        if not PLOTLY_AVAILABLE:
+    def criar_grafico_heatmap_consistencia(status_individual: Dict, rotulos_meses: List[str],
+                                           linhas: np.ndarray) -> Optional[go.Figure]:
+        """Cria heatmap de consistência só com os responsáveis da página (linhas já ordenadas)"""
+        go = carregar_plotly()
+        if go is None:
             return None
         
         try:
-            # Preparar dados para heatmap
-            responsaveis = list(status_individual.keys())
-            meses = ['Julho', 'Agosto', 'Setembro']
-            
-            # Matriz de dados (1 = enviou, 0 = não enviou)
-            matriz = []
-            for resp in responsaveis:
-                linha = [
-                    1 if status_individual[resp]['julho'] else 0,
-                    1 if status_individual[resp]['agosto'] else 0,
-                    1 if status_individual[resp]['setembro'] else 0
-                ]
-                matriz.append(linha)
-            
-            # Limitar a 20 responsáveis para melhor visualização
-            if len(responsaveis) > 20:
-                # Ordenar por consistência (mais ativos primeiro)
-                responsaveis_ordenados = sorted(
-                    responsaveis, 
-                    key=lambda x: status_individual[x]['meses_ativos'], 
-                    reverse=True
-                )
-                responsaveis = responsaveis_ordenados[:20]
-                matriz = [matriz[responsaveis.index(resp)] for resp in responsaveis]
+            # Matriz da página (1 = enviou, 0 = não enviou), sem texto por célula
+            matriz = AnalyticsEngine.expandir_meses(status_individual, linhas).astype(np.uint8)
+            responsaveis = status_individual['nomes'][linhas].tolist()
             
             fig = go.Figure(data=go.Heatmap(
                 z=matriz,
-                x=meses,
+                x=rotulos_meses,
                 y=responsaveis,
-                colorscale=[[0, '#ffcdd2'], [1, '#c8e6c9']],
-                text=[[f'{"✅" if val else "❌"}' for val in linha] for linha in matriz],
-                texttemplate="%{text}",
-                textfont={"size": 16},
-                hovertemplate='<b>%{y}</b><br>%{x}: %{text}<extra></extra>',
-                showscale=False
+                zmin=0,
+                zmax=1,
+                colorscale=[[0, '#ffcdd2'], [0.5, '#ffcdd2'], [0.5, '#c8e6c9'], [1, '#c8e6c9']],
+                xgap=2,
+                ygap=2,
+                hovertemplate='<b>%{y}</b><br>%{x}: %{z}<extra></extra>',
+                colorbar=dict(tickvals=[0.25, 0.75], ticktext=['❌ Não enviou', '✅ Enviou'], len=0.3, y=1,
+                              yanchor='top', thickness=15)
             ))
             
             fig.update_layout(
@@ -873,12 +308,14 @@ class ChartGenerator:
                 xaxis=dict(
                     title='Meses',
                     titlefont=dict(size=14, color='#2c3e50'),
-                    tickfont=dict(size=12, color='#2c3e50')
+                    tickfont=dict(size=12, color='#2c3e50'),
+                    side='top'
                 ),
                 yaxis=dict(
                     title='Responsáveis',
                     titlefont=dict(size=14, color='#2c3e50'),
-                    tickfont=dict(size=10, color='#2c3e50')
+                    tickfont=dict(size=10, color='#2c3e50'),
+                    autorange='reversed'
                 ),
                 height=max(400, len(responsaveis) * 25),
                 plot_bgcolor='rgba(0,0,0,0)',
@@ -892,207 +329,602 @@ class ChartGenerator:
             logger.error(f"Erro ao criar heatmap: {str(e)}")
             return None
 
-def exportar_relatorio_excel(analise_mensal: Dict, status_individual: Dict, responsaveis_unicos: List[str]) -> io.BytesIO:
-    """Exporta relatório completo para Excel"""
+@st.cache_resource
+def obter_cache_resultados() -> CacheResultados:
+    """Instância única do cache, preservada entre reruns do Streamlit"""
+    return CacheResultados(max_memoria_mb=MEMORIA_MAXIMA_CACHE_MB * FRACOES_MEMORIA_CACHE['resultados'])
+
+@st.cache_resource
+def obter_historico() -> HistoricoEnvios:
+    """Base local de envios acumulados, aberta uma única vez por processo"""
+    return HistoricoEnvios()
+
+@st.cache_resource
+def obter_cache_relatorios() -> CacheResultados:
+    """Cache dos relatórios gerados, separado para não descartar análises"""
+    return CacheResultados(max_memoria_mb=MEMORIA_MAXIMA_CACHE_MB * FRACOES_MEMORIA_CACHE['relatorios'])
+
+@st.cache_resource
+def obter_cache_figuras() -> CacheResultados:
+    """Cache das figuras por análise e opções do gráfico, separado para não descartar análises"""
+    return CacheResultados(
+        max_entradas=MAX_FIGURAS_CACHE, max_memoria_mb=MEMORIA_MAXIMA_CACHE_MB * FRACOES_MEMORIA_CACHE['figuras']
+    )
+
+def obter_figura(analise_janela: Dict, nome: str, opcoes: Tuple, construir: Callable) -> Optional[go.Figure]:
+    """Retorna a figura da análise, construindo-a só quando a análise ou as opções mudarem"""
+    chave = f"{analise_janela['chave']}:{nome}:{opcoes}"
+    cache = obter_cache_figuras()
+    
+    figura = cache.obter(chave)
+    if figura is None:
+        figura = construir()
+        if figura is not None:
+            cache.armazenar(chave, figura)
+    return figura
+
+def carregar_resultados(uploaded_files: List, historico: Optional[HistoricoEnvios] = None) -> Dict:
+    """Retorna os resultados dos arquivos enviados, reaproveitando o cache quando possível"""
+    arquivos = [(arquivo.name, arquivo.getvalue()) for arquivo in uploaded_files]
+    # Com histórico, a versão da base entra na chave: outra sessão pode ter acrescentado registros
+    config = obter_config_analise()
+    if historico is not None:
+        config['versao_historico'] = historico.versao()
+    chave = gerar_chave_cache(arquivos, config)
+    cache = obter_cache_resultados()
+    
+    resultado = cache.obter(chave)
+    if resultado is not None:
+        logger.info(f"Cache: resultados reaproveitados para {len(arquivos)} arquivo(s)")
+        return resultado
+    
+    def processar() -> Dict:
+        # Após um reinício, o snapshot em disco atende o mesmo conteúdo sem reprocessar
+        if carregar_ultima_analise(historico) is not None and chave in cache:
+            return cache.obter(chave)
+        
+        resultado = executar_pipeline(arquivos, historico=historico)
+        resultado['chave'] = chave
+        if historico is not None:
+            # Guarda também sob a versão posterior à incorporação, que é a que os próximos reruns vão consultar
+            config['versao_historico'] = historico.versao()
+            resultado['chave'] = gerar_chave_cache(arquivos, config)
+            cache.armazenar(resultado['chave'], resultado)
+        salvar_ultima_analise(resultado, historico)
+        return resultado
+    
+    # Sessões que enviam o mesmo conteúdo ao mesmo tempo aguardam um único processamento
+    with st.spinner('🔄 Processando dados...'):
+        return cache.obter_ou_calcular(chave, processar)
+
+def salvar_ultima_analise(resultado: Dict, historico: Optional[HistoricoEnvios] = None) -> None:
+    """Salva o resultado e a análise da janela padrão como snapshot para o próximo início do app"""
+    meses_disponiveis = resultado['meses_disponiveis']
+    meses_padrao = recortar_janela(meses_disponiveis, *definir_janela_padrao(meses_disponiveis))
     try:
-        output = io.BytesIO()
+        salvar_snapshot(resultado, carregar_analise_janela(resultado, meses_padrao),
+                        versao_historico=historico.versao() if historico is not None else None)
+    except Exception as e:
+        # Sem disco gravável o app segue funcionando, só não inicia com a última análise
+        logger.warning(f"Snapshot não salvo: {str(e)}")
+
+def carregar_ultima_analise(historico: Optional[HistoricoEnvios] = None) -> Optional[Dict]:
+    """Resultado do snapshot em disco, lido uma vez por versão e semeado no cache (None se não houver)"""
+    versao = versao_snapshot_atual()
+    if versao is None:
+        return None
+    versao_historico = historico.versao() if historico is not None else None
+    chave = f"snapshot:{versao}:{versao_historico}"
+    cache = obter_cache_resultados()
+    
+    resultado = cache.obter(chave)
+    if resultado is None:
+        snapshot = carregar_snapshot(versao_historico=versao_historico)
+        if snapshot is None:
+            return None
+        resultado, analise_janela = snapshot
+        # Com as chaves originais, o reenvio dos mesmos arquivos e a janela padrão também são atendidos
+        cache.armazenar(chave, resultado)
+        cache.armazenar(resultado['chave'], resultado)
+        cache.armazenar(analise_janela['chave'], analise_janela)
+    return resultado
+
+def carregar_analise_janela(resultado: Dict, meses: List[Tuple[int, int]]) -> Dict:
+    """Retorna as análises da janela, reaproveitando o cache quando possível"""
+    chave = f"{resultado['chave']}:{meses[0]}-{meses[-1]}"
+    cache = obter_cache_resultados()
+    
+    def analisar() -> Dict:
+        analise = analisar_janela(resultado, meses)
+        analise['chave'] = chave
+        return analise
+    
+    return cache.obter_ou_calcular(chave, analisar)
+
+def obter_relatorio_excel(analise_janela: Dict, responsaveis_unicos: List[str], gerar: bool = False,
+                          monitor: Optional[MonitorDesempenho] = None) -> Optional[bytes]:
+    """Retorna o relatório Excel da análise, gerando-o apenas quando solicitado"""
+    chave = f"{analise_janela['chave']}:excel"
+    cache = obter_cache_relatorios()
+    
+    if not gerar:
+        return cache.obter(chave)
+    
+    def gerar_relatorio() -> bytes:
+        with (monitor or MonitorDesempenho()).estagio('exportacao_excel', len(responsaveis_unicos)) as medicao:
+            relatorio = exportar_relatorio_excel(
+                analise_janela['analise_mensal'], analise_janela['status_individual'], responsaveis_unicos
+            ).getvalue()
+            medicao['linhas_saida'] = len(responsaveis_unicos)
+        return relatorio
+    
+    return cache.obter_ou_calcular(chave, gerar_relatorio)
+
+def renderizar_painel_desempenho(etapas: List[Tuple[str, List[Dict]]], metricas_inicializacao: Dict) -> None:
+    """Mostra o tempo, as linhas e a memória de cada estágio, agrupados pela etapa em que foram medidos"""
+    registros = [dict(registro, etapa=etapa) for etapa, registros_etapa in etapas for registro in registros_etapa]
+    if not registros:
+        return
+    
+    with st.expander("⚡ Performance"):
+        df_desempenho = pd.DataFrame(registros)
+        df_desempenho = df_desempenho.rename(columns={
+            'etapa': 'Etapa',
+            'estagio': 'Estágio',
+            'tempo_s': 'Tempo (s)',
+            'linhas_entrada': 'Linhas (entrada)',
+            'linhas_saida': 'Linhas (saída)',
+            'pico_memoria_mb': 'Pico alocado (MB)',
+            'aumento_rss_mb': 'Aumento do pico de RSS (MB)',
+            'erro': 'Erro'
+        }).reindex(columns=['Etapa', 'Estágio', 'Tempo (s)', 'Linhas (entrada)', 'Linhas (saída)',
+                            'Pico alocado (MB)', 'Aumento do pico de RSS (MB)', 'Erro'])
+        st.dataframe(
+            df_desempenho.round({'Tempo (s)': 4, 'Pico alocado (MB)': 1, 'Aumento do pico de RSS (MB)': 1}),
+            hide_index=True,
+            use_container_width=True
+        )
         
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            # Aba 1: Resumo Geral
-            resumo_data = []
-            for mes_num, dados in analise_mensal.items():
-                resumo_data.append({
-                    'Mês': dados['mes_nome'],
-                    'Taxa de Envio (%)': round(dados['taxa_envio'], 2),
-                    'Responsáveis que Enviaram': dados['qtd_enviaram'],
-                    'Responsáveis que NÃO Enviaram': dados['qtd_nao_enviaram'],
-                    'Total de Registros': dados['total_registros'],
-                    'Média Envios/Responsável': round(dados['media_envios_por_responsavel'], 2)
-                })
-            
-            df_resumo = pd.DataFrame(resumo_data)
-            df_resumo.to_excel(writer, sheet_name='Resumo Geral', index=False)
-            
-            # Aba 2: Status Individual
-            status_data = []
-            for nome, status in status_individual.items():
-                status_data.append({
-                    'Responsável': nome,
-                    'Julho': 'Sim' if status['julho'] else 'Não',
-                    'Agosto': 'Sim' if status['agosto'] else 'Não',
-                    'Setembro': 'Sim' if status['setembro'] else 'Não',
-                    'Meses Ativos': status['meses_ativos'],
-                    'Total de Envios': status['total_envios'],
-                    'Consistência (%)': round(status['consistencia'], 2),
-                    'Situação': status['situacao']
-                })
-            
-            df_status = pd.DataFrame(status_data)
-            df_status.to_excel(writer, sheet_name='Status Individual', index=False)
-            
-            # Aba 3: Análise por Categoria
-            categorias_count = {}
-            for status in status_individual.values():
-                cat = status['categoria']
-                categorias_count[cat] = categorias_count.get(cat, 0) + 1
-            
-            categoria_data = []
-            labels_map = {
-                'ativo': 'Totalmente Ativos',
-                'parcial': 'Parcialmente Ativos',
-                'pouco': 'Pouco Ativos',
-                'inativo': 'Inativos'
+        mais_lento = max(registros, key=lambda registro: registro['tempo_s'])
+        st.caption(
+            f"Estágio mais lento: {mais_lento['estagio']} ({mais_lento['tempo_s']:.3f}s). "
+            "Carga e janela são medidas quando calculadas e reaproveitadas do cache nas execuções seguintes. "
+            "Aumento do pico de RSS: quanto o estágio elevou o pico de memória do processo "
+            "(0 quando ficou abaixo de um pico anterior). "
+            "Defina PAINEL_MEDIR_MEMORIA=1 para medir o pico alocado por estágio."
+        )
+        if metricas_inicializacao:
+            st.caption(f"Inicialização do processo: importação {metricas_inicializacao['importacao_s']:.2f}s • "
+                       f"primeira renderização {metricas_inicializacao['primeira_renderizacao_s']:.2f}s")
+        cache = obter_cache_resultados()
+        st.caption(f"Cache de resultados (compartilhado entre sessões): {len(cache)} entradas • "
+                   f"{cache.memoria_usada / 1024 ** 2:.1f} de {cache.max_memoria / 1024 ** 2:.0f} MB • "
+                   f"acertos {cache.acertos} • cálculos {cache.falhas} • esperas {cache.esperas}")
+
+def selecionar_pagina(total: int, tamanho_pagina: int, chave: str) -> Tuple[int, int]:
+    """Mostra o seletor de página (quando há mais de uma) e retorna o intervalo [inicio, fim) da página"""
+    total_paginas = max(1, -(-total // tamanho_pagina))
+    pagina = 1
+    if total_paginas > 1:
+        pagina = st.number_input(f"Página (de {total_paginas})", min_value=1, max_value=total_paginas,
+                                 value=1, step=1, key=chave)
+    inicio = (pagina - 1) * tamanho_pagina
+    return inicio, min(inicio + tamanho_pagina, total)
+
+@st.fragment
+def renderizar_lista_responsaveis(nomes: np.ndarray, indices: np.ndarray, chaves_busca: np.ndarray,
+                                  classe_css: str, chave: str) -> None:
+    """Renderiza uma lista de responsáveis com busca e paginação (só a página visível vai ao navegador)"""
+    termo = st.text_input("🔎 Buscar responsável", key=f"{chave}_busca", placeholder="Buscar responsável",
+                          label_visibility='collapsed')
+    if termo:
+        indices = AnalyticsEngine.filtrar_por_nome(indices, chaves_busca, termo)
+    if not len(indices):
+        st.caption("Nenhum responsável encontrado.")
+        return
+    
+    inicio, fim = selecionar_pagina(len(indices), TAMANHO_PAGINA_NOMES, f"{chave}_pagina")
+    st.markdown(" ".join(
+        f"<span class='{classe_css}'>{html.escape(nome)}</span>" for nome in nomes[indices[inicio:fim]]
+    ), unsafe_allow_html=True)
+    st.caption(f"{inicio + 1}–{fim} de {len(indices)}")
+
+@st.cache_resource
+def obter_pool_renderizacao() -> ProcessPoolExecutor:
+    """Processos que renderizam as imagens dos relatórios fora da thread do script"""
+    return ProcessPoolExecutor(max_workers=MAX_PROCESSOS_RENDERIZACAO)
+
+def descartar_pool_renderizacao(pool: ProcessPoolExecutor) -> None:
+    """Encerra um pool quebrado ou travado; a próxima renderização cria outro"""
+    processos = list((getattr(pool, '_processes', None) or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for processo in processos:
+        if processo.is_alive():
+            processo.terminate()  # Worker do kaleido sem resposta
+    # Outra sessão pode já ter substituído o pool: só descarta se ainda for o atual
+    if obter_pool_renderizacao() is pool:
+        obter_pool_renderizacao.clear()
+
+def construir_figuras_relatorio(analise_janela: Dict, rotulos_meses: List[str]) -> Dict[str, go.Figure]:
+    """Figuras do relatório PDF/PNG, reaproveitando as do cache de figuras"""
+    status_individual = analise_janela['status_individual']
+    linhas_heatmap = analise_janela['ordem_consistencia'][:LINHAS_HEATMAP_RELATORIO]
+    figuras = {
+        'evolucao': obter_figura(
+            analise_janela, 'evolucao', (),
+            lambda: ChartGenerator.criar_grafico_evolucao(analise_janela['analise_mensal'], analise_janela['tendencias'])
+        ),
+        'situacao': obter_figura(
+            analise_janela, 'pizza', (),
+            lambda: ChartGenerator.criar_grafico_pizza_situacao(status_individual)
+        ),
+        'consistencia': obter_figura(
+            analise_janela, 'heatmap', (0, len(linhas_heatmap)),
+            lambda: ChartGenerator.criar_grafico_heatmap_consistencia(status_individual, rotulos_meses, linhas_heatmap)
+        )
+    }
+    return {nome: figura for nome, figura in figuras.items() if figura is not None}
+
+def obter_relatorio_imagens(analise_janela: Dict, rotulos_meses: List[str], gerar: bool = False,
+                            monitor: Optional[MonitorDesempenho] = None) -> Optional[Dict[str, bytes]]:
+    """Retorna o relatório em PDF e PNG (ZIP) da análise, renderizado uma única vez por análise"""
+    chave = f"{analise_janela['chave']}:imagens"
+    cache = obter_cache_relatorios()
+    
+    if not gerar:
+        return cache.obter(chave)
+    
+    monitor = monitor or MonitorDesempenho()
+    
+    def renderizar() -> Dict[str, bytes]:
+        with monitor.estagio('exportacao_pdf', len(analise_janela['status_individual']['nomes'])) as medicao:
+            pool = obter_pool_renderizacao()
+            futuros = {
+                nome: pool.submit(renderizar_figura_png, figura.to_json())
+                for nome, figura in construir_figuras_relatorio(analise_janela, rotulos_meses).items()
             }
-            
-            for cat, count in categorias_count.items():
-                categoria_data.append({
-                    'Categoria': labels_map[cat],
-                    'Quantidade': count,
-                    'Percentual (%)': round((count / len(responsaveis_unicos)) * 100, 2)
-                })
-            
-            df_categorias = pd.DataFrame(categoria_data)
-            df_categorias.to_excel(writer, sheet_name='Análise por Categoria', index=False)
+            prazo = time.monotonic() + TEMPO_MAXIMO_RENDERIZACAO_S
+            try:
+                imagens = {
+                    nome: futuro.result(timeout=max(prazo - time.monotonic(), 0))
+                    for nome, futuro in futuros.items()
+                }
+            except (BrokenProcessPool, TimeoutError) as e:
+                # Um worker que caiu quebra o pool para sempre, e um travado ocupa sua vaga: recria o pool
+                logger.error(f"Erro ao renderizar gráficos: pool de renderização descartado ({type(e).__name__})")
+                descartar_pool_renderizacao(pool)
+                raise Exception(
+                    "Erro ao renderizar gráficos: o processo de renderização foi encerrado ou não respondeu "
+                    f"em {TEMPO_MAXIMO_RENDERIZACAO_S}s; tente novamente"
+                )
+            except BaseException:
+                for futuro in futuros.values():
+                    futuro.cancel()
+                raise
+            
+            relatorio = {
+                'pdf': montar_relatorio_pdf(list(imagens.values())),
+                'png': compactar_imagens(imagens)
+            }
+            medicao['linhas_saida'] = len(imagens)
+        return relatorio
+    
+    # Sessões que pedem o mesmo relatório aguardam a mesma renderização; uma falha não fica no cache
+    try:
+        return cache.obter_ou_calcular(chave, renderizar)
+    except Exception:
+        cache.remover(chave)
+        raise
+
+@st.fragment
+def renderizar_mapa_consistencia(analise_janela: Dict, rotulos_meses: List[str], monitor: MonitorDesempenho) -> None:
+    """Heatmap paginado; trocar de página reexecuta só esta seção"""
+    status_individual = analise_janela['status_individual']
+    ordem_consistencia = analise_janela['ordem_consistencia']
+    col_pagina, col_tamanho = st.columns([3, 1])
+    with col_tamanho:
+        tamanho_pagina = st.selectbox("Responsáveis por página", TAMANHOS_PAGINA_HEATMAP,
+                                      key='heatmap_tamanho_pagina')
+    with col_pagina:
+        inicio_pagina, fim_pagina = selecionar_pagina(len(ordem_consistencia), tamanho_pagina, 'heatmap_pagina')
+    linhas_pagina = ordem_consistencia[inicio_pagina:fim_pagina]
+    st.caption(f"Mostrando {inicio_pagina + 1}–{fim_pagina} de "
+               f"{len(ordem_consistencia)} responsáveis, do mais ao menos consistente")
+    
+    with monitor.estagio('grafico_heatmap', len(linhas_pagina)):
+        fig_heatmap = obter_figura(
+            analise_janela, 'heatmap', (inicio_pagina, fim_pagina),
+            lambda: ChartGenerator.criar_grafico_heatmap_consistencia(status_individual, rotulos_meses, linhas_pagina)
+        )
+    if fig_heatmap:
+        st.plotly_chart(fig_heatmap, use_container_width=True)
+    else:
+        st.info("Heatmap não disponível para este conjunto de dados.")
+
+def obter_tabela_status(analise_janela: Dict, rotulos_meses: List[str]) -> pd.DataFrame:
+    """Tabela de status formatada e ordenada por consistência, montada uma vez por análise"""
+    def montar() -> pd.DataFrame:
+        status_individual = analise_janela['status_individual']
+        ordem = analise_janela['ordem_consistencia']
+        meses_enviou = AnalyticsEngine.expandir_meses(status_individual, ordem)
+        consistencia = AnalyticsEngine.calcular_consistencia(status_individual)[ordem]
         
-        output.seek(0)
-        return output
+        tabela = pd.DataFrame({'Responsável': status_individual['nomes'][ordem]})
+        for indice, rotulo in enumerate(rotulos_meses):
+            tabela[rotulo] = np.where(meses_enviou[:, indice], '✅', '❌')
+        tabela['Meses Ativos'] = status_individual['meses_ativos'][ordem]
+        tabela['Total Envios'] = status_individual['total_envios'][ordem]
+        tabela['Consistência (%)'] = [f"{valor:.1f}%" for valor in consistencia]
+        tabela['Situação'] = AnalyticsEngine.listar_situacoes(status_individual)[ordem]
+        return tabela
+    
+    # Entrada própria no cache: a análise já armazenada não é alterada e a tabela conta no limite de memória
+    return obter_cache_resultados().obter_ou_calcular(f"{analise_janela['chave']}:tabela", montar)
+
+@st.fragment
+def renderizar_tabela_status(analise_janela: Dict, rotulos_meses: List[str]) -> None:
+    """Filtro por situação e tabela de status; mudar o filtro reexecuta só esta seção"""
+    categorias_filtro = st.multiselect(
+        "Filtrar por situação:",
+        options=['ativo', 'parcial', 'pouco', 'inativo'],
+        default=['ativo', 'parcial', 'pouco', 'inativo'],
+        format_func=lambda x: {
+            'ativo': '🟢 Totalmente Ativos',
+            'parcial': '🟡 Parcialmente Ativos',
+            'pouco': '🟠 Pouco Ativos', 
+            'inativo': '🔴 Inativos'
+        }[x],
+        key='filtro_situacao'
+    )
+    
+    # Filtrar por categoria selecionada (a tabela já está na ordem de consistência)
+    status_individual = analise_janela['status_individual']
+    mascara_filtro = np.isin(
+        status_individual['codigos_categoria'][analise_janela['ordem_consistencia']],
+        [CATEGORIAS.index(cat) for cat in categorias_filtro]
+    )
+    
+    if mascara_filtro.any():
+        df_status = obter_tabela_status(analise_janela, rotulos_meses)[mascara_filtro]
         
-    except Exception as e:
-        logger.error(f"Erro ao exportar Excel: {str(e)}")
-        raise Exception(f"Erro ao exportar relatório: {str(e)}")
+        # Exibir tabela com estilo
+        st.dataframe(
+            df_status,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Responsável": st.column_config.TextColumn("👤 Responsável", width="medium"),
+                **{
+                    rotulo: st.column_config.TextColumn(
+                        f"📅 {NOMES_MESES[mes][:3]}/{str(ano)[2:]}", width="small"
+                    )
+                    for rotulo, (ano, mes) in zip(rotulos_meses, analise_janela['meses'])
+                },
+                "Meses Ativos": st.column_config.NumberColumn("📊 Ativos", width="small"),
+                "Total Envios": st.column_config.NumberColumn("📈 Total", width="small"),
+                "Consistência (%)": st.column_config.TextColumn("🎯 Consist.", width="small"),
+                "Situação": st.column_config.TextColumn("🏷️ Situação", width="large")
+            }
+        )
+    else:
+        st.info("Nenhum responsável encontrado com os filtros selecionados.")
 
 # Interface principal
-def main():
-    # Header moderno
-    st.markdown("""
+def renderizar_cabecalho(container, subtitulo: str) -> None:
+    """Renderiza o header principal no container informado"""
+    container.markdown(f"""
     <div class="main-header fade-in-up">
         <h1>📊 Painel de Acompanhamento de Reports</h1>
-        <p>Análise Completa e Inteligente • Julho, Agosto e Setembro 2025</p>
+        <p>{subtitulo}</p>
     </div>
     """, unsafe_allow_html=True)
+
+def main():
+    inicio_renderizacao = time.perf_counter()
+    configurar_pagina()
+    
+    # Header moderno (o período é preenchido quando a janela de análise é definida)
+    cabecalho = st.empty()
+    renderizar_cabecalho(cabecalho, "Análise Completa e Inteligente")
     
     # Sidebar aprimorada
     with st.sidebar:
         st.markdown("### 📁 Upload de Dados")
         
-        uploaded_file = st.file_uploader(
-            "Envie a planilha Excel",
-            type=['xlsx', 'xls'],
-            help="Faça upload do arquivo 'Reports_Geral_Consolidado.xlsx'",
-            accept_multiple_files=False
+        uploaded_files = st.file_uploader(
+            "Envie as planilhas (Excel, CSV, Parquet ou Arrow/Feather)",
+            type=[extensao.lstrip('.') for extensao in EXTENSOES_FORMATO],
+            help="Faça upload de 'Reports_Geral_Consolidado.xlsx' ou das planilhas regionais",
+            accept_multiple_files=True
         )
         
-        if uploaded_file is not None:
-            st.success("✅ Arquivo carregado com sucesso!")
-            st.info(f"📄 **{uploaded_file.name}**")
-            st.caption(f"Tamanho: {uploaded_file.size / 1024:.1f} KB")
+        if uploaded_files:
+            st.success(f"✅ {len(uploaded_files)} arquivo(s) carregado(s) com sucesso!")
+            for arquivo in uploaded_files:
+                st.info(f"📄 **{arquivo.name}**")
+            st.caption(f"Tamanho total: {sum(arquivo.size for arquivo in uploaded_files) / 1024:.1f} KB")
+        
+        usar_historico = st.checkbox(
+            "💾 Acumular no histórico local",
+            help="Acrescenta os envios novos à base local e analisa todo o histórico acumulado; "
+                 "registros já armazenados (mesmo responsável e data) são ignorados"
+        )
         
         st.markdown("---")
         st.markdown("### 🔍 Filtros e Configurações")
         
+    # Sem upload, a última análise salva em disco é exibida enquanto ainda for válida
+    historico = obter_historico() if usar_historico else None
+    ultima_analise = None if uploaded_files else carregar_ultima_analise(historico)
+    
     # Processar dados se arquivo foi carregado
-    if uploaded_file is not None:
+    if uploaded_files or ultima_analise is not None:
         try:
-            # Ler arquivo Excel
-            with st.spinner('🔄 Processando dados...'):
-                df = pd.read_excel(uploaded_file)
-                
-                # Validar arquivo
-                valido, mensagem = DataProcessor.validar_arquivo(df)
-                if not valido:
-                    st.error(f"❌ {mensagem}")
+            # Ler, validar e analisar (reaproveitando o cache entre reruns)
+            if ultima_analise is not None:
+                resultado = ultima_analise
+                st.info(
+                    "🕘 Exibindo a última análise salva, de "
+                    f"{datetime.fromtimestamp(resultado['snapshot']['criado_em']).strftime('%d/%m/%Y %H:%M')}. "
+                    "Envie as planilhas na barra lateral para atualizar."
+                )
+            else:
+                try:
+                    resultado = carregar_resultados(uploaded_files, historico)
+                except ArquivoInvalidoError as e:
+                    st.error(f"❌ {str(e)}")
                     st.stop()
-                
-                # Processar dados
-                df_processado = DataProcessor.processar_dados(df)
-                
-                # Obter responsáveis únicos
-                responsaveis_unicos = sorted(df_processado['RESPONSÁVEL'].dropna().unique())
-                
-                # Análises
-                analise_mensal = AnalyticsEngine.calcular_analise_mensal(df_processado, responsaveis_unicos)
-                status_individual = AnalyticsEngine.calcular_status_individual(df_processado, responsaveis_unicos)
-                tendencias = AnalyticsEngine.calcular_tendencias(analise_mensal)
             
-            # Filtro de categoria na sidebar
+            # Estágios medidos nesta execução (gráficos e exportação)
+            monitor_tela = MonitorDesempenho()
+            
+            responsaveis_unicos = resultado['responsaveis_unicos']
+            meses_disponiveis = resultado['meses_disponiveis']
+            
+            # Janela de análise e filtro de categoria na sidebar
             with st.sidebar:
-                categorias_filtro = st.multiselect(
-                    "Filtrar por situação:",
-                    options=['ativo', 'parcial', 'pouco', 'inativo'],
-                    default=['ativo', 'parcial', 'pouco', 'inativo'],
-                    format_func=lambda x: {
-                        'ativo': '🟢 Totalmente Ativos',
-                        'parcial': '🟡 Parcialmente Ativos',
-                        'pouco': '🟠 Pouco Ativos', 
-                        'inativo': '🔴 Inativos'
-                    }[x]
+                if len(meses_disponiveis) > 1:
+                    inicio_janela, fim_janela = st.select_slider(
+                        "Período de análise:",
+                        options=meses_disponiveis,
+                        value=definir_janela_padrao(meses_disponiveis),
+                        format_func=rotulo_mes
+                    )
+                else:
+                    inicio_janela = fim_janela = meses_disponiveis[0]
+                meses_janela = recortar_janela(meses_disponiveis, inicio_janela, fim_janela)
+                
+                # Análises da janela: apenas um recorte da matriz pré-calculada
+                analise_janela = carregar_analise_janela(resultado, meses_janela)
+                analise_mensal = analise_janela['analise_mensal']
+                status_individual = analise_janela['status_individual']
+                tendencias = analise_janela['tendencias']
+                rotulos_meses = [analise_mensal[mes]['rotulo'] for mes in meses_janela]
+                renderizar_cabecalho(
+                    cabecalho, f"Análise Completa e Inteligente • {descrever_janela(meses_janela)}"
                 )
+
                 
                 st.markdown("---")
                 st.markdown("### 📋 Resumo Rápido")
                 st.metric("Total de Responsáveis", len(responsaveis_unicos))
-                st.metric("Período Analisado", "3 meses")
-                st.metric("Registros Processados", len(df_processado))
-                st.metric("Última Atualização", datetime.now().strftime("%d/%m/%Y %H:%M"))
+                st.metric("Período Analisado", f"{len(meses_janela)} meses")
+                st.metric("Registros Processados", resultado['registros_validos'])
+                estatisticas_leitura = resultado['estatisticas_leitura']
+                st.caption(
+                    f"Linhas lidas: {estatisticas_leitura['linhas_lidas']} • "
+                    f"ignoradas: {estatisticas_leitura['linhas_ignoradas']} • "
+                    f"leitura: {estatisticas_leitura['tempo_total_s']:.2f}s"
+                )
+                if resultado['conversao_datas']:
+                    st.caption("Datas por formato: " + " • ".join(
+                        f"{origem}: {qtd}" for origem, qtd in resultado['conversao_datas'].items() if qtd
+                    ))
+                if resultado['incorporacao'] is not None:
+                    incorporacao = resultado['incorporacao']
+                    st.caption(
+                        f"Histórico: {incorporacao['registros_novos']} registros novos • "
+                        f"{incorporacao['registros_duplicados']} já armazenados • "
+                        f"meses atualizados: {len(incorporacao['meses_afetados'])}"
+                    )
+                if len(estatisticas_leitura['fontes']) > 1:
+                    with st.expander(f"📂 Fontes ({len(estatisticas_leitura['fontes'])})"):
+                        st.dataframe(
+                            pd.DataFrame(estatisticas_leitura['fontes'])[
+                                ['origem', 'linhas_lidas', 'linhas_ignoradas', 'tempo_s']
+                            ].round({'tempo_s': 2}),
+                            hide_index=True
+                        )
+                atualizado_em = (datetime.fromtimestamp(resultado['snapshot']['criado_em'])
+                                 if 'snapshot' in resultado else datetime.now())
+                st.metric("Última Atualização", atualizado_em.strftime("%d/%m/%Y %H:%M"))
                 
                 # Botão de exportação
                 st.markdown("---")
                 st.markdown("### 📤 Exportar Dados")
                 
                 try:
-                    excel_buffer = exportar_relatorio_excel(analise_mensal, status_individual, responsaveis_unicos)
-                    st.download_button(
-                        label="📊 Baixar Relatório Excel",
-                        data=excel_buffer,
-                        file_name=f"relatorio_reports_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                    )
+                    # O relatório só é montado quando pedido e fica em cache para esta análise
+                    relatorio_excel = obter_relatorio_excel(analise_janela, responsaveis_unicos)
+                    if relatorio_excel is None and st.button("📊 Gerar Relatório Excel"):
+                        with st.spinner('📄 Gerando relatório...'):
+                            relatorio_excel = obter_relatorio_excel(
+                                analise_janela, responsaveis_unicos, gerar=True, monitor=monitor_tela
+                            )
+                    
+                    if relatorio_excel is not None:
+                        st.download_button(
+                            label="📊 Baixar Relatório Excel",
+                            data=relatorio_excel,
+                            file_name=f"relatorio_reports_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                        )
                 except Exception as e:
                     st.error(f"Erro ao preparar exportação: {str(e)}")
+                
+                if carregar_plotly() is not None:
+                    try:
+                        # Gráficos renderizados em processos separados e montados em PDF
+                        relatorio_imagens = obter_relatorio_imagens(analise_janela, rotulos_meses)
+                        if relatorio_imagens is None and st.button("📄 Gerar Relatório PDF"):
+                            with st.spinner('🖼️ Renderizando gráficos...'):
+                                relatorio_imagens = obter_relatorio_imagens(
+                                    analise_janela, rotulos_meses, gerar=True, monitor=monitor_tela
+                                )
+                        
+                        if relatorio_imagens is not None:
+                            sufixo = datetime.now().strftime('%Y%m%d_%H%M%S')
+                            st.download_button(
+                                label="📄 Baixar Relatório PDF",
+                                data=relatorio_imagens['pdf'],
+                                file_name=f"relatorio_reports_{sufixo}.pdf",
+                                mime="application/pdf"
+                            )
+                            st.download_button(
+                                label="🖼️ Baixar Gráficos (PNG)",
+                                data=relatorio_imagens['png'],
+                                file_name=f"graficos_reports_{sufixo}.zip",
+                                mime="application/zip"
+                            )
+                    except Exception as e:
+                        logger.error(f"Erro ao gerar relatório PDF: {str(e)}")
+                        st.error(f"Erro ao gerar relatório PDF: {str(e)}")
+                        if 'kaleido' in str(e):
+                            st.info("A exportação em PDF/PNG requer o pacote kaleido (pip install kaleido).")
             
             # Métricas principais com design moderno
             st.markdown("### 📈 Métricas Principais")
-            col1, col2, col3, col4, col5 = st.columns(5)
+            colunas_metricas = st.columns(len(meses_janela) + 2) if len(meses_janela) <= 4 else st.columns(6)
             
-            with col1:
+            with colunas_metricas[0]:
                 st.metric(
                     label="📋 Total Responsáveis",
                     value=len(responsaveis_unicos),
                     help="Número total de responsáveis únicos no sistema"
                 )
             
-            with col2:
-                st.metric(
-                    label="📅 Taxa Julho",
-                    value=f"{analise_mensal[7]['taxa_envio']:.1f}%",
-                    help="Percentual de responsáveis que enviaram reports em julho"
-                )
-            
-            with col3:
-                delta_ago = analise_mensal[8]['taxa_envio'] - analise_mensal[7]['taxa_envio']
-                st.metric(
-                    label="📅 Taxa Agosto", 
-                    value=f"{analise_mensal[8]['taxa_envio']:.1f}%",
-                    delta=f"{delta_ago:.1f}pp",
-                    help="Percentual de responsáveis que enviaram reports em agosto"
-                )
-            
-            with col4:
-                delta_set = analise_mensal[9]['taxa_envio'] - analise_mensal[8]['taxa_envio']
-                st.metric(
-                    label="📅 Taxa Setembro",
-                    value=f"{analise_mensal[9]['taxa_envio']:.1f}%", 
-                    delta=f"{delta_set:.1f}pp",
-                    help="Percentual de responsáveis que enviaram reports em setembro"
-                )
+            # Uma métrica por mês (limitada aos 4 últimos meses em janelas longas)
+            meses_metricas = meses_janela[-4:]
+            for coluna, mes in zip(colunas_metricas[1:], meses_metricas):
+                indice = meses_janela.index(mes)
+                with coluna:
+                    delta = None
+                    if indice > 0:
+                        delta = f"{analise_mensal[mes]['taxa_envio'] - analise_mensal[meses_janela[indice - 1]]['taxa_envio']:.1f}pp"
+                    st.metric(
+                        label=f"📅 Taxa {analise_mensal[mes]['mes_nome']}",
+                        value=f"{analise_mensal[mes]['taxa_envio']:.1f}%",
+                        delta=delta,
+                        help=f"Percentual de responsáveis que enviaram reports em {analise_mensal[mes]['rotulo'].lower()}"
+                    )
             
-            with col5:
-                consistentes = sum(1 for s in status_individual.values() if s['meses_ativos'] == 3)
+            with colunas_metricas[len(meses_metricas) + 1]:
+                consistentes = int((status_individual['meses_ativos'] == len(meses_janela)).sum())
                 st.metric(
                     label="⭐ Consistentes",
                     value=f"{(consistentes/len(responsaveis_unicos)*100):.1f}%",
                     delta=f"{consistentes} resp.",
-                    help="Responsáveis que enviaram reports nos 3 meses"
+                    help=f"Responsáveis que enviaram reports nos {len(meses_janela)} meses"
                 )
             
             # Análise de tendência
@@ -1109,13 +941,13 @@ def main():
             
             with col2:
                 st.metric(
-                    label="🔮 Previsão Outubro",
+                    label=f"🔮 Previsão {tendencias['proximo_mes_nome']}",
                     value=f"{tendencias['previsao_proximo_mes']:.1f}%",
-                    help="Previsão baseada na tendência linear dos últimos 3 meses"
+                    help=f"Previsão baseada na tendência linear dos últimos {len(meses_janela)} meses"
                 )
             
             with col3:
-                media_geral = np.mean([analise_mensal[mes]['taxa_envio'] for mes in MESES_ANALISE.keys()])
+                media_geral = np.mean([analise_mensal[mes]['taxa_envio'] for mes in meses_janela])
                 st.metric(
                     label="📊 Média do Período",
                     value=f"{media_geral:.1f}%",
@@ -1123,28 +955,35 @@ def main():
                 )
             
             # Alerta crítico ou sucesso
-            queda_total = analise_mensal[7]['taxa_envio'] - analise_mensal[9]['taxa_envio']
+            primeiro_mes, ultimo_mes = meses_janela[0], meses_janela[-1]
+            queda_total = analise_mensal[primeiro_mes]['taxa_envio'] - analise_mensal[ultimo_mes]['taxa_envio']
+            
+            if queda_total > 10 or queda_total < -5:
+                queda = queda_total > 10
+                cards_meses = ""
+                for indice, mes in enumerate(meses_janela):
+                    dados = analise_mensal[mes]
+                    variacao = ""
+                    if indice > 0:
+                        diferenca = dados['taxa_envio'] - analise_mensal[meses_janela[indice - 1]]['taxa_envio']
+                        if queda:
+                            variacao = f'<br><span style="color: #d32f2f;">↓ Queda de {-diferenca:.1f}pp</span>'
+                        else:
+                            variacao = f'<br><span style="color: #2e7d32;">↑ Crescimento de {diferenca:.1f}pp</span>'
+                    cards_meses += f"""
+                        <div style="background: rgba(255,255,255,0.7); padding: 1rem; border-radius: 8px;">
+                            <strong>📊 {dados['mes_nome']}:</strong> {dados['taxa_envio']:.1f}% ({dados['qtd_enviaram']} responsáveis){variacao}
+                        </div>"""
             
             if queda_total > 10:  # Queda significativa
                 st.markdown(f"""
                 <div class="alert-critical fade-in-up">
                     <h3>🚨 SITUAÇÃO CRÍTICA: Queda Drástica nas Taxas de Envios</h3>
-                    <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 1rem; margin: 1rem 0;">
-                        <div style="background: rgba(255,255,255,0.7); padding: 1rem; border-radius: 8px;">
-                            <strong>📊 Julho:</strong> {analise_mensal[7]['taxa_envio']:.1f}% ({analise_mensal[7]['qtd_enviaram']} responsáveis)
-                        </div>
-                        <div style="background: rgba(255,255,255,0.7); padding: 1rem; border-radius: 8px;">
-                            <strong>📊 Agosto:</strong> {analise_mensal[8]['taxa_envio']:.1f}% ({analise_mensal[8]['qtd_enviaram']} responsáveis)<br>
-                            <span style="color: #d32f2f;">↓ Queda de {analise_mensal[7]['taxa_envio'] - analise_mensal[8]['taxa_envio']:.1f}pp</span>
-                        </div>
-                        <div style="background: rgba(255,255,255,0.7); padding: 1rem; border-radius: 8px;">
-                            <strong>📊 Setembro:</strong> {analise_mensal[9]['taxa_envio']:.1f}% ({analise_mensal[9]['qtd_enviaram']} responsáveis)<br>
-                            <span style="color: #d32f2f;">↓ Queda de {analise_mensal[8]['taxa_envio'] - analise_mensal[9]['taxa_envio']:.1f}pp</span>
-                        </div>
+                    <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 1rem; margin: 1rem 0;">{cards_meses}
                     </div>
                     <div style="background: rgba(211, 47, 47, 0.1); padding: 1rem; border-radius: 8px; border-left: 4px solid #d32f2f; margin-top: 1rem;">
-                        <strong>🎯 Resultado:</strong> Perda total de {queda_total:.1f} pontos percentuais em 3 meses!<br>
-                        <strong>🔮 Previsão:</strong> Se a tendência continuar, outubro pode ter {tendencias['previsao_proximo_mes']:.1f}% de taxa de envios.
+                        <strong>🎯 Resultado:</strong> Perda total de {queda_total:.1f} pontos percentuais em {len(meses_janela)} meses!<br>
+                        <strong>🔮 Previsão:</strong> Se a tendência continuar, {tendencias['proximo_mes_nome'].lower()} pode ter {tendencias['previsao_proximo_mes']:.1f}% de taxa de envios.
                     </div>
                 </div>
                 """, unsafe_allow_html=True)
@@ -1152,22 +991,11 @@ def main():
                 st.markdown(f"""
                 <div class="alert-success fade-in-up">
                     <h3>✅ SITUAÇÃO POSITIVA: Crescimento nas Taxas de Envios</h3>
-                    <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 1rem; margin: 1rem 0;">
-                        <div style="background: rgba(255,255,255,0.7); padding: 1rem; border-radius: 8px;">
-                            <strong>📊 Julho:</strong> {analise_mensal[7]['taxa_envio']:.1f}% ({analise_mensal[7]['qtd_enviaram']} responsáveis)
-                        </div>
-                        <div style="background: rgba(255,255,255,0.7); padding: 1rem; border-radius: 8px;">
-                            <strong>📊 Agosto:</strong> {analise_mensal[8]['taxa_envio']:.1f}% ({analise_mensal[8]['qtd_enviaram']} responsáveis)<br>
-                            <span style="color: #2e7d32;">↑ Crescimento de {analise_mensal[8]['taxa_envio'] - analise_mensal[7]['taxa_envio']:.1f}pp</span>
-                        </div>
-                        <div style="background: rgba(255,255,255,0.7); padding: 1rem; border-radius: 8px;">
-                            <strong>📊 Setembro:</strong> {analise_mensal[9]['taxa_envio']:.1f}% ({analise_mensal[9]['qtd_enviaram']} responsáveis)<br>
-                            <span style="color: #2e7d32;">↑ Crescimento de {analise_mensal[9]['taxa_envio'] - analise_mensal[8]['taxa_envio']:.1f}pp</span>
-                        </div>
+                    <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 1rem; margin: 1rem 0;">{cards_meses}
                     </div>
                     <div style="background: rgba(46, 125, 50, 0.1); padding: 1rem; border-radius: 8px; border-left: 4px solid #2e7d32; margin-top: 1rem;">
-                        <strong>🎯 Resultado:</strong> Crescimento total de {abs(queda_total):.1f} pontos percentuais em 3 meses!<br>
-                        <strong>🔮 Previsão:</strong> Mantendo a tendência, outubro pode alcançar {tendencias['previsao_proximo_mes']:.1f}% de taxa de envios.
+                        <strong>🎯 Resultado:</strong> Crescimento total de {abs(queda_total):.1f} pontos percentuais em {len(meses_janela)} meses!<br>
+                        <strong>🔮 Previsão:</strong> Mantendo a tendência, {tendencias['proximo_mes_nome'].lower()} pode alcançar {tendencias['previsao_proximo_mes']:.1f}% de taxa de envios.
                     </div>
                 </div>
                 """, unsafe_allow_html=True)
@@ -1175,26 +1003,30 @@ def main():
             # Gráficos modernos
             st.markdown("### 📊 Análise Visual")
             
-            if PLOTLY_AVAILABLE:
+            if carregar_plotly() is not None:
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    fig_evolucao = ChartGenerator.criar_grafico_evolucao(analise_mensal, tendencias)
+                    with monitor_tela.estagio('grafico_evolucao', len(analise_mensal)):
+                        fig_evolucao = obter_figura(
+                            analise_janela, 'evolucao', (),
+                            lambda: ChartGenerator.criar_grafico_evolucao(analise_mensal, tendencias)
+                        )
                     if fig_evolucao:
                         st.plotly_chart(fig_evolucao, use_container_width=True)
                 
                 with col2:
-                    fig_pizza = ChartGenerator.criar_grafico_pizza_situacao(status_individual)
+                    with monitor_tela.estagio('grafico_pizza', len(responsaveis_unicos)):
+                        fig_pizza = obter_figura(
+                            analise_janela, 'pizza', (),
+                            lambda: ChartGenerator.criar_grafico_pizza_situacao(status_individual)
+                        )
                     if fig_pizza:
                         st.plotly_chart(fig_pizza, use_container_width=True)
                 
-                # Heatmap de consistência
+                # Heatmap de consistência, paginado (o navegador recebe só a página visível)
                 st.markdown("### 🔥 Mapa de Consistência")
-                fig_heatmap = ChartGenerator.criar_grafico_heatmap_consistencia(status_individual)
-                if fig_heatmap:
-                    st.plotly_chart(fig_heatmap, use_container_width=True)
-                else:
-                    st.info("Heatmap não disponível para este conjunto de dados.")
+                renderizar_mapa_consistencia(analise_janela, rotulos_meses, monitor_tela)
             else:
                 st.warning("⚠️ Gráficos interativos não disponíveis. Exibindo dados em formato alternativo.")
                 
@@ -1203,17 +1035,14 @@ def main():
                 with col1:
                     st.subheader("📈 Evolução das Taxas")
                     dados_evolucao = pd.DataFrame({
-                        'Mês': list(MESES_ANALISE.values()),
-                        'Taxa (%)': [analise_mensal[mes]['taxa_envio'] for mes in sorted(MESES_ANALISE.keys())]
+                        'Mês': rotulos_meses,
+                        'Taxa (%)': [analise_mensal[mes]['taxa_envio'] for mes in meses_janela]
                     })
                     st.bar_chart(dados_evolucao.set_index('Mês'))
                 
                 with col2:
                     st.subheader("🎯 Situação dos Responsáveis")
-                    categorias_count = {}
-                    for status in status_individual.values():
-                        cat = status['categoria']
-                        categorias_count[cat] = categorias_count.get(cat, 0) + 1
+                    categorias_count = AnalyticsEngine.contar_categorias(status_individual)
                     
                     labels_map = {
                         'ativo': '🟢 Totalmente Ativos',
@@ -1231,9 +1060,9 @@ def main():
             # Análise detalhada por mês com design melhorado
             st.markdown("### 📅 Análise Detalhada por Mês")
             
-            tab_jul, tab_ago, tab_set = st.tabs(["🌞 Julho 2025", "🌻 Agosto 2025", "🍂 Setembro 2025"])
+            tabs_meses = st.tabs([f"📅 {rotulo}" for rotulo in rotulos_meses])
             
-            for tab, mes_num in zip([tab_jul, tab_ago, tab_set], [7, 8, 9]):
+            for tab, mes_num in zip(tabs_meses, meses_janela):
                 with tab:
                     dados = analise_mensal[mes_num]
                     
@@ -1254,79 +1083,33 @@ def main():
                     
                     with col1:
                         st.markdown("#### ✅ Responsáveis que Enviaram")
-                        if dados['responsaveis_enviaram']:
-                            responsaveis_html = ""
-                            for resp in sorted(dados['responsaveis_enviaram']):
-                                responsaveis_html += f"<span class='status-enviou'>{resp}</span> "
-                            st.markdown(responsaveis_html, unsafe_allow_html=True)
+                        if dados['qtd_enviaram']:
+                            renderizar_lista_responsaveis(
+                                dados['nomes_responsaveis'], dados['indices_enviaram'], resultado['chaves_busca'],
+                                'status-enviou', f"enviaram_{mes_num[0]}_{mes_num[1]}"
+                            )
                         else:
                             st.info("Nenhum responsável enviou neste mês.")
                     
                     with col2:
                         st.markdown("#### ❌ Responsáveis que NÃO Enviaram")
-                        if dados['responsaveis_nao_enviaram']:
-                            responsaveis_html = ""
-                            for resp in sorted(dados['responsaveis_nao_enviaram']):
-                                responsaveis_html += f"<span class='status-nao-enviou'>{resp}</span> "
-                            st.markdown(responsaveis_html, unsafe_allow_html=True)
+                        if dados['qtd_nao_enviaram']:
+                            renderizar_lista_responsaveis(
+                                dados['nomes_responsaveis'], dados['indices_nao_enviaram'], resultado['chaves_busca'],
+                                'status-nao-enviou', f"nao_enviaram_{mes_num[0]}_{mes_num[1]}"
+                            )
                         else:
                             st.success("Todos os responsáveis enviaram!")
             
             # Status individual dos responsáveis
             st.markdown("### 👥 Status Individual dos Responsáveis")
             
-            # Filtrar por categoria selecionada
-            responsaveis_filtrados = {
-                nome: status for nome, status in status_individual.items() 
-                if status['categoria'] in categorias_filtro
-            }
-            
-            if responsaveis_filtrados:
-                # Criar DataFrame para exibição
-                dados_tabela = []
-                for nome, status in responsaveis_filtrados.items():
-                    dados_tabela.append({
-                        'Responsável': nome,
-                        'Julho': '✅' if status['julho'] else '❌',
-                        'Agosto': '✅' if status['agosto'] else '❌',
-                        'Setembro': '✅' if status['setembro'] else '❌',
-                        'Meses Ativos': status['meses_ativos'],
-                        'Total Envios': status['total_envios'],
-                        'Consistência (%)': f"{status['consistencia']:.1f}%",
-                        'Situação': status['situacao']
-                    })
-                
-                df_status = pd.DataFrame(dados_tabela)
-                
-                # Ordenar por consistência
-                df_status = df_status.sort_values('Meses Ativos', ascending=False)
-                
-                # Exibir tabela com estilo
-                st.dataframe(
-                    df_status,
-                    use_container_width=True,
-                    hide_index=True,
-                    column_config={
-                        "Responsável": st.column_config.TextColumn("👤 Responsável", width="medium"),
-                        "Julho": st.column_config.TextColumn("📅 Jul", width="small"),
-                        "Agosto": st.column_config.TextColumn("📅 Ago", width="small"),
-                        "Setembro": st.column_config.TextColumn("📅 Set", width="small"),
-                        "Meses Ativos": st.column_config.NumberColumn("📊 Ativos", width="small"),
-                        "Total Envios": st.column_config.NumberColumn("📈 Total", width="small"),
-                        "Consistência (%)": st.column_config.TextColumn("🎯 Consist.", width="small"),
-                        "Situação": st.column_config.TextColumn("🏷️ Situação", width="large")
-                    }
-                )
-            else:
-                st.info("Nenhum responsável encontrado com os filtros selecionados.")
+            renderizar_tabela_status(analise_janela, rotulos_meses)
             
             # Resumo final por categoria
             st.markdown("### 📋 Resumo por Categoria")
             
-            categorias_count = {}
-            for status in status_individual.values():
-                cat = status['categoria']
-                categorias_count[cat] = categorias_count.get(cat, 0) + 1
+            categorias_count = AnalyticsEngine.contar_categorias(status_individual)
             
             col1, col2, col3, col4 = st.columns(4)
             
@@ -1337,7 +1120,7 @@ def main():
                     "🟢 Totalmente Ativos",
                     value=ativo_count,
                     delta=f"{ativo_pct:.1f}% do total",
-                    help="Responsáveis que enviaram reports nos 3 meses"
+                    help=f"Responsáveis que enviaram reports nos {len(meses_janela)} meses"
                 )
             
             with col2:
@@ -1347,7 +1130,7 @@ def main():
                     "🟡 Parcialmente Ativos", 
                     value=parcial_count,
                     delta=f"{parcial_pct:.1f}% do total",
-                    help="Responsáveis que enviaram reports em 2 meses"
+                    help="Responsáveis que enviaram reports em pelo menos metade dos meses"
                 )
             
             with col3:
@@ -1357,7 +1140,7 @@ def main():
                     "🟠 Pouco Ativos",
                     value=pouco_count, 
                     delta=f"{pouco_pct:.1f}% do total",
-                    help="Responsáveis que enviaram reports em apenas 1 mês"
+                    help="Responsáveis que enviaram reports em menos da metade dos meses"
                 )
             
             with col4:
@@ -1370,17 +1153,25 @@ def main():
                     help="Responsáveis que não enviaram nenhum report"
                 )
             
+            # Instrumentação por estágio
+            renderizar_painel_desempenho([
+                ('Carga dos arquivos', resultado['desempenho']),
+                ('Janela de análise', analise_janela['desempenho']),
+                ('Esta execução', monitor_tela.registros)
+            ], obter_metricas_inicializacao())
+            
         except Exception as e:
             logger.error(f"Erro geral na aplicação: {str(e)}")
             st.error(f"❌ Erro ao processar dados: {str(e)}")
-            st.info("Verifique se o arquivo Excel está no formato correto e contém as colunas necessárias.")
+            st.info("Verifique se o arquivo (Excel, CSV, Parquet ou Arrow/Feather) está no formato correto "
+                    "e contém as colunas necessárias.")
             
             # Mostrar informações de debug se necessário
             with st.expander("🔍 Informações de Debug"):
                 st.text(f"Erro detalhado: {str(e)}")
-                if uploaded_file:
-                    st.text(f"Nome do arquivo: {uploaded_file.name}")
-                    st.text(f"Tamanho: {uploaded_file.size} bytes")
+                for arquivo in uploaded_files or []:
+                    st.text(f"Nome do arquivo: {arquivo.name}")
+                    st.text(f"Tamanho: {arquivo.size} bytes")
     
     else:
         # Tela inicial sem dados - design melhorado
@@ -1388,7 +1179,7 @@ def main():
         <div style="text-align: center; padding: 3rem 2rem; background: linear-gradient(135deg, #f8f9fa, #e9ecef); border-radius: 20px; margin: 2rem 0;">
             <h2 style="color: #2c3e50; margin-bottom: 1rem;">📁 Bem-vindo ao Painel de Reports</h2>
             <p style="color: #666; font-size: 1.1rem; margin-bottom: 2rem;">
-                Faça upload da planilha Excel na barra lateral para começar a análise
+                Faça upload da planilha (Excel, CSV, Parquet ou Arrow/Feather) na barra lateral para começar a análise
             </p>
         </div>
         """, unsafe_allow_html=True)
@@ -1401,7 +1192,7 @@ def main():
             <div class="metric-card">
                 <h3 style="color: #667eea; margin-bottom: 1rem;">🚀 Como usar</h3>
                 <ol style="color: #2c3e50; line-height: 1.8;">
-                    <li><strong>Upload:</strong> Envie o arquivo Excel na barra lateral</li>
+                    <li><strong>Upload:</strong> Envie a planilha ou exportação (Excel, CSV, Parquet ou Arrow/Feather) na barra lateral</li>
                     <li><strong>Validação:</strong> O sistema verificará a integridade dos dados</li>
                     <li><strong>Processamento:</strong> Os dados serão limpos e organizados automaticamente</li>
                     <li><strong>Análise:</strong> Visualize métricas, gráficos e tendências</li>
@@ -1432,14 +1223,14 @@ def main():
         
         # Requisitos do arquivo
         st.markdown("### 📋 Requisitos do Arquivo")
-        st.info("""
+        st.info(f"""
         **Colunas obrigatórias:**
         - `RESPONSÁVEL`: Nome do responsável (texto)
         - `DATA`: Data do envio (formato de data válido)
         
-        **Formatos suportados:** .xlsx, .xls
+        **Formatos suportados:** Excel, CSV, Parquet e Arrow/Feather ({', '.join(EXTENSOES_FORMATO)})
         
-        **Período analisado:** Julho, Agosto e Setembro de 2025
+        **Período analisado:** configurável na barra lateral (padrão: Julho a Setembro de 2025)
         """)
     
     # Rodapé moderno
@@ -1455,6 +1246,12 @@ def main():
         </p>
     </div>
     """, unsafe_allow_html=True)
+    
+    # Custo de inicialização do processo (import + primeira renderização)
+    metricas_inicializacao = registrar_inicializacao(inicio_renderizacao)
+    with st.sidebar:
+        st.caption(f"⏱️ Inicialização: importação {metricas_inicializacao['importacao_s']:.2f}s • "
+                   f"primeira renderização {metricas_inicializacao['primeira_renderizacao_s']:.2f}s")
 
 if __name__ == "__main__":
     main()
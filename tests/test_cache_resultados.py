@@ -0,0 +1,41 @@
+"""Cache de resultados: cálculo único por chave entre threads concorrentes"""
+import threading
+import time
+
+import pytest
+
+from analise_envio_core import CacheResultados
+
+
+def test_calculo_unico_com_chamadas_concorrentes():
+    cache = CacheResultados()
+    chamadas = []
+    
+    def calcular():
+        chamadas.append(1)
+        time.sleep(0.2)
+        return {'valor': 42}
+    
+    resultados = []
+    threads = [threading.Thread(target=lambda: resultados.append(cache.obter_ou_calcular('a', calcular)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(chamadas) == 1
+    assert len(resultados) == 8 and all(resultado is resultados[0] for resultado in resultados)
+    assert cache.falhas == 1 and cache.esperas + cache.acertos == 7
+
+
+def test_erro_nao_fica_em_cache():
+    cache = CacheResultados()
+    
+    def falhar():
+        raise ValueError('falhou')
+    
+    with pytest.raises(ValueError):
+        cache.obter_ou_calcular('a', falhar)
+    assert 'a' not in cache
+    assert cache.obter_ou_calcular('a', lambda: 1) == 1
@@ -0,0 +1,29 @@
+"""Conversão de datas: seriais do Excel fora do intervalo representável viram datas inválidas"""
+import warnings
+
+import pandas as pd
+import pytest
+
+from analise_envio_core import LIMITES_SERIAL_EXCEL, DataProcessor
+
+
+@pytest.mark.parametrize('serie', [
+    pd.Series([45500, 500000, 2000000]),
+    pd.Series([45500.0, 1e300, -5.0]),
+    pd.Series(['45500', '1500000', '1e300']),
+    pd.Series([45500, 500000, '1500000'], dtype=object),
+])
+def test_seriais_fora_do_intervalo_sao_invalidos(serie):
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        datas, conversoes = DataProcessor.converter_datas(serie)
+
+    assert datas.iloc[0] == pd.Timestamp('2024-07-27')
+    assert datas.iloc[1:].isna().all()
+    assert conversoes.get('serial do Excel') == 1
+    assert conversoes.get('inválidas') == len(serie) - 1
+
+
+def test_limite_superior_do_serial_e_convertido():
+    datas, _ = DataProcessor.converter_datas(pd.Series([LIMITES_SERIAL_EXCEL[1]]))
+    assert datas.iloc[0] == pd.Timestamp('2262-04-10')
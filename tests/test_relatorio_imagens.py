@@ -0,0 +1,52 @@
+"""Relatório em imagens: recuperação quando um processo de renderização cai ou trava"""
+import os
+import time
+
+import pytest
+
+import analise_envio_reports as reports
+
+
+class FiguraFalsa:
+    def to_json(self) -> str:
+        return '{}'
+
+
+def encerrar_processo(especificacao: str) -> bytes:
+    os._exit(1)  # Simula o kaleido derrubando o worker
+
+
+def travar_processo(especificacao: str) -> bytes:
+    time.sleep(60)
+    return b''
+
+
+def renderizar_falso(especificacao: str) -> bytes:
+    return b'png'
+
+
+@pytest.fixture
+def relatorio(monkeypatch):
+    monkeypatch.setattr(reports, 'construir_figuras_relatorio', lambda analise_janela, rotulos: {'a': FiguraFalsa()})
+    monkeypatch.setattr(reports, 'montar_relatorio_pdf', lambda imagens: b'pdf')
+    reports.obter_pool_renderizacao.clear()
+    reports.obter_cache_relatorios().limpar()
+    yield {'chave': 'teste', 'status_individual': {'nomes': []}}
+    reports.obter_pool_renderizacao().shutdown(wait=False, cancel_futures=True)
+    reports.obter_pool_renderizacao.clear()
+
+
+@pytest.mark.parametrize('renderizar, tempo_maximo', [(encerrar_processo, 30), (travar_processo, 1)])
+def test_pool_recriado_apos_falha_do_worker(relatorio, monkeypatch, renderizar, tempo_maximo):
+    monkeypatch.setattr(reports, 'TEMPO_MAXIMO_RENDERIZACAO_S', tempo_maximo)
+    monkeypatch.setattr(reports, 'renderizar_figura_png', renderizar)
+    pool = reports.obter_pool_renderizacao()
+    
+    with pytest.raises(Exception, match='Erro ao renderizar gráficos'):
+        reports.obter_relatorio_imagens(relatorio, [], gerar=True)
+    assert reports.obter_pool_renderizacao() is not pool
+    assert reports.obter_relatorio_imagens(relatorio, []) is None
+    
+    monkeypatch.setattr(reports, 'renderizar_figura_png', renderizar_falso)
+    imagens = reports.obter_relatorio_imagens(relatorio, [], gerar=True)
+    assert imagens['pdf'] == b'pdf'
@@ -0,0 +1,54 @@
+"""Snapshot em disco: publicação versionada e descarte de versões desatualizadas"""
+import numpy as np
+import pytest
+
+import analise_envio_core
+from analise_envio_benchmark import gerar_dados_sinteticos
+from analise_envio_core import (
+    analisar_janela, carregar_snapshot, definir_janela_padrao, executar_pipeline, gerar_chave_cache,
+    obter_config_analise, recortar_janela, salvar_snapshot, versao_snapshot_atual
+)
+
+
+@pytest.fixture(scope='module')
+def analise():
+    arquivos = [('envios.csv', gerar_dados_sinteticos(2_000, 50).to_csv(index=False).encode('utf-8'))]
+    resultado = executar_pipeline(arquivos, paralelo=False)
+    resultado['chave'] = gerar_chave_cache(arquivos, obter_config_analise())
+    meses = recortar_janela(resultado['meses_disponiveis'], *definir_janela_padrao(resultado['meses_disponiveis']))
+    analise_janela = analisar_janela(resultado, meses)
+    return resultado, analise_janela
+
+
+def test_snapshot_salvo_e_carregado(analise, tmp_path):
+    resultado, analise_janela = analise
+    versao = salvar_snapshot(resultado, analise_janela, str(tmp_path))
+    assert versao_snapshot_atual(str(tmp_path)) == versao
+    
+    carregado, janela_carregada = carregar_snapshot(str(tmp_path))
+    assert carregado['snapshot']['versao'] == versao
+    assert carregado['chave'] == resultado['chave']
+    assert list(carregado['matriz']['nomes']) == list(resultado['matriz']['nomes'])
+    assert np.array_equal(carregado['matriz']['contagens'], resultado['matriz']['contagens'])
+    assert np.array_equal(janela_carregada['status_individual']['meses_ativos'],
+                          analise_janela['status_individual']['meses_ativos'])
+
+
+def test_snapshot_descartado_com_configuracao_diferente(analise, tmp_path, monkeypatch):
+    salvar_snapshot(*analise, str(tmp_path))
+    monkeypatch.setitem(analise_envio_core.ALIASES_RESPONSAVEIS, 'Responsável 00001', 'Responsável 00000')
+    assert carregar_snapshot(str(tmp_path)) is None
+
+
+def test_snapshot_descartado_com_historico_alterado(analise, tmp_path):
+    salvar_snapshot(*analise, str(tmp_path), versao_historico=3)
+    assert carregar_snapshot(str(tmp_path), versao_historico=3) is not None
+    assert carregar_snapshot(str(tmp_path), versao_historico=4) is None
+
+
+def test_snapshot_descartado_com_modo_do_historico_diferente(analise, tmp_path):
+    salvar_snapshot(*analise, str(tmp_path / 'sem'))
+    assert carregar_snapshot(str(tmp_path / 'sem'), versao_historico=1) is None
+    
+    salvar_snapshot(*analise, str(tmp_path / 'com'), versao_historico=1)
+    assert carregar_snapshot(str(tmp_path / 'com')) is None
@@ -0,0 +1,126 @@
+"""Confere o status individual vetorizado com a implementação original (laço por responsável e regra escrita à mão)"""
+from typing import Dict, List, Tuple
+
+import pandas as pd
+import pytest
+
+from analise_envio_benchmark import gerar_dados_sinteticos
+from analise_envio_core import (
+    CATEGORIAS, SITUACOES, AnalyticsEngine, DataProcessor, recortar_janela
+)
+
+
+def classificar_referencia(meses_ativos: int, total_meses: int) -> Tuple[str, str]:
+    """Regra original (3 meses: 3 ativo, 2 parcial, 1 pouco, 0 inativo), estendida a qualquer janela"""
+    if total_meses and meses_ativos == total_meses:
+        situacao = 'TOTALMENTE ATIVO'
+        categoria = 'ativo'
+    elif meses_ativos and meses_ativos * 2 >= total_meses:
+        situacao = 'PARCIALMENTE ATIVO'
+        categoria = 'parcial'
+    elif meses_ativos:
+        situacao = 'POUCO ATIVO'
+        categoria = 'pouco'
+    else:
+        situacao = 'INATIVO'
+        categoria = 'inativo'
+    return situacao, categoria
+
+
+def calcular_status_referencia(df: pd.DataFrame, responsaveis_unicos: List[str],
+                               meses: List[Tuple[int, int]]) -> Dict:
+    """Implementação original do status individual, com um filtro do DataFrame por responsável e mês"""
+    status_completo = {}
+    for resp in responsaveis_unicos:
+        dados_resp = df[df['RESPONSÁVEL'] == resp]
+        
+        envios_por_mes = []
+        total_envios = 0
+        for ano, mes_num in meses:
+            envios_mes = len(dados_resp[(dados_resp['ANO'] == ano) & (dados_resp['MES'] == mes_num)])
+            envios_por_mes.append(envios_mes > 0)
+            total_envios += envios_mes
+        
+        meses_ativos = sum(envios_por_mes)
+        situacao, categoria = classificar_referencia(meses_ativos, len(meses))
+        status_completo[resp] = {
+            'meses_enviou': envios_por_mes,
+            'meses_ativos': meses_ativos,
+            'total_envios': total_envios,
+            'situacao': situacao,
+            'categoria': categoria,
+            'consistencia': (meses_ativos / max(len(meses), 1)) * 100
+        }
+    return status_completo
+
+
+def status_como_dict(status: Dict) -> Dict:
+    """Converte o status colunar em dicionário por responsável, no formato da implementação original"""
+    meses_enviou = AnalyticsEngine.expandir_meses(status).tolist()
+    consistencia = AnalyticsEngine.calcular_consistencia(status).tolist()
+    resultado = {}
+    for i, resp in enumerate(status['nomes']):
+        categoria = CATEGORIAS[status['codigos_categoria'][i]]
+        resultado[resp] = {
+            'meses_enviou': meses_enviou[i],
+            'meses_ativos': int(status['meses_ativos'][i]),
+            'total_envios': int(status['total_envios'][i]),
+            'situacao': SITUACOES[categoria],
+            'categoria': categoria,
+            'consistencia': consistencia[i]
+        }
+    return resultado
+
+
+@pytest.fixture(scope='module')
+def dados():
+    """Seis meses de set/2025 a fev/2026 (virada de ano), com nomes e datas sujos e duplicatas"""
+    df = gerar_dados_sinteticos(20_000, 200, meses=6, proporcao_datas_baguncadas=0.1, fim=(2026, 2))
+    df_processado = DataProcessor.processar_dados(df)
+    responsaveis_unicos = sorted(df_processado['RESPONSÁVEL'].dropna().unique())
+    matriz = AnalyticsEngine.calcular_matriz_atividade(df_processado, responsaveis_unicos)
+    return df_processado, responsaveis_unicos, matriz
+
+
+@pytest.mark.parametrize('inicio, fim', [
+    ((2025, 9), (2026, 2)),   # Todos os meses
+    ((2025, 11), (2026, 1)),  # Janela que cruza a virada do ano
+    ((2026, 1), (2026, 1)),   # Um único mês
+])
+def test_status_individual_equivale_a_referencia(dados, inicio, fim):
+    df_processado, responsaveis_unicos, matriz = dados
+    meses = recortar_janela(AnalyticsEngine.listar_meses_disponiveis(matriz), inicio, fim)
+    assert meses[0] == inicio and meses[-1] == fim
+    
+    atual = status_como_dict(AnalyticsEngine.calcular_status_individual(matriz, meses))
+    referencia = calcular_status_referencia(df_processado, responsaveis_unicos, meses)
+    
+    assert list(atual) == list(referencia)
+    assert atual == referencia
+
+
+def test_status_individual_valores_escritos_a_mao():
+    df = pd.DataFrame({
+        'RESPONSÁVEL': ['Ana'] * 4 + ['Bruno'] * 3 + ['Carla'] + ['Davi'],
+        'DATA': pd.to_datetime([
+            '2025-07-03', '2025-07-20', '2025-08-11', '2025-09-30',  # Ana: os três meses
+            '2025-07-15', '2025-09-01', '2025-09-02',                # Bruno: julho e setembro
+            '2025-08-05',                                            # Carla: só agosto
+            '2025-06-10',                                            # Davi: fora da janela
+        ])
+    })
+    df_processado = DataProcessor.processar_dados(df)
+    responsaveis = sorted(df_processado['RESPONSÁVEL'].unique())
+    matriz = AnalyticsEngine.calcular_matriz_atividade(df_processado, responsaveis)
+    meses = [(2025, 7), (2025, 8), (2025, 9)]
+    
+    atual = status_como_dict(AnalyticsEngine.calcular_status_individual(matriz, meses))
+    
+    assert {resp: (s['meses_enviou'], s['total_envios'], s['categoria']) for resp, s in atual.items()} == {
+        'Ana': ([True, True, True], 4, 'ativo'),
+        'Bruno': ([True, False, True], 3, 'parcial'),
+        'Carla': ([False, True, False], 1, 'pouco'),
+        'Davi': ([False, False, False], 0, 'inativo'),
+    }
+    assert atual['Bruno']['situacao'] == 'PARCIALMENTE ATIVO'
+    assert atual['Carla']['consistencia'] == pytest.approx(100 / 3)